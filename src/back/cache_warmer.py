@@ -0,0 +1,124 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class RateLimiter:
+    """Token bucket allowing at most `per_minute` acquisitions per minute."""
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute / 60.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop_event):
+        """Waits for a token; returns False if stop_event is set first."""
+        while not stop_event.is_set():
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            stop_event.wait(wait)
+        return False
+
+
+class CacheWarmer:
+    """
+    Keeps SymptomCache entries filled off the request path.
+
+    A sweep thread periodically checks each cache key and schedules a refresh when
+    it has fewer than `target` cached variants or its newest variant is older than
+    `stale_after` seconds. Refreshes run on a small worker pool and share an LLM
+    budget of `calls_per_minute`. Requests keep serving stale entries meanwhile
+    and can nudge one of the warmer's keys with request_refresh(); other keys,
+    such as one patient's profile, are ignored so the budget is not spent on them.
+
+    Args:
+    - cache (SymptomCache): Cache to inspect via entry_stats().
+    - refresh (callable): key -> bool, generates and caches one new variant.
+    - keys (list): Cache keys to keep warm.
+    """
+    def __init__(self, cache, refresh, keys, target=10, stale_after=24 * 60 * 60,
+                 workers=2, calls_per_minute=10, sweep_interval=60):
+        self.cache = cache
+        self.refresh = refresh
+        self.keys = list(keys)
+        self.owned = set(self.keys)
+        self.target = target
+        self.stale_after = stale_after
+        self.workers = workers
+        self.sweep_interval = sweep_interval
+        self.limiter = RateLimiter(calls_per_minute)
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.counters = {"generated": 0, "failed": 0}
+        self._stop = threading.Event()
+        self._executor = None
+        self._sweeper = None
+
+    def start(self):
+        if self._sweeper is not None:
+            return
+        with self.lock:
+            if self._sweeper is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cache-warmer")
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="cache-warmer-sweep", daemon=True)
+            self._sweeper.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def after_fork(self):
+        """Resets thread state in a forked worker so start() builds its own pool."""
+        self.lock = threading.Lock()
+        self.pending = set()
+        self._stop = threading.Event()
+        self._executor = None
+        self._sweeper = None
+
+    def request_refresh(self, key):
+        """Schedules a check-and-refresh of one of the warmer's keys unless one is already pending."""
+        if key not in self.owned or self._executor is None or self._stop.is_set():
+            return
+        with self.lock:
+            if key in self.pending:
+                return
+            self.pending.add(key)
+        self._executor.submit(self._run, key)
+
+    def needs_refresh(self, key):
+        count, age = self.cache.entry_stats(key)
+        return count < self.target or age is None or age > self.stale_after
+
+    def stats(self):
+        with self.lock:
+            return {"pending": len(self.pending), **self.counters}
+
+    def _sweep_loop(self):
+        while not self._stop.is_set():
+            for key in self.keys:
+                self.request_refresh(key)
+            self._stop.wait(self.sweep_interval)
+
+    def _run(self, key):
+        try:
+            while self.needs_refresh(key) and self.limiter.acquire(self._stop):
+                ok = self.refresh(key)
+                with self.lock:
+                    self.counters["generated" if ok else "failed"] += 1
+                if not ok:
+                    break
+                # let the cache writer commit before re-checking the count
+                self.cache.flush()
+        except Exception as e:
+            print(f"Error warming cache for {key}: {e}")
+        finally:
+            with self.lock:
+                self.pending.discard(key)
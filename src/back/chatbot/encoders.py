@@ -0,0 +1,150 @@
+import json
+import os
+import numpy as np
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_FILE = "model.int8.onnx"
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+class SentenceTransformerEncoder:
+    """Full PyTorch SentenceTransformer; the reference backend."""
+    def __init__(self, model_name="all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts):
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+class OnnxEncoder:
+    """
+    The same encoder exported to ONNX and run with onnxruntime on CPU, without
+    importing torch. Mean pooling and L2 normalisation match SentenceTransformer.
+
+    Args:
+    - model_dir (str): Directory written by export_onnx().
+    - quantized (bool): Use the int8 dynamically quantized model.
+    - threads (int): onnxruntime intra-op threads (default: runtime's choice).
+    """
+    def __init__(self, model_dir, quantized=True, threads=None):
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The ONNX intent backend needs `pip install onnxruntime tokenizers`") from e
+
+        with open(os.path.join(model_dir, "encoder_config.json")) as f:
+            config = json.load(f)
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=config["pad_token_id"])
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        model_file = ONNX_QUANTIZED_FILE if quantized else ONNX_MODEL_FILE
+        self.session = ort.InferenceSession(os.path.join(model_dir, model_file), options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def encode(self, texts):
+        encodings = self.tokenizer.encode_batch(list(texts))
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        token_embeddings = self.session.run(None, {name: inputs[name] for name in self.input_names})[0]
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return _normalize(pooled)
+
+
+def make_encoder(backend, model_name="all-MiniLM-L6-v2", onnx_dir=None):
+    """Builds the encoder for a backend name: "torch", "onnx" or "onnx-int8"."""
+    if backend == "torch":
+        return SentenceTransformerEncoder(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEncoder(onnx_dir, quantized=backend == "onnx-int8")
+    raise ValueError(f"Unknown intent encoder backend: {backend}")
+
+
+def export_onnx(model_name, output_dir, quantize=True):
+    """
+    Exports the SentenceTransformer's transformer to ONNX, plus an int8 dynamically
+    quantized copy, its tokenizer.json and the pooling config OnnxEncoder needs.
+    Requires torch, sentence-transformers and onnxruntime.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.transformer(input_ids=input_ids, attention_mask=attention_mask,
+                                    token_type_ids=token_type_ids)[0]
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    dynamic = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        TokenEmbeddings(transformer),
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        model_path,
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["token_embeddings"],
+        dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "token_type_ids": dynamic,
+                      "token_embeddings": dynamic},
+        opset_version=17,
+    )
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, "tokenizer.json"))
+    with open(os.path.join(output_dir, "encoder_config.json"), "w") as f:
+        json.dump({"model_name": model_name, "max_seq_length": model.max_seq_length,
+                   "pad_token_id": tokenizer.pad_token_id}, f)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(model_path, os.path.join(output_dir, ONNX_QUANTIZED_FILE), weight_type=QuantType.QInt8)
+
+
+def check_parity(encoder, intents_file, vectors_file):
+    """
+    Re-encodes the training phrases and compares them with the stored intent vectors.
+
+    Returns {"min_cosine", "mean_cosine", "label_agreement"}, where label_agreement
+    is the share of phrases whose nearest stored vector (itself excluded) has the
+    same label as when using the stored vectors alone.
+    """
+    with open(intents_file) as f:
+        intents = json.load(f)
+    phrases = [phrase for group in intents.values() for phrase in group]
+    data = np.load(vectors_file, allow_pickle=True)
+    stored = _normalize(data["vectors"].astype(np.float32))
+    labels = data["labels"]
+    if len(phrases) != len(stored):
+        raise ValueError(f"{intents_file} has {len(phrases)} phrases but {vectors_file} has {len(stored)} vectors")
+
+    encoded = encoder.encode(phrases)
+    cosines = np.sum(encoded * stored, axis=1)
+
+    def nearest_labels(queries):
+        similarities = queries @ stored.T
+        np.fill_diagonal(similarities, -np.inf)
+        return labels[np.argmax(similarities, axis=1)]
+
+    agreement = np.mean(nearest_labels(encoded) == nearest_labels(stored))
+    return {"min_cosine": float(cosines.min()), "mean_cosine": float(cosines.mean()),
+            "label_agreement": float(agreement)}
@@ -0,0 +1,24 @@
+from encoders import export_onnx, check_parity, make_encoder
+import os
+import sys
+
+# Export the intent encoder for the ONNX backends (run from src/back/chatbot, like train_intent.py)
+model_name = "all-MiniLM-L6-v2"
+save_dir = "intent_model"
+onnx_dir = os.path.join(save_dir, "onnx")
+
+export_onnx(model_name, onnx_dir, quantize=True)
+print(f"Exported {model_name} to {onnx_dir}")
+
+# Accuracy parity against the stored intents.npz vectors
+min_cosine = {"torch": 0.99, "onnx": 0.99, "onnx-int8": 0.95}
+failed = False
+for backend, threshold in min_cosine.items():
+    encoder = make_encoder(backend, model_name, onnx_dir)
+    parity = check_parity(encoder, os.path.join(save_dir, "intents.json"), os.path.join(save_dir, "intents.npz"))
+    ok = parity["min_cosine"] >= threshold and parity["label_agreement"] >= 0.95
+    failed = failed or not ok
+    print(f"{backend:10} min cosine {parity['min_cosine']:.4f}  mean cosine {parity['mean_cosine']:.4f}  "
+          f"label agreement {parity['label_agreement']:.2%}  {'✅' if ok else '❌'}")
+
+sys.exit(1 if failed else 0)
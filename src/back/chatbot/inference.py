@@ -1,24 +1,152 @@
-from sentence_transformers import SentenceTransformer
+from chatbot.encoders import make_encoder
+from metrics import INTENT_BATCH_SIZE
+from collections import OrderedDict
+from concurrent.futures import Future
 import numpy as np
 import os
+import queue
+import threading
+import time
 
 class IntentClassifier:
-    def __init__(self, model_name="all-MiniLM-L6-v2", save_dir="chatbot/intent_model/"):
-        self.model = SentenceTransformer(model_name)
+    """
+    Classifies chatbot input against precomputed intent phrase embeddings.
+
+    Concurrent calls are gathered for up to `batch_window` seconds into a single
+    encode() batch, and results are memoised in an LRU keyed on normalised text.
+    Vectors are L2-normalised so scores are true cosine similarities.
+
+    The encoder backend is "torch" (SentenceTransformer), "onnx" or "onnx-int8"
+    (onnxruntime on CPU, see chatbot/export_onnx.py), taken from the
+    INTENT_BACKEND environment variable unless passed explicitly; the model name
+    or local path likewise defaults to INTENT_MODEL.
+    """
+    def __init__(self, model_name=None, save_dir="chatbot/intent_model/",
+                 batch_window=0.005, max_batch_size=32, cache_size=1024, backend=None):
+        self.backend = backend or os.getenv("INTENT_BACKEND", "torch")
+        model_name = model_name or os.getenv("INTENT_MODEL", "all-MiniLM-L6-v2")
+        self.encoder = make_encoder(self.backend, model_name, os.path.join(save_dir, "onnx"))
         self.data_file = os.path.join(save_dir, "intents.npz")
-        self.intent_vectors, self.intent_labels = self._load_intents()
-    
+        vectors, labels = self._load_intents()
+        self.intent_vectors = self._normalize(vectors.astype(np.float32))
+        self.intent_labels = labels
+        self.labels, self.label_index = np.unique(labels, return_inverse=True)
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.cache_size = cache_size
+        self.counters = {"requests": 0, "cache_hits": 0, "batches": 0, "batched_inputs": 0}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._worker = None
+
+    def after_fork(self):
+        """Resets the batcher in a forked worker; the encoder weights stay shared with the parent."""
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._worker = None
+
     def _load_intents(self):
         if not os.path.exists(self.data_file):
             raise FileNotFoundError(f"Intent data file not found: {self.data_file}")
-        
+
         data = np.load(self.data_file, allow_pickle=True)
         return data["vectors"], data["labels"]
-    
+
+    @staticmethod
+    def _normalize(vectors):
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    @staticmethod
+    def normalize_text(text):
+        return " ".join(str(text).lower().split())
+
+    def encode(self, texts):
+        """Encodes texts to L2-normalised float32 vectors."""
+        return self.encoder.encode(texts)
+
     def get_intent(self, user_input):
         """Find the best matching intent using precomputed embeddings."""
-        user_vector = self.model.encode([user_input])[0]         # Convert input to embedding
-        similarities = np.dot(self.intent_vectors, user_vector)  # Fast similarity computation
+        return self.classify(user_input, k=1)["intent"]
+
+    def classify(self, user_input, k=3):
+        """
+        Returns the best intent, its cosine confidence and the top-k intents:
+        {"intent": str, "confidence": float, "top_k": [{"intent": str, "score": float}, ...]}
+        """
+        text = self.normalize_text(user_input)
+        with self._lock:
+            self.counters["requests"] += 1
+            ranked = self._cache.get(text)
+            if ranked is not None:
+                self._cache.move_to_end(text)
+                self.counters["cache_hits"] += 1
+
+        if ranked is None:
+            ranked = self._rank(self._encode_batched(text))
+            with self._lock:
+                self._cache[text] = ranked
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        top = ranked[:k]
+        return {
+            "intent": top[0][0],
+            "confidence": top[0][1],
+            "top_k": [{"intent": label, "score": score} for label, score in top],
+        }
+
+    def stats(self):
+        with self._lock:
+            batches = self.counters["batches"]
+            return {
+                **self.counters,
+                "cache_size": len(self._cache),
+                "mean_batch_size": self.counters["batched_inputs"] / batches if batches else 0.0,
+            }
+
+    def _rank(self, vector):
+        # best phrase score per intent, highest first
+        similarities = self.intent_vectors @ vector
+        scores = np.full(len(self.labels), -np.inf, dtype=np.float32)
+        np.maximum.at(scores, self.label_index, similarities)
+        order = np.argsort(-scores)
+        return [(str(self.labels[i]), float(scores[i])) for i in order]
+
+    def _encode_batched(self, text):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._batch_loop, name="intent-batcher", daemon=True)
+                    self._worker.start()
+        future = Future()
+        self._requests.put((text, future))
+        return future.result()
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
 
-        best_match_index = np.argmax(similarities)
-        return self.intent_labels[best_match_index]
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = dict(zip(texts, self.encode(texts)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            with self._lock:
+                self.counters["batches"] += 1
+                self.counters["batched_inputs"] += len(batch)
+            INTENT_BATCH_SIZE.observe(len(batch))
+            for text, future in batch:
+                future.set_result(vectors[text])
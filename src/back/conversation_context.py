@@ -0,0 +1,123 @@
+from collections import OrderedDict
+import hashlib
+import threading
+
+SPEAKERS = {"user": "Doctor", "bot": "Patient"}
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), close enough for budgeting prompts."""
+    return (len(text) + 3) // 4
+
+
+def format_turn(turn):
+    speaker = SPEAKERS.get(turn.get("sender"), str(turn.get("sender", "")).capitalize())
+    return f"{speaker}: {turn.get('text', '')}"
+
+
+def extractive_summary(previous, turns, max_tokens, turn_chars=160):
+    """
+    Folds turns into a running summary without an LLM call: each turn becomes one
+    shortened line, and the oldest lines are dropped once the summary exceeds max_tokens.
+    """
+    lines = previous.split("\n") if previous else []
+    for turn in turns:
+        line = format_turn(turn)
+        lines.append(line if len(line) <= turn_chars else line[:turn_chars - 3] + "...")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ConversationContext:
+    """
+    Keeps a chat prompt's history within a token budget.
+
+    The newest turns that fit in `budget_tokens` are kept verbatim; everything older
+    is folded into a running summary of at most `summary_tokens`. Summaries are cached
+    by a digest of the folded prefix, so each request only folds the turns that aged
+    out since the previous one and per-turn prompt size stays flat.
+
+    Args:
+    - budget_tokens (int): Budget for the verbatim recent turns.
+    - summary_tokens (int): Budget for the summary of older turns.
+    - summarize (callable): summarize(previous_summary, turns, max_tokens) -> str (default: extractive_summary).
+    - cache_size (int): Running summaries kept in the LRU.
+    """
+    def __init__(self, budget_tokens=600, summary_tokens=200, summarize=extractive_summary, cache_size=512):
+        self.budget_tokens = budget_tokens
+        self.summary_tokens = summary_tokens
+        self.summarize = summarize
+        self.cache_size = cache_size
+        self.counters = {"requests": 0, "history_tokens": 0, "context_tokens": 0, "tokens_saved": 0,
+                         "summary_hits": 0, "summary_misses": 0}
+        self._summaries = OrderedDict()                 # prefix digest -> summary of that prefix
+        self._lock = threading.Lock()
+
+    def build(self, history):
+        """
+        Returns (context, metrics): the prompt text for the history and
+        {"history_tokens", "context_tokens", "tokens_saved", "summarized_turns", "recent_turns"}.
+        """
+        history = [turn for turn in history or [] if isinstance(turn, dict)]
+        lines = [format_turn(turn) for turn in history]
+
+        # newest turns first until the budget is used; the last turn is always kept
+        split, used = len(lines), 0
+        while split > 0:
+            cost = estimate_tokens(lines[split - 1]) + 1
+            if used + cost > self.budget_tokens and split < len(lines):
+                break
+            used += cost
+            split -= 1
+
+        summary = self._summary(history[:split]) if split else ""
+        recent = "\n".join(lines[split:])
+        context = f"Summary of earlier conversation:\n{summary}\nRecent conversation:\n{recent}" if summary else recent
+
+        metrics = {
+            "history_tokens": estimate_tokens("\n".join(lines)),
+            "context_tokens": estimate_tokens(context),
+            "summarized_turns": split,
+            "recent_turns": len(lines) - split,
+        }
+        metrics["tokens_saved"] = max(0, metrics["history_tokens"] - metrics["context_tokens"])
+        with self._lock:
+            self.counters["requests"] += 1
+            for key in ("history_tokens", "context_tokens", "tokens_saved"):
+                self.counters[key] += metrics[key]
+        return context, metrics
+
+    def stats(self):
+        with self._lock:
+            history = self.counters["history_tokens"]
+            return {
+                **self.counters,
+                "cached_summaries": len(self._summaries),
+                "saved_ratio": self.counters["tokens_saved"] / history if history else 0.0,
+            }
+
+    def _summary(self, turns):
+        # digests[i] identifies turns[:i], so a summary cached for an earlier
+        # request's prefix can be extended with just the newer turns
+        digests = [hashlib.sha256(b"").digest()]
+        for turn in turns:
+            digests.append(hashlib.sha256(digests[-1] + format_turn(turn).encode()).digest())
+
+        with self._lock:
+            start, previous = 0, ""
+            for i in range(len(turns), 0, -1):
+                if digests[i] in self._summaries:
+                    start, previous = i, self._summaries[digests[i]]
+                    self._summaries.move_to_end(digests[i])
+                    break
+            self.counters["summary_hits" if start == len(turns) else "summary_misses"] += 1
+        if start == len(turns):
+            return previous
+
+        summary = self.summarize(previous, turns[start:], self.summary_tokens)
+        with self._lock:
+            self._summaries[digests[-1]] = summary
+            if len(self._summaries) > self.cache_size:
+                self._summaries.popitem(last=False)
+        return summary
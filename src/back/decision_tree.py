@@ -0,0 +1,133 @@
+import functools
+import json
+import math
+import numpy as np
+
+YES, NO, UNSURE = "yes", "no", "unsure"
+
+
+class DecisionTree:
+    """
+    Yes/no symptom questioning for the Decision-Tree Explorer, over the
+    symptom_prevalence matrix of disease_diagnostic_web_data.json.
+
+    Candidate diseases are an int bitset (bit i is diseases[i]) and every symptom
+    has a bitset of the diseases listing it, so an answer narrows the candidates
+    with a single AND ("yes") or AND NOT ("no"). The next question is the symptom
+    with the highest expected information gain over the candidates, where the
+    "yes" branch is weighted by the candidates' prevalence of that symptom. Choices
+    are memoized per (candidates, unsure symptoms) state, and the tree reached by
+    yes/no answers from the full disease set is built once at load.
+
+    Answers are replayed in order on every call, so going back is just sending
+    fewer answers. An answer that would leave no candidate contradicts the earlier
+    ones; it is reported as a conflict and skipped, which backtracks to the last
+    consistent state.
+
+    Args:
+    - diseases (list): Disease names.
+    - symptoms (list): Symptom names.
+    - prevalence (dict): disease -> {symptom: prevalence in [0, 1]}.
+    - cache_size (int): Memoized question choices.
+    """
+    def __init__(self, diseases, symptoms, prevalence, cache_size=65536):
+        self.diseases = list(diseases)
+        self.symptoms = list(symptoms)
+        self.symptom_index = {symptom: j for j, symptom in enumerate(self.symptoms)}
+        self.matrix = np.zeros((len(self.diseases), len(self.symptoms)), dtype=np.float64)
+        for i, disease in enumerate(self.diseases):
+            for symptom, value in prevalence.get(disease, {}).items():
+                if symptom in self.symptom_index:
+                    self.matrix[i, self.symptom_index[symptom]] = value
+        self.present = [sum(1 << i for i in np.flatnonzero(self.matrix[:, j] > 0)) for j in range(len(self.symptoms))]
+        self.everything = (1 << len(self.diseases)) - 1
+        self._choose = functools.lru_cache(maxsize=cache_size)(self._best_question)
+        self.depths = self._build(self.everything, 0, 0)
+
+    @classmethod
+    def load(cls, path):
+        """Builds the tree from disease_diagnostic_web_data.json."""
+        with open(path) as f:
+            data = json.load(f)
+        prevalence = {disease: profile.get("symptom_prevalence", {})
+                      for disease, profile in data["disease_symptom_profiles"].items()}
+        return cls(data["diseases"], data["symptoms"], prevalence)
+
+    def next_question(self, answers):
+        """
+        Replays [{"symptom", "answer": "yes"|"no"|"unsure"}, ...] and returns
+        {"done", "question", "candidates", "remaining", "asked", "conflicts"}.
+        Raises ValueError for an unknown symptom or answer.
+        """
+        candidates, skipped, conflicts = self.everything, 0, []
+        for item in answers:
+            symptom, answer = item.get("symptom"), str(item.get("answer", "")).lower()
+            if symptom not in self.symptom_index:
+                raise ValueError(f"unknown symptom: {symptom}")
+            j = self.symptom_index[symptom]
+            if answer == UNSURE:
+                skipped |= 1 << j
+                continue
+            if answer == YES:
+                narrowed = candidates & self.present[j]
+            elif answer == NO:
+                narrowed = candidates & ~self.present[j]
+            else:
+                raise ValueError(f"answer must be one of {YES}, {NO}, {UNSURE}")
+            if narrowed:
+                candidates = narrowed
+            else:
+                conflicts.append(symptom)
+
+        question = self._choose(candidates, skipped)
+        return {
+            "done": question is None,
+            "question": None if question is None else self.symptoms[question],
+            "candidates": [self.diseases[i] for i in self._members(candidates)],
+            "remaining": bin(candidates).count("1"),
+            "asked": len(answers),
+            "conflicts": conflicts,
+        }
+
+    def expected_questions(self):
+        """Questions until a diagnosis when each disease answers "yes" exactly to its listed symptoms."""
+        depths = list(self.depths.values())
+        return {"mean": sum(depths) / len(depths), "max": max(depths)}
+
+    def stats(self):
+        info = self._choose.cache_info()
+        return {"diseases": len(self.diseases), "symptoms": len(self.symptoms),
+                "memo_hits": info.hits, "memo_misses": info.misses, "memo_size": info.currsize,
+                "expected_questions": self.expected_questions()["mean"]}
+
+    def _members(self, bitset):
+        return [i for i in range(len(self.diseases)) if bitset >> i & 1]
+
+    def _best_question(self, candidates, skipped):
+        """Index of the most informative symptom for this state, or None if no symptom splits it."""
+        members = self._members(candidates)
+        n = len(members)
+        if n <= 1:
+            return None
+        rows = self.matrix[members]
+        yes_count = np.count_nonzero(rows > 0, axis=0)
+        p_yes = rows.sum(axis=0) / n
+        remaining = p_yes * np.log2(np.maximum(yes_count, 1)) + (1 - p_yes) * np.log2(np.maximum(n - yes_count, 1))
+        gain = math.log2(n) - remaining
+        splits = (yes_count > 0) & (yes_count < n)
+        if skipped:
+            splits &= np.array([not skipped >> j & 1 for j in range(len(self.symptoms))])
+        if not splits.any():
+            return None
+        # ties go to the symptom candidates report most reliably, then catalogue order
+        order = np.lexsort((-p_yes, -np.where(splits, gain, -np.inf)))
+        return int(order[0])
+
+    def _build(self, candidates, skipped, depth):
+        """Walks the yes/no tree from `candidates`; returns {disease index: questions to reach its leaf}."""
+        question = self._choose(candidates, skipped)
+        if question is None:
+            return {i: depth for i in self._members(candidates)}
+        depths = self._build(candidates & self.present[question], skipped, depth + 1)
+        depths.update(self._build(candidates & ~self.present[question], skipped, depth + 1))
+        return depths
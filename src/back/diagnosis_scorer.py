@@ -0,0 +1,106 @@
+import json
+import numpy as np
+
+
+class DiagnosisScorer:
+    """
+    Naive-Bayes differential diagnosis over the symptom_prevalence matrix of
+    disease_diagnostic_web_data.json.
+
+    Each disease's prevalence of each symptom becomes P(symptom | disease); symptoms a
+    disease does not list get a small `leak` probability and listed ones are capped
+    at `ceiling`, so one unexpected answer lowers a disease instead of ruling it out.
+    The log-likelihoods are stacked once into a dense matrix W = [log p | log(1 - p)]
+    of shape (diseases, 2 * symptoms). A case is the vector [present; absent] of
+    0/1 answers (unmentioned symptoms are 0 in both halves), so W @ case scores it
+    against every disease, and W @ cases scores a whole batch in one call.
+
+    Args:
+    - diseases (list): Disease names.
+    - symptoms (list): Symptom names.
+    - prevalence (dict): disease -> {symptom: prevalence in [0, 1]}.
+    - prior (list): Prior probability per disease; uniform if None.
+    - leak (float): P(symptom | disease) for symptoms the disease does not list.
+    - ceiling (float): Upper bound for listed prevalences.
+    """
+    def __init__(self, diseases, symptoms, prevalence, prior=None, leak=0.01, ceiling=0.99):
+        self.diseases = list(diseases)
+        self.symptoms = list(symptoms)
+        self.symptom_index = {symptom: j for j, symptom in enumerate(self.symptoms)}
+        p = np.full((len(self.diseases), len(self.symptoms)), leak, dtype=np.float64)
+        for i, disease in enumerate(self.diseases):
+            for symptom, value in prevalence.get(disease, {}).items():
+                if symptom in self.symptom_index:
+                    p[i, self.symptom_index[symptom]] = min(max(value, leak), ceiling)
+        self.weights = np.hstack([np.log(p), np.log1p(-p)]).astype(np.float32)
+        prior = np.full(len(self.diseases), 1.0 / len(self.diseases)) if prior is None else np.asarray(prior, dtype=np.float64)
+        self.log_prior = np.log(prior / prior.sum()).astype(np.float32)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Builds the scorer from disease_diagnostic_web_data.json."""
+        with open(path) as f:
+            data = json.load(f)
+        prevalence = {disease: profile.get("symptom_prevalence", {})
+                      for disease, profile in data["disease_symptom_profiles"].items()}
+        return cls(data["diseases"], data["symptoms"], prevalence, **kwargs)
+
+    def encode(self, present=(), absent=()):
+        """Returns (case vector, unknown symptoms); a symptom in both lists counts as present."""
+        present, absent, unknown = self._columns(present, absent)
+        case = np.zeros(2 * len(self.symptoms), dtype=np.float32)
+        case[absent] = 1.0
+        case[present] = 1.0
+        return case, unknown
+
+    def posteriors(self, cases):
+        """(diseases, n) posterior matrix for a (2 * symptoms, n) matrix of case vectors."""
+        log_joint = self.weights @ cases + self.log_prior[:, None]
+        log_joint -= log_joint.max(axis=0, keepdims=True)
+        joint = np.exp(log_joint)
+        return joint / joint.sum(axis=0, keepdims=True)
+
+    def score(self, present=(), absent=(), k=5):
+        """
+        Returns (differential, unknown): the top-k [{"disease", "posterior"}] by
+        posterior, and the symptoms missing from the matrix.
+        """
+        case, unknown = self.encode(present, absent)
+        return self._rank(self.posteriors(case[:, None])[:, 0], k), unknown
+
+    def score_batch(self, cases, k=5):
+        """Scores [{"present": [...], "absent": [...]}, ...] in one matrix product; returns score() results in order."""
+        if not cases:
+            return []
+        matrix = np.zeros((2 * len(self.symptoms), len(cases)), dtype=np.float32)
+        rows, columns, unknowns = [], [], []
+        for n, case in enumerate(cases):
+            present, absent, unknown = self._columns(case.get("present", ()), case.get("absent", ()))
+            rows.extend(absent + present)
+            columns.extend([n] * (len(absent) + len(present)))
+            unknowns.append(unknown)
+        matrix[rows, columns] = 1.0
+        posteriors = self.posteriors(matrix)
+        k = max(1, min(k, len(self.diseases)))
+        top = np.argpartition(-posteriors, k - 1, axis=0)[:k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(posteriors, top, axis=0), axis=0), axis=0)
+        scores = np.take_along_axis(posteriors, top, axis=0).T.tolist()
+        return [([{"disease": self.diseases[i], "posterior": score} for i, score in zip(indices, case_scores)], unknown)
+                for indices, case_scores, unknown in zip(top.T.tolist(), scores, unknowns)]
+
+    def _columns(self, present, absent):
+        """Case-vector indices of the present and absent symptoms, and the unknown ones."""
+        present_set = set(present)
+        unknown = [symptom for symptom in present if symptom not in self.symptom_index]
+        unknown += [symptom for symptom in absent if symptom not in self.symptom_index and symptom not in present_set]
+        offset = len(self.symptoms)
+        return ([self.symptom_index[symptom] for symptom in present_set if symptom in self.symptom_index],
+                [offset + self.symptom_index[symptom] for symptom in set(absent) - present_set
+                 if symptom in self.symptom_index],
+                unknown)
+
+    def _rank(self, posterior, k):
+        k = max(1, min(k, len(self.diseases)))
+        top = np.argpartition(-posterior, k - 1)[:k]
+        top = top[np.argsort(-posterior[top])]
+        return [{"disease": self.diseases[i], "posterior": float(posterior[i])} for i in top]
@@ -0,0 +1,42 @@
+import os
+import numpy as np
+from embedding_store import EmbeddingStore, convert_json, is_stale
+
+class DiseaseMatcher:
+    """
+    Server-side symptom -> disease similarity search over the DiseaseCraft embeddings.
+
+    The JSON embedding assets are converted once into L2-normalised float32
+    embedding stores in `cache_dir` and then memory-mapped, so every worker process
+    shares the same read-only pages. Scoring mirrors the client: the selected
+    symptom vectors are averaged, normalised and compared with every disease by cosine.
+    """
+    def __init__(self, diseases_file, symptoms_file, cache_dir):
+        self.disease_store = self._load(diseases_file, os.path.join(cache_dir, "diseases"))
+        self.symptom_store = self._load(symptoms_file, os.path.join(cache_dir, "symptoms"))
+        self.diseases = self.disease_store.names
+        self.disease_matrix = self.disease_store.matrix
+
+    @staticmethod
+    def _load(json_file, prefix):
+        if is_stale(prefix, json_file):
+            convert_json(json_file, prefix, dtype="float32")
+        return EmbeddingStore.load(prefix)
+
+    def match(self, symptoms, k=5):
+        """
+        Returns (matches, unknown) where matches is the top-k
+        [{"disease": str, "similarity": float}] and unknown lists symptoms without embeddings.
+        """
+        known = [s for s in symptoms if s in self.symptom_store]
+        unknown = [s for s in symptoms if s not in self.symptom_store]
+        if not known:
+            return [], unknown
+
+        query = self.symptom_store.vectors(known).mean(axis=0)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        scores = self.disease_matrix @ query
+        k = max(1, min(k, len(self.diseases)))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{"disease": self.diseases[i], "similarity": float(scores[i])} for i in top], unknown
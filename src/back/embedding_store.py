@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import numpy as np
+
+INDEX_SUFFIX = ".index.json"
+MATRIX_SUFFIX = ".npy"
+
+
+class EmbeddingStore:
+    """
+    Read-only named embedding matrix stored as `<prefix>.npy` plus `<prefix>.index.json`.
+
+    The `.npy` holds a (count, dim) float16 or float32 matrix; the index holds the
+    row names in order, the dtype and per-name metadata (e.g. a disease's symptoms).
+    Loading memory-maps the matrix, so reads are zero-copy and the pages are shared
+    by every process that opens the same store.
+    """
+    def __init__(self, names, matrix, metadata=None, normalized=False):
+        self.names = names
+        self.matrix = matrix
+        self.metadata = metadata or {}
+        self.normalized = normalized
+        self.index = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def load(cls, prefix, mmap=True):
+        with open(prefix + INDEX_SUFFIX) as f:
+            index = json.load(f)
+        matrix = np.load(prefix + MATRIX_SUFFIX, mmap_mode="r" if mmap else None)
+        if matrix.shape != (len(index["names"]), index["dim"]):
+            raise ValueError(f"{prefix}{MATRIX_SUFFIX} has shape {matrix.shape}, index expects "
+                             f"({len(index['names'])}, {index['dim']})")
+        return cls(index["names"], matrix, index.get("metadata"), index.get("normalized", False))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def vector(self, name):
+        """Zero-copy view of one row."""
+        return self.matrix[self.index[name]]
+
+    def vectors(self, names):
+        """float32 copy of the rows for the given names, in order."""
+        return np.asarray(self.matrix[[self.index[name] for name in names]], dtype=np.float32)
+
+
+def write_store(prefix, names, matrix, dtype="float16", normalize=True, metadata=None):
+    """
+    Writes a store atomically: both files are written under temporary names and
+    renamed into place, the matrix last, so readers never see a partial store.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if normalize:
+        matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    matrix = matrix.astype(dtype)
+    index = {
+        "names": list(names),
+        "dim": int(matrix.shape[1]),
+        "dtype": str(matrix.dtype),
+        "normalized": bool(normalize),
+        "metadata": metadata or {},
+    }
+
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f".{os.getpid()}.tmp"
+    with open(prefix + INDEX_SUFFIX + tmp, "w") as f:
+        json.dump(index, f)
+    with open(prefix + MATRIX_SUFFIX + tmp, "wb") as f:
+        np.save(f, matrix)
+    os.replace(prefix + INDEX_SUFFIX + tmp, prefix + INDEX_SUFFIX)
+    os.replace(prefix + MATRIX_SUFFIX + tmp, prefix + MATRIX_SUFFIX)
+
+
+def append_store(prefix, names, matrix, metadata=None):
+    """
+    Adds rows to an existing store by rewriting it atomically. Readers that already
+    loaded the store keep their mapping of the old file; new loads see the rows.
+    """
+    store = EmbeddingStore.load(prefix, mmap=False)
+    if set(names) & set(store.names):
+        raise ValueError(f"names already in {prefix}: {sorted(set(names) & set(store.names))}")
+    write_store(prefix, store.names + list(names),
+                np.vstack([np.asarray(store.matrix, dtype=np.float32), np.asarray(matrix, dtype=np.float32)]),
+                dtype=str(store.matrix.dtype), normalize=store.normalized,
+                metadata={**store.metadata, **(metadata or {})})
+
+
+def convert_json(json_file, prefix, dtype="float16", normalize=True):
+    """
+    Converts a `{name: {"embedding": [...], ...}}` JSON asset (diseases.json,
+    symptoms.json) into a binary store. Fields other than the embedding are kept
+    as per-name metadata.
+    """
+    with open(json_file) as f:
+        data = json.load(f)
+    names = list(data)
+    matrix = [data[name]["embedding"] for name in names]
+    metadata = {name: {k: v for k, v in data[name].items() if k != "embedding"} for name in names}
+    metadata = {name: extra for name, extra in metadata.items() if extra}
+    write_store(prefix, names, matrix, dtype=dtype, normalize=normalize, metadata=metadata)
+
+
+def export_json(prefix, json_file):
+    """Writes a store back out in the original JSON layout for older clients."""
+    store = EmbeddingStore.load(prefix)
+    data = {}
+    for name in store.names:
+        data[name] = {"embedding": store.vectors([name])[0].tolist(), **store.metadata.get(name, {})}
+    with open(json_file, "w") as f:
+        json.dump(data, f)
+
+
+def is_stale(prefix, source_file):
+    """True if the store is missing or older than the file it was converted from."""
+    path = prefix + MATRIX_SUFFIX
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert embedding assets between JSON and the binary store format")
+    commands = parser.add_subparsers(dest="command", required=True)
+    to_binary = commands.add_parser("convert", help="JSON asset -> <prefix>.npy + <prefix>.index.json")
+    to_binary.add_argument("json_file")
+    to_binary.add_argument("prefix")
+    to_binary.add_argument("--dtype", choices=["float16", "float32"], default="float16")
+    to_binary.add_argument("--no-normalize", action="store_true")
+    to_json = commands.add_parser("to-json", help="binary store -> JSON asset")
+    to_json.add_argument("prefix")
+    to_json.add_argument("json_file")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        convert_json(args.json_file, args.prefix, dtype=args.dtype, normalize=not args.no_normalize)
+        print(f"Wrote {args.prefix}{MATRIX_SUFFIX} and {args.prefix}{INDEX_SUFFIX}")
+    else:
+        export_json(args.prefix, args.json_file)
+        print(f"Wrote {args.json_file}")
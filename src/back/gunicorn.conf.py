@@ -0,0 +1,38 @@
+# Production server settings, run from src/back:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#
+# The app is imported once in the master (preload_app), so the intent encoder and
+# the memory-mapped embedding stores are shared copy-on-write by every worker.
+# Each worker re-opens its own Mongo client and SQLite connections in post_fork.
+#
+# Graceful reloads:
+#   kill -HUP <master>     new workers from the already loaded code, old ones finish their requests
+#   kill -USR2 <master>    deploy new code: starts a new master beside the old one,
+#   kill -WINCH <old>      then drain the old workers and kill -TERM <old> once the new one serves
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", 8))                             # SSE chat streams hold a thread each
+preload_app = True
+timeout = 120                                                           # a report can wait on several LLM calls
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 2000))                # recycle workers to bound memory growth
+max_requests_jitter = 200
+
+
+def pre_fork(server, worker):
+    import main
+    main.before_fork()
+
+
+def post_fork(server, worker):
+    import main
+    main.after_fork()
+
+
+def worker_exit(server, worker):
+    import main
+    main.worker_exit()
@@ -1,14 +1,19 @@
-import numpy as np
+from functools import lru_cache
 import hashlib
-import random
 import base64
 
+IDENTICON_CACHE_SIZE = 2048
+
 class IdentIcon:
     @staticmethod
     def generate_identicon_svg(mongo_key, size=84, grid_size=7):
         """
         Generates a perfectly aligned GitHub-style identicon as an SVG.
 
+        The pattern and colours are read straight from the key's SHA-256 bytes, so
+        generation is deterministic and keeps no global RNG state (safe to call from
+        any thread). Rendered SVGs are memoised per (key, size, grid_size).
+
         Args:
         - mongo_key (str): Unique MongoDB key (ObjectId or UUID).
         - size (int): Image size in pixels (default 84px for perfect grid alignment).
@@ -17,45 +22,68 @@ class IdentIcon:
         Returns:
         - Base64-encoded SVG string representing the identicon.
         """
-        # Create a deterministic hash
-        key_hash = hashlib.sha256(mongo_key.encode()).hexdigest()
+        return _render_identicon(mongo_key, size, grid_size)
+
+    @staticmethod
+    def etag(svg_b64):
+        """Strong ETag for a rendered identicon."""
+        return hashlib.sha256(svg_b64.encode()).hexdigest()[:32]
+
+    @staticmethod
+    def cache_info():
+        info = _render_identicon.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+
+def _hash_bits(digest, count):
+    # bits of the digest (after the 7 colour bytes), cycling if the grid needs more than it has
+    bits = []
+    stream = digest[7:]
+    while len(bits) < count:
+        for byte in stream:
+            bits.extend((byte >> shift) & 1 for shift in range(7, -1, -1))
+        stream = hashlib.sha256(stream).digest()
+    return bits[:count]
 
-        # Use hash to generate a consistent random seed
-        seed = int(key_hash[:8], 16)
-        random.seed(seed)
 
-        # Generate a symmetrical pattern
-        binary_pattern = [random.randint(0, 1) for _ in range(grid_size * (grid_size // 2 + 1))]
-        pattern = np.array(binary_pattern).reshape((grid_size, grid_size // 2 + 1))
+@lru_cache(maxsize=IDENTICON_CACHE_SIZE)
+def _render_identicon(mongo_key, size, grid_size):
+    # Create a deterministic hash
+    digest = hashlib.sha256(mongo_key.encode()).digest()
 
-        # Mirror horizontally to get symmetry
-        pattern = np.hstack([pattern, pattern[:, :-1][:, ::-1]])
+    # Generate a symmetrical pattern: the left half plus the middle column, mirrored
+    half = grid_size // 2 + 1
+    bits = _hash_bits(digest, grid_size * half)
+    rows = []
+    for y in range(grid_size):
+        left = bits[y * half:(y + 1) * half]
+        rows.append(left + left[:-1][::-1])
 
-        # Generate a random color with fixed-seed randomness
-        r = (int(key_hash[8:10], 16) + random.randint(50, 150)) % 256
-        g = (int(key_hash[10:12], 16) + random.randint(50, 150)) % 256
-        b = (int(key_hash[12:14], 16) + random.randint(50, 150)) % 256
-        fill_color = f"rgb({r},{g},{b})"
+    # Colour from the hash bytes, offset by 50-150 like before
+    r = (digest[4] + 50 + digest[0] % 101) % 256
+    g = (digest[5] + 50 + digest[1] % 101) % 256
+    b = (digest[6] + 50 + digest[2] % 101) % 256
+    fill_color = f"rgb({r},{g},{b})"
 
-        # Background color
-        comp_r, comp_g, comp_b = 255 - r, 255 - g, 255 - b
-        bg_color = f"rgb({comp_r},{comp_g},{comp_b})"
+    # Background color
+    comp_r, comp_g, comp_b = 255 - r, 255 - g, 255 - b
+    bg_color = f"rgb({comp_r},{comp_g},{comp_b})"
 
-        # Ensure perfect fit: cell size must be evenly divisible
-        cell_size = size // grid_size  # Ensures each cell is an integer size
-        padding = (size - (cell_size * grid_size)) // 2  # Auto-center the grid
+    # Ensure perfect fit: cell size must be evenly divisible
+    cell_size = size // grid_size  # Ensures each cell is an integer size
+    padding = (size - (cell_size * grid_size)) // 2  # Auto-center the grid
 
-        # SVG content with background
-        svg_elements = [f'<rect width="{size}" height="{size}" fill="{bg_color}"/>']
+    # SVG content with background
+    svg_elements = [f'<rect width="{size}" height="{size}" fill="{bg_color}"/>']
 
-        for y in range(grid_size):
-            for x in range(grid_size):
-                if pattern[y, x] == 1:
-                    rect_x, rect_y = padding + x * cell_size, padding + y * cell_size
-                    svg_elements.append(
-                        f'<rect x="{rect_x}" y="{rect_y}" width="{cell_size}" height="{cell_size}" fill="{fill_color}"/>'
-                    )
+    for y, row in enumerate(rows):
+        for x, cell in enumerate(row):
+            if cell:
+                rect_x, rect_y = padding + x * cell_size, padding + y * cell_size
+                svg_elements.append(
+                    f'<rect x="{rect_x}" y="{rect_y}" width="{cell_size}" height="{cell_size}" fill="{fill_color}"/>'
+                )
 
-        svg_content = f'<svg width="{size}" height="{size}" xmlns="http://www.w3.org/2000/svg">{"".join(svg_elements)}</svg>'
+    svg_content = f'<svg width="{size}" height="{size}" xmlns="http://www.w3.org/2000/svg">{"".join(svg_elements)}</svg>'
 
-        return base64.b64encode(svg_content.encode()).decode()
+    return base64.b64encode(svg_content.encode()).decode()
@@ -0,0 +1,248 @@
+from contextlib import contextmanager
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    Persistent background job queue with a bounded worker pool.
+
+    Jobs are stored in SQLite, so jobs that were queued or running when the process
+    stopped are queued again on start. Workers start lazily on the first enqueue
+    (or start()) so importing the app never spawns threads. Several processes may
+    share one database: a job is claimed atomically, and a running job is only
+    requeued once the process that claimed it has exited.
+
+    Args:
+    - handler (callable): handler(payload) -> (result, status_code); status_code >= 400 marks the job failed.
+    - db_path (str): SQLite file for persistence.
+    - workers (int): Jobs processed at once.
+    - max_pending (int): Queued jobs accepted before enqueue() raises QueueFull.
+    - keep_finished (float): Seconds finished jobs stay available for status queries.
+    """
+    def __init__(self, handler, db_path='jobs.db', workers=2, max_pending=1000, keep_finished=24 * 60 * 60):
+        self.handler = handler
+        self.db_path = db_path
+        self.workers = workers
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self.counters = {"enqueued": 0, "completed": 0, "failed": 0, "requeued": 0,
+                         "wait_seconds": 0.0, "run_seconds": 0.0, "max_wait_seconds": 0.0}
+        self._ready = queue.Queue()
+        self._changed = threading.Condition()
+        self._changes = 0                                               # status transitions seen, guarded by _changed
+        self._threads = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.create_table()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        # one connection per thread; job rows are small and writes are rare
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        yield conn
+
+    def create_table(self):
+        with self._connection() as conn, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    payload_json TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result_json TEXT,
+                    status_code INTEGER,
+                    created REAL NOT NULL,
+                    started REAL,
+                    finished REAL,
+                    worker INTEGER
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+            if "worker" not in [row["name"] for row in conn.execute("PRAGMA table_info(jobs)")]:
+                conn.execute("ALTER TABLE jobs ADD COLUMN worker INTEGER")
+
+    def start(self):
+        """Requeues unfinished jobs from an earlier run and starts the workers; safe to call repeatedly."""
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            with self._connection() as conn, conn:
+                conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished < ?",
+                             (DONE, FAILED, time.time() - self.keep_finished))
+                # nothing runs here yet, so jobs under our own pid are from an earlier process that had it
+                orphaned = [row["id"] for row in conn.execute("SELECT id, worker FROM jobs WHERE status=?", (RUNNING,))
+                            if row["worker"] == os.getpid() or not _alive(row["worker"])]
+                conn.executemany("UPDATE jobs SET status=?, started=NULL, worker=NULL WHERE id=? AND status=?",
+                                 [(QUEUED, job_id, RUNNING) for job_id in orphaned])
+                pending = [row["id"] for row in conn.execute(
+                    "SELECT id FROM jobs WHERE status=? ORDER BY created", (QUEUED,))]
+            for job_id in pending:
+                self._ready.put(job_id)
+            self.counters["requeued"] += len(pending)
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, owner, payload):
+        """Stores a job and returns its id; raises QueueFull when max_pending jobs are waiting."""
+        self.start()
+        if self._ready.qsize() >= self.max_pending:
+            raise QueueFull(f"{self.max_pending} jobs already queued")
+        job_id = uuid.uuid4().hex
+        with self._connection() as conn, conn:
+            conn.execute("INSERT INTO jobs (id, owner, payload_json, status, created) VALUES (?, ?, ?, ?, ?)",
+                         (job_id, str(owner), json.dumps(payload), QUEUED, time.time()))
+        with self._lock:
+            self.counters["enqueued"] += 1
+        self._ready.put(job_id)
+        return job_id
+
+    def get(self, job_id, owner):
+        """
+        Returns {"job_id", "status", "position", "result", "status_code"} for the
+        owner's job, or None if it does not exist or belongs to someone else.
+        """
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+            if row is None or row["owner"] != str(owner):
+                return None
+            position = None
+            if row["status"] == QUEUED:
+                position = conn.execute("SELECT COUNT(*) FROM jobs WHERE status=? AND created < ?",
+                                        (QUEUED, row["created"])).fetchone()[0]
+        return {
+            "job_id": job_id,
+            "status": row["status"],
+            "position": position,
+            "result": json.loads(row["result_json"]) if row["result_json"] else None,
+            "status_code": row["status_code"],
+        }
+
+    def wait(self, job_id, owner, last_status=None, timeout=15):
+        """Blocks until the job's status differs from last_status or timeout passes, then returns get()."""
+        deadline = time.monotonic() + timeout
+        while True:
+            # read the job outside the condition so waiters never hold up the workers' notify
+            with self._changed:
+                seen = self._changes
+            job = self.get(job_id, owner)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] != last_status or remaining <= 0:
+                return job
+            # local workers notify; poll too in case another process runs the job
+            with self._changed:
+                if self._changes == seen:
+                    self._changed.wait(min(remaining, 1.0))
+
+    def stats(self):
+        with self._connection() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        with self._lock:
+            finished = self.counters["completed"] + self.counters["failed"]
+            return {
+                **self.counters,
+                "depth": counts.get(QUEUED, 0),
+                "running": counts.get(RUNNING, 0),
+                "workers": self.workers,
+                "mean_wait_seconds": self.counters["wait_seconds"] / finished if finished else 0.0,
+                "mean_run_seconds": self.counters["run_seconds"] / finished if finished else 0.0,
+            }
+
+    def close(self):
+        """Closes the calling thread's connection, e.g. in a pre-fork master before forking."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def after_fork(self):
+        """Resets per-process state in a forked worker: connections and worker threads are not inherited."""
+        self._ready = queue.Queue()
+        self._changed = threading.Condition()
+        self._changes = 0
+        self._threads = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _claim(self, job_id, started):
+        """Marks a queued job as running by this process; False if another worker got it first."""
+        with self._connection() as conn, conn:
+            claimed = conn.execute("UPDATE jobs SET status=?, started=?, worker=? WHERE id=? AND status=?",
+                                   (RUNNING, started, os.getpid(), job_id, QUEUED)).rowcount == 1
+        if claimed:
+            with self._changed:
+                self._changes += 1
+                self._changed.notify_all()
+        return claimed
+
+    def _set(self, job_id, **fields):
+        assignments = ", ".join(f"{key}=?" for key in fields)
+        with self._connection() as conn, conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id=?", (*fields.values(), job_id))
+        with self._changed:
+            self._changes += 1
+            self._changed.notify_all()
+
+    def _work(self):
+        while True:
+            job_id = self._ready.get()
+            with self._connection() as conn:
+                row = conn.execute("SELECT payload_json, status, created FROM jobs WHERE id=?", (job_id,)).fetchone()
+            if row is None or row["status"] != QUEUED:
+                continue
+
+            started = time.time()
+            if not self._claim(job_id, started):
+                continue
+            try:
+                result, status_code = self.handler(json.loads(row["payload_json"]))
+            except Exception as e:
+                print(f"Error: job {job_id} failed: {e}")
+                result, status_code = {"error": str(e)}, 500
+            finished = time.time()
+            status = DONE if status_code < 400 else FAILED
+            self._set(job_id, status=status, result_json=json.dumps(result), status_code=status_code,
+                      finished=finished)
+
+            with self._lock:
+                self.counters["completed" if status == DONE else "failed"] += 1
+                self.counters["wait_seconds"] += started - row["created"]
+                self.counters["run_seconds"] += finished - started
+                self.counters["max_wait_seconds"] = max(self.counters["max_wait_seconds"], started - row["created"])
+
+
+def _alive(pid):
+    """True if a process with this pid is still running (on this host)."""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -1,31 +1,266 @@
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from google.api_core import exceptions as google_exceptions
 
+import asyncio
+import hashlib
+import json
 import os
+import queue
+import random
+import threading
+import time
 from dotenv import load_dotenv
+from conversation_context import estimate_tokens
+from metrics import LLM_ERRORS, LLM_LATENCY, LLM_RETRIES, LLM_TOKENS, log_event
+
+SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+}
+
+GENERATION_CONFIG = {
+    "temperature": 1,
+    "top_p": 0.95,
+    "top_k": 39,
+    "max_output_tokens": 8192,
+    "response_mime_type": "application/json",
+}
+
+
+class GeminiBackend():
+    """Gemini backend holding one configured GenerativeModel for the life of the process."""
+    retryable_errors = (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+        ConnectionError,
+        TimeoutError,
+    )
+
+    def __init__(self, model_name="gemini-1.5-flash", api_key=None, timeout=30.0) -> None:
+        genai.configure(api_key=api_key)
+        self.client = genai.GenerativeModel(
+            model_name=model_name,
+            safety_settings=SAFETY_SETTINGS,
+            generation_config=GENERATION_CONFIG,
+        )
+        self.timeout = timeout
+
+    def generate(self, message):
+        response = self.client.generate_content([message], request_options={"timeout": self.timeout})
+        return response.text
+
+    def stream(self, message):
+        response = self.client.generate_content([message], stream=True, request_options={"timeout": self.timeout})
+        for chunk in response:
+            if chunk.parts:
+                yield chunk.text
+
+
+class StubBackend():
+    """
+    Local deterministic stand-in for Gemini, used by tests and benchmarks.
+
+    Args:
+    - latency (float): Seconds to sleep before answering.
+    - failure_rate (float): Probability of raising a retryable ConnectionError.
+    - seed (int): Seed for the failure injection RNG.
+    - responder (callable): Optional prompt -> text function replacing the canned replies.
+    """
+    retryable_errors = (ConnectionError,)
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=0, responder=None) -> None:
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.responder = responder or stub_response
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, message):
+        if self.latency:
+            time.sleep(self.latency)
+        self._maybe_fail()
+        return self.responder(message)
+
+    def stream(self, message, chunk_size=16):
+        self._maybe_fail()
+        text = self.responder(message)
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        for chunk in chunks:
+            # spread the configured latency over the chunks like a real token stream
+            if self.latency:
+                time.sleep(self.latency / len(chunks))
+            yield chunk
+
+    def _maybe_fail(self):
+        with self._lock:
+            failed = self._rng.random() < self.failure_rate
+        if failed:
+            raise ConnectionError("stub backend injected failure")
+
+
+def stub_response(message):
+    """Canned, prompt-dependent JSON reply; the same prompt always yields the same text."""
+    rng = random.Random(hashlib.sha256(message.encode()).digest())
+    if "'Report'" in message:
+        score = lambda: rng.randint(0, 10)
+        return json.dumps({"Report": {
+            "Result": {"Positive": "Asked relevant questions.", "Negative": "Missed a red flag."},
+            "categories": {
+                "Medical Competency": {
+                    "Symptoms Relevance": score(),
+                    "Clinical Reasoning": score(),
+                    "RED flag identification": score(),
+                    "Prescription understanding": score(),
+                },
+                "Communication style": score(),
+                "Presentation Quality": score(),
+                "Correctly Diagnosed": rng.randint(0, 1),
+            },
+        }})
+    if "virtual patient" in message:
+        return json.dumps({"message": rng.choice([
+            "It started about three days ago.",
+            "The pain gets worse at night.",
+            "No, I have not taken any medication yet.",
+        ])})
+    locations = ["Head", "Respiratory", "Cardiovascular", "Gastrointestinal", "Neurological"]
+    return json.dumps([
+        {
+            "name": f"Symptom {i + 1}",
+            "description": "Generated by the stub backend",
+            "severity": rng.randint(0, 5),
+            "location": rng.choice(locations),
+        }
+        for i in range(rng.randint(3, 6))
+    ])
+
 
 class LLM():
-    def __init__(self) -> None:
-        pass
-    def model(self, message):
+    """
+    Long-lived LLM client shared by every request.
+
+    The backend is built once; each call is capped by a concurrency semaphore and
+    retried with exponential backoff on transient errors. Defaults come from the
+    environment (LLM_BACKEND, LLM_MODEL, LLM_TIMEOUT, LLM_MAX_RETRIES,
+    LLM_RETRY_BACKOFF, LLM_MAX_CONCURRENCY, LLM_QUEUE_TIMEOUT).
+    """
+    def __init__(self, backend=None, max_retries=None, backoff=None, max_concurrency=None, queue_timeout=None) -> None:
         load_dotenv()
-        model = genai.GenerativeModel(model_name="gemini-1.5-flash")
-        genai.configure(api_key=os.getenv("key"))
-        generation_config = {
-            "temperature": 1,
-            "top_p": 0.95,
-            "top_k": 39,
-            "max_output_tokens": 8192,
-            "response_mime_type": "application/json",
-        }
+        self.backend = backend or self._backend_from_env()
+        self.max_retries = int(max_retries if max_retries is not None else os.getenv("LLM_MAX_RETRIES", 2))
+        self.backoff = float(backoff if backoff is not None else os.getenv("LLM_RETRY_BACKOFF", 0.5))
+        self.max_concurrency = int(max_concurrency or os.getenv("LLM_MAX_CONCURRENCY", 8))
+        self.queue_timeout = float(queue_timeout or os.getenv("LLM_QUEUE_TIMEOUT", 30))
+        self.semaphore = threading.BoundedSemaphore(self.max_concurrency)
+
+    @staticmethod
+    def _backend_from_env():
+        if os.getenv("LLM_BACKEND", "gemini").lower() == "stub":
+            return StubBackend(
+                latency=float(os.getenv("LLM_STUB_LATENCY", 0)),
+                failure_rate=float(os.getenv("LLM_STUB_FAILURE_RATE", 0)),
+            )
+        return GeminiBackend(
+            model_name=os.getenv("LLM_MODEL", "gemini-1.5-flash"),
+            api_key=os.getenv("key"),
+            timeout=float(os.getenv("LLM_TIMEOUT", 30)),
+        )
 
+    def model(self, message):
+        started = time.perf_counter()
+        LLM_TOKENS.inc(estimate_tokens(message), direction="prompt")
         try:
-            response = model.generate_content([message], safety_settings={
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-            }, generation_config=generation_config)
-            return response.text
+            text = self._generate(message)
         except Exception as e:
-            print( f"Error: {e}")
\ No newline at end of file
+            LLM_ERRORS.inc(error=type(e).__name__)
+            LLM_LATENCY.observe(time.perf_counter() - started, mode="generate", outcome="error")
+            log_event("llm_generate_failed", component="llm", mode="generate", error=type(e).__name__, message=str(e))
+            return None
+        LLM_LATENCY.observe(time.perf_counter() - started, mode="generate", outcome="ok")
+        LLM_TOKENS.inc(estimate_tokens(text or ""), direction="completion")
+        return text
+
+    def stream(self, message):
+        """
+        Yields the reply as text chunks while it is generated.
+
+        The model stream is read into a buffer on its own thread, so the concurrency
+        slot is released as soon as generation ends, however slowly the caller reads.
+        Transient errors are retried only until the first chunk has been received.
+        """
+        LLM_TOKENS.inc(estimate_tokens(message), direction="prompt")
+        chunks = queue.Queue()
+        cancelled = threading.Event()
+        threading.Thread(target=self._pump, args=(message, chunks, cancelled), name="llm-stream", daemon=True).start()
+        try:
+            while True:
+                kind, value = chunks.get()
+                if kind == "chunk":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            # a caller that stops early (e.g. a disconnected client) also stops the model stream
+            cancelled.set()
+
+    def _pump(self, message, chunks, cancelled):
+        """Reads the backend stream into `chunks` as ("chunk", text) items, ending with ("done", None) or ("error", e)."""
+        attempt = 0
+        timer = time.perf_counter()
+        try:
+            while True:
+                if not self.semaphore.acquire(timeout=self.queue_timeout):
+                    LLM_ERRORS.inc(error="TimeoutError")
+                    raise TimeoutError("LLM concurrency limit reached")
+                started = False
+                try:
+                    for chunk in self.backend.stream(message):
+                        started = True
+                        LLM_TOKENS.inc(estimate_tokens(chunk), direction="completion")
+                        chunks.put(("chunk", chunk))
+                        if cancelled.is_set():
+                            break
+                    LLM_LATENCY.observe(time.perf_counter() - timer, mode="stream", outcome="ok")
+                    break
+                except self.backend.retryable_errors as e:
+                    if started or attempt >= self.max_retries:
+                        LLM_ERRORS.inc(error=type(e).__name__)
+                        LLM_LATENCY.observe(time.perf_counter() - timer, mode="stream", outcome="error")
+                        raise
+                finally:
+                    self.semaphore.release()
+                LLM_RETRIES.inc()
+                if cancelled.wait(self.backoff * (2 ** attempt) * (1 + random.random())):
+                    break
+                attempt += 1
+            chunks.put(("done", None))
+        except Exception as e:
+            chunks.put(("error", e))
+
+    async def amodel(self, message):
+        """Async entry point; runs the blocking call in a worker thread."""
+        return await asyncio.to_thread(self.model, message)
+
+    def _generate(self, message):
+        attempt = 0
+        while True:
+            if not self.semaphore.acquire(timeout=self.queue_timeout):
+                raise TimeoutError("LLM concurrency limit reached")
+            try:
+                return self.backend.generate(message)
+            except self.backend.retryable_errors:
+                if attempt >= self.max_retries:
+                    raise
+            finally:
+                self.semaphore.release()
+            # back off outside the semaphore so waiting callers can use the slot
+            LLM_RETRIES.inc()
+            time.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+            attempt += 1
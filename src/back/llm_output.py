@@ -0,0 +1,184 @@
+import json
+import threading
+import time
+from metrics import log_event
+
+
+def strip_fences(text):
+    """Drops markdown code fences and any prose around the outermost JSON value."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text.strip()
+    start = min(starts)
+    end = max(text.rfind("}"), text.rfind("]"))
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def remove_trailing_commas(text):
+    """Removes commas directly before a closing } or ], leaving string contents untouched."""
+    out = []
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ",":
+            rest = text[i + 1:].lstrip()
+            if rest[:1] in ("}", "]"):
+                continue
+        out.append(char)
+    return "".join(out)
+
+
+def coerce(data, schema):
+    """
+    Returns (data, changed): numeric strings such as "3" become numbers where the
+    schema expects a number, and numbers outside minimum/maximum are clamped.
+    """
+    schema_type = schema.get("type")
+    if schema_type == "object" and isinstance(data, dict):
+        properties = schema.get("properties", {})
+        changed = False
+        result = {}
+        for key, value in data.items():
+            if key in properties:
+                value, value_changed = coerce(value, properties[key])
+                changed = changed or value_changed
+            result[key] = value
+        return result, changed
+
+    if schema_type == "array" and isinstance(data, list):
+        items = schema.get("items", {})
+        coerced = [coerce(item, items) for item in data]
+        return [item for item, _ in coerced], any(changed for _, changed in coerced)
+
+    if schema_type == "number" and not isinstance(data, bool):
+        value = data
+        if isinstance(value, str):
+            try:
+                value = float(value.strip())
+            except ValueError:
+                return data, False
+            if value.is_integer():
+                value = int(value)
+        if not isinstance(value, (int, float)):
+            return data, False
+        if "minimum" in schema and value < schema["minimum"]:
+            value = schema["minimum"]
+        if "maximum" in schema and value > schema["maximum"]:
+            value = schema["maximum"]
+        return value, value is not data
+
+    return data, False
+
+
+class LLMOutput:
+    """
+    Turns raw LLM text into schema-valid data, trying the cheap fixes first.
+
+    1. json.loads + validate;
+    2. local repairs: strip code fences, drop trailing commas, coerce numeric
+       strings and clamp out-of-range numbers to the schema;
+    3. one targeted re-ask with the validator's error attached, only if another LLM
+       call still fits in `budget` seconds.
+
+    Outcomes are counted per endpoint (see stats()), and every rejection is logged
+    as an "llm_output_rejected" event.
+    """
+    OUTCOMES = ("valid", "repaired", "retried", "failed")
+
+    def __init__(self, llm, budget=20.0, max_retries=1):
+        self.llm = llm
+        self.budget = budget
+        self.max_retries = max_retries
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, validator, endpoint):
+        """Calls the LLM and returns schema-valid data, or None."""
+        started = time.monotonic()
+        text = self.llm.model(prompt)
+        call_seconds = time.monotonic() - started
+        data, error, repaired = self._parse(text, validator)
+
+        retries = 0
+        while error is not None and text is not None and retries < self.max_retries:
+            # only re-ask if another call of the same length still fits in the budget
+            if time.monotonic() - started + call_seconds > self.budget:
+                break
+            retries += 1
+            retry_prompt = (f"{prompt}\n\nYour previous answer was rejected: {error}\n"
+                            "Reply again with only the corrected JSON, matching the requested schema exactly.")
+            text = self.llm.model(retry_prompt)
+            data, error, repaired = self._parse(text, validator)
+
+        if error is not None:
+            log_event("llm_output_rejected", endpoint=endpoint, error=error, retries=retries)
+            self._count(endpoint, "failed")
+            return None
+        self._count(endpoint, "retried" if retries else "repaired" if repaired else "valid")
+        return data
+
+    def repair(self, text, validator, endpoint):
+        """Local repairs only (no LLM call), e.g. for an already streamed reply. Returns data or None."""
+        data, error, repaired = self._parse(text, validator)
+        if error is not None:
+            log_event("llm_output_rejected", endpoint=endpoint, error=error, retries=0)
+            self._count(endpoint, "failed")
+            return None
+        self._count(endpoint, "repaired" if repaired else "valid")
+        return data
+
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for endpoint, counts in self.counters.items():
+                total = sum(counts.values())
+                stats[endpoint] = {
+                    **counts,
+                    "repair_rate": counts["repaired"] / total if total else 0.0,
+                    "retry_rate": counts["retried"] / total if total else 0.0,
+                }
+            return stats
+
+    def _count(self, endpoint, outcome):
+        with self._lock:
+            counts = self.counters.setdefault(endpoint, dict.fromkeys(self.OUTCOMES, 0))
+            counts[outcome] += 1
+
+    @staticmethod
+    def _parse(text, validator):
+        """Returns (data, error, repaired); error is None when data is valid."""
+        if text is None:
+            return None, "no response from the model", False
+        try:
+            data = json.loads(text)
+            error = validator.validate(data)
+            if error is None:
+                return data, None, False
+        except (json.JSONDecodeError, TypeError):
+            pass
+        except Exception as e:
+            return None, str(e), False
+
+        try:
+            data = json.loads(remove_trailing_commas(strip_fences(text)))
+        except json.JSONDecodeError as e:
+            return None, f"invalid JSON: {e}", False
+        data, _ = coerce(data, validator.schema)
+        try:
+            error = validator.validate(data)
+        except Exception as e:
+            error = str(e)
+        return (data, None, True) if error is None else (None, error, False)
@@ -1,8 +1,8 @@
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, Response, g, request, jsonify, make_response, stream_with_context
 from flask_cors import CORS
 from flask_pymongo import PyMongo
 from flask_bcrypt import Bcrypt
-from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required, JWTManager, unset_jwt_cookies, decode_token
+from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required, JWTManager, unset_jwt_cookies
 from datetime import timedelta
 from bson import ObjectId
 from dotenv import load_dotenv
@@ -10,20 +10,76 @@ from chatbot.inference import IntentClassifier
 from identity_icon import IdentIcon
 from schema_validation import SchemaValidator
 from symptom_cache import SymptomCache
+from streaming import MessageFieldExtractor, sse_event
 from llm import LLM
+from llm_output import LLMOutput
+from single_flight import SingleFlight, prompt_key
+from cache_warmer import CacheWarmer
+from semantic_cache import SemanticSymptomCache
+from disease_matcher import DiseaseMatcher
+from decision_tree import DecisionTree
+from diagnosis_scorer import DiagnosisScorer
+from symptom_quality import SymptomQualityGate
+from user_cache import UserCache
+from conversation_context import ConversationContext
+from session_store import SessionStore
+from job_queue import JobQueue, QueueFull
+from metrics import REGISTRY, CONTENT_TYPE, HTTP_LATENCY, HTTP_REQUESTS, MongoCommandTimer, log_event, log_request, stats_callback
+from reports import REPORT_PAGE_SIZE, REPORT_PROJECTION, REPORT_SORT, ensure_report_indexes, fetch_report_page, count_reports
+from reports import update_report_summary, rebuild_report_summary, format_report_summary
 from datetime import datetime
 import datetime
 import random
 import hashlib
 import base64
 import json
+import fcntl
+import gc
+import logging
 import os
+import sys
+import time
 from wsgiref import validate
 
 # constants
-SYMPTOM_DB_CACHE_THRESHOLD = 0.1 # change to original for deployment 0.7
-DB_PATH = 'symptom_cache.db'
+SYMPTOM_DB_CACHE_THRESHOLD = 0.1 # change to original for deployment 0.7; min relevance of a generated set to cache it
+DB_PATH = os.getenv('SYMPTOM_CACHE_DB', 'symptom_cache.db')
+SESSION_DB_PATH = os.getenv('SESSION_DB', 'sessions.db')
+JOB_DB_PATH = os.getenv('JOB_DB', 'jobs.db')
+REPORT_JOB_WORKERS = 2                                                  # reports evaluated at once in async mode
+REPORT_JOB_MAX_PENDING = 500
+REPORT_JOB_EVENT_TIMEOUT = 15                                           # seconds between SSE keep-alives
+SESSION_CACHE_SIZE = 256                                                # simulation sessions kept in memory
 DB_CACHE_LIMIT_UNIQUE = 10
+DISEASE_CATALOGUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'front', 'medsim-ai-front', 'public', 'model', 'disease_diagnostic_web_data.json')
+EMBEDDINGS_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'front', 'medsim-ai-front', 'public', 'data')
+EMBEDDINGS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'embedding_cache')
+MATCH_TOP_K_LIMIT = 10
+DIAGNOSE_BATCH_LIMIT = 5000                                             # max cases per /diagnose_batch call
+CACHE_STALE_AFTER = 24 * 60 * 60                                        # refresh a disease once its newest cached set is a day old
+CACHE_WARMER_WORKERS = 2
+SEMANTIC_DISEASE_THRESHOLD = 0.9                                        # min cosine similarity to reuse another key's disease
+SEMANTIC_PROFILE_THRESHOLD = 0.9                                        # min cosine similarity to reuse another key's patient profile
+SEMANTIC_KEYS_PER_DISEASE = 32                                          # patient-profile keys cached per disease, least recently used evicted first
+SEMANTIC_MAX_KEYS = 2048                                                # patient-profile keys cached overall
+USER_CACHE_TTL = 300                                                    # seconds a user's username/email is served from memory
+USER_CACHE_SIZE = 1024
+IDENTICON_SIZE_RANGE = (16, 512)                                        # allowed identicon sizes in pixels
+CONTEXT_BUDGET_TOKENS = 600                                             # chat turns kept verbatim in patient prompts
+CONTEXT_SUMMARY_TOKENS = 200                                            # running summary of older turns
+LLM_OUTPUT_BUDGET = 20                                                  # seconds; a re-ask for invalid output must fit in this
+IDENTICON_BATCH_LIMIT = 100                                             # max user ids per /get_identicons call
+SINGLE_FLIGHT_TIMEOUT = 60                                              # seconds to wait on an identical in-flight LLM call
+SINGLE_FLIGHT_MAX_PER_DISEASE = 2                                       # LLM calls running at once for one disease
+WARMER_ELECTION_INTERVAL = 30                                           # seconds between a forked worker's tries to become the cache warmer
+
+# generic patients used when pre-generating symptom sets in the background
+WARMER_PATIENT_PROFILES = [
+    {"age": "35", "gender": "Male", "height": "170", "weight": "70", "bmiType": "Healthy"},
+    {"age": "42", "gender": "Female", "height": "162", "weight": "68", "bmiType": "Overweight"},
+    {"age": "67", "gender": "Male", "height": "175", "weight": "82", "bmiType": "Overweight"},
+    {"age": "24", "gender": "Female", "height": "165", "weight": "52", "bmiType": "Healthy"},
+]
 
 # sample schema
 sample_schema = {
@@ -54,25 +110,112 @@ sample_schema_bot = {
   "additionalProperties": False
 }
 
+# JSON schema for validating the LLM report
+REPORT_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["Report"],
+    "properties": {
+        "Report": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["Result", "categories"],
+            "properties": {
+                "Result": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["Positive", "Negative"],
+                    "properties": {
+                        "Positive": {"type": "string"},
+                        "Negative": {"type": "string"}
+                    }
+                },
+                "categories": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["Medical Competency", "Communication style", "Presentation Quality", "Correctly Diagnosed"],
+                    "properties": {
+                        "Medical Competency": {
+                            "type": "object",
+                            "additionalProperties": False,
+                            "properties": {
+                                "Symptoms Relevance": {"type": "number", "minimum": 0, "maximum": 10},
+                                "Clinical Reasoning": {"type": "number", "minimum": 0, "maximum": 10},
+                                "RED flag identification": {"type": "number", "minimum": 0, "maximum": 10},
+                                "Prescription understanding": {"type": "number", "minimum": 0, "maximum": 10}
+                            },
+                            "required": ["Symptoms Relevance", "Clinical Reasoning", "RED flag identification", "Prescription understanding"]
+                        },
+                        "Communication style": {"type": "number", "minimum": 0, "maximum": 10},
+                        "Presentation Quality": {"type": "number", "minimum": 0, "maximum": 10},
+                        "Correctly Diagnosed": {"type": "number", "minimum": 0, "maximum": 1}
+                    }
+                }
+            }
+        }
+    }
+}
+
 
 # init Symptom Cache DB
 db_symptom_cache = SymptomCache(DB_PATH, DB_CACHE_LIMIT_UNIQUE)
 
+# simulation sessions: scenario + chat turns, so clients only send a session id
+session_store = SessionStore(SESSION_DB_PATH, SESSION_CACHE_SIZE)
+
 
 #load Intentclassifier
 intent_classifier = IntentClassifier()
 
+# profile-aware cache keys, embedded with the intent encoder
+semantic_symptom_cache = SemanticSymptomCache(
+    db_symptom_cache,
+    intent_classifier.encode,
+    disease_threshold=SEMANTIC_DISEASE_THRESHOLD,
+    profile_threshold=SEMANTIC_PROFILE_THRESHOLD,
+    max_keys_per_disease=SEMANTIC_KEYS_PER_DISEASE,
+    max_keys=SEMANTIC_MAX_KEYS,
+)
+
+# generated symptom sets are only cached if they embed close to the disease and its known symptoms
+symptom_gate = SymptomQualityGate.load(DISEASE_CATALOGUE_PATH, intent_classifier.encode, threshold=SYMPTOM_DB_CACHE_THRESHOLD)
+
 #initialise llm
 llm = LLM()
 
+# parses LLM replies against a schema: local JSON repairs first, then one targeted re-ask
+llm_output = LLMOutput(llm, budget=LLM_OUTPUT_BUDGET)
+
+# identical concurrent generations share one LLM call; each disease gets a bounded share of the LLM slots
+single_flight = SingleFlight(timeout=SINGLE_FLIGHT_TIMEOUT, max_per_group=SINGLE_FLIGHT_MAX_PER_DISEASE)
+
+# recent chat turns verbatim, older ones folded into a cached running summary
+conversation_context = ConversationContext(budget_tokens=CONTEXT_BUDGET_TOKENS, summary_tokens=CONTEXT_SUMMARY_TOKENS)
+
+# symptom -> disease similarity search over the DiseaseCraft embeddings
+disease_matcher = DiseaseMatcher(os.path.join(EMBEDDINGS_DATA_DIR, 'diseases.json'),
+                                 os.path.join(EMBEDDINGS_DATA_DIR, 'symptoms.json'),
+                                 EMBEDDINGS_CACHE_DIR)
+
+# yes/no questioning for the Decision-Tree Explorer over the prevalence matrix
+decision_tree = DecisionTree.load(DISEASE_CATALOGUE_PATH)
+
+# naive-Bayes differential over the same matrix, one matrix product per case or batch
+diagnosis_scorer = DiagnosisScorer.load(DISEASE_CATALOGUE_PATH)
+
 # init schema validator
 schema_validator = SchemaValidator(sample_schema)
 schema_validator_bot = SchemaValidator(sample_schema_bot)
+schema_validator_report = SchemaValidator(REPORT_SCHEMA)
 
 #loading variables from .env
 load_dotenv()
 mongo_pass = os.getenv('mongo')                                         # api key for mongodb
 secret = os.getenv('secret')                                            # JWT secret key
+CACHE_WARMER_ENABLED = os.getenv('CACHE_WARMER', '1') == '1'           # pre-generate symptom sets off the request path
+CACHE_WARMER_CALLS_PER_MINUTE = int(os.getenv('CACHE_WARMER_CALLS_PER_MINUTE', 10))
+REQUEST_LOG = os.getenv('REQUEST_LOG', '0') == '1'                     # one JSON timing line per request
+WORKER_TORCH_THREADS = int(os.getenv('WORKER_TORCH_THREADS', 1))        # intra-op threads per forked worker
 
 #constats
 DB_CLUSTER = 'cluster0'
@@ -81,19 +224,30 @@ MONGO_USERNAME = 'abhigyanpandeycug'
 
 # flask initialisation
 app = Flask(__name__)
-CORS(app, supports_credentials=True, origins='*', allow_headers=['Content-Type', 'Authorization','Set-Cookie'], methods=['GET', 'POST', 'OPTIONS'])
+CORS(app, supports_credentials=True, origins='*', allow_headers=['Content-Type', 'Authorization','Set-Cookie'], methods=['GET', 'POST', 'OPTIONS'], expose_headers=['X-Session-Id'])
 bcrypt = Bcrypt(app)
 
 # database initialisation
-app.config["MONGO_URI"] = f"mongodb+srv://{MONGO_USERNAME}:{mongo_pass}@{DB_CLUSTER}.o137pc7.mongodb.net/{DATABASE_NAME}?retryWrites=true&w=majority&appName={DB_CLUSTER}"
+app.config["MONGO_URI"] = os.getenv('MONGO_URI') or f"mongodb+srv://{MONGO_USERNAME}:{mongo_pass}@{DB_CLUSTER}.o137pc7.mongodb.net/{DATABASE_NAME}?retryWrites=true&w=majority&appName={DB_CLUSTER}"
+
+def connect_mongo():
+    """(Re)creates the Mongo client; called at import and again in every forked worker."""
+    global mongo, users, profile, profile_summary
+    try:
+        mongo = PyMongo(app, event_listeners=[MongoCommandTimer()])
+        users = mongo.db.users  # Mongo Users Collection
+        profile = mongo.db.profile
+        profile_summary = mongo.db.profile_summary  # per-user score rollups
+    except Exception as e:
+        log_event("mongo_connect_failed", level=logging.ERROR, component="mongo", error=type(e).__name__, message=str(e))
+        exit()
+
+connect_mongo()
 
 try:
-    mongo = PyMongo(app)
-    users = mongo.db.users  # Mongo Users Collection
-    profile = mongo.db.profile
+    ensure_report_indexes(profile)
 except Exception as e:
-    print(f'Error {e},\nError Connecting to database')
-    exit()
+    log_event("report_index_failed", component="reports", error=type(e).__name__, message=str(e))
 
 # flask api configration
 app.config["JWT_SECRET_KEY"] = secret
@@ -106,17 +260,23 @@ app.config["JWT_COOKIE_CSRF_PROTECT"] = False  # Enable CSRF protection for cook
 jwt = JWTManager(app)
 
 # Helper Functions
+def find_user(user_id):
+    user = users.find_one({"_id": ObjectId(user_id)}, {"username": 1, "email": 1, "_id": 0})
+    if not user:
+        return None
+    return user["username"], user["email"]
+
+# user id -> (username, email), so authenticated calls skip the Mongo round-trip
+user_cache = UserCache(find_user, ttl=USER_CACHE_TTL, maxsize=USER_CACHE_SIZE)
+
 def get_username_from_jwt():
-    access_token = request.cookies.get("access_token")
-    if not access_token:
-        return jsonify({"message": "Missing token"}), 401
+    # the token was already verified by @jwt_required(), reuse its identity
     try:
-        decoded_token = decode_token(access_token)
-        user_id = decoded_token["sub"]
-        user = users.find_one({"_id": ObjectId(user_id)}, {"username": 1, "email": 1, "_id": 0})
+        user = user_cache.get(get_jwt_identity())
         if not user:
             return jsonify({"message": "User not found"}), 404
-        return jsonify({"username": user["username"], "email": user["email"]}), 200
+        username, email = user
+        return jsonify({"username": username, "email": email}), 200
     except Exception as e:
         return jsonify({"message": "Invalid token", "error": str(e)}), 401
 
@@ -140,7 +300,8 @@ def signup():
         "email": email,
         "password": hashed_password,
     }
-    users.insert_one(user_data)
+    result = users.insert_one(user_data)
+    user_cache.invalidate(str(result.inserted_id))
 
     return jsonify({"message": "User registered successfully"}), 201
 
@@ -189,14 +350,13 @@ def getusername():
 @app.route("/intent", methods=["POST"])
 @jwt_required()
 def get_intent():
-    print(request.headers)
     data = request.get_json()                                   # Use get_json() to avoid errors
     if "message" not in data:
         return {"error": "Missing 'message' field"}, 400        # Handle missing data
     to_predict = str(data['message'])
-    prediction = intent_classifier.get_intent(to_predict)       # Use instance method
-    print(prediction)
-    return {"intent": f'{prediction}'}                          # Return response as JSON
+    prediction = intent_classifier.classify(to_predict)         # Use instance method
+    g.log_fields = {"intent": prediction["intent"], "confidence": prediction["confidence"]}
+    return prediction                                           # {"intent", "confidence", "top_k"} as JSON
 
 @app.route('/get_identicon', methods=['GET'])
 @jwt_required()
@@ -204,18 +364,84 @@ def get_identicon():
     """
     Fetches the user's identicon using the authenticated JWT user ID.
     """
+    try:
+        size = identicon_size(request.args.get("size", 84))
+    except (TypeError, ValueError):
+        return jsonify({"message": "size must be an integer"}), 400
     try:
         user_id = get_jwt_identity()                            # Extract user ID from JWT token
         mongo_key = str(ObjectId(user_id))                      # Ensure it's in ObjectId format
-        svg_img = IdentIcon.generate_identicon_svg(mongo_key)
+        svg_img = IdentIcon.generate_identicon_svg(mongo_key, size)
+    except Exception as e:
+        return jsonify({"message": "Invalid User ID", "error": str(e)}), 400
+
+    etag = IdentIcon.etag(svg_img)
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
         response = make_response(jsonify({
             "svg": f"data:image/svg+xml;base64,{svg_img}"
         }))
-        # Set cache headers - 24 hours (in seconds)
-        response.headers["Cache-Control"] = "private, max-age=86400"
-        return response
-    except Exception as e:
-        return jsonify({"message": "Invalid User ID", "error": str(e)}), 400
+    response.set_etag(etag)
+    # Set cache headers - 24 hours (in seconds)
+    response.headers["Cache-Control"] = "private, max-age=86400"
+    return response
+
+@app.route('/get_identicons', methods=['POST'])
+@jwt_required()
+def get_identicons():
+    """
+    Returns identicons for many user ids in one call, e.g. for leaderboards.
+    Body: {"user_ids": [...], "size": 84} -> {"identicons": {user_id: svg}, "invalid": [...]}
+    """
+    data = request.get_json() or {}
+    user_ids = data.get("user_ids")
+    if not isinstance(user_ids, list) or not user_ids:
+        return jsonify({"error": "user_ids must be a non-empty list"}), 400
+    if len(user_ids) > IDENTICON_BATCH_LIMIT:
+        return jsonify({"error": "Batch size limit exceeded",
+                        "message": f"at most {IDENTICON_BATCH_LIMIT} user_ids per request, got {len(user_ids)}"}), 400
+    try:
+        size = identicon_size(data.get("size", 84))
+    except (TypeError, ValueError):
+        return jsonify({"error": "size must be an integer"}), 400
+
+    identicons, invalid = {}, []
+    for user_id in dict.fromkeys(map(str, user_ids)):
+        try:
+            mongo_key = str(ObjectId(user_id))
+        except Exception:
+            invalid.append(user_id)
+            continue
+        identicons[user_id] = f"data:image/svg+xml;base64,{IdentIcon.generate_identicon_svg(mongo_key, size)}"
+    response = make_response(jsonify({"identicons": identicons, "invalid": invalid}))
+    response.headers["Cache-Control"] = "private, max-age=86400"
+    return response
+
+def identicon_size(size):
+    low, high = IDENTICON_SIZE_RANGE
+    return min(max(int(size), low), high)
+
+def generate_shared(prompt, validator, endpoint, disease):
+    """llm_output.generate(), with identical concurrent prompts waiting on one call. Raises TimeoutError when busy."""
+    return single_flight.do(prompt_key(endpoint, prompt),
+                            lambda: llm_output.generate(prompt, validator, endpoint),
+                            group=f"disease:{str(disease).lower().strip()}")
+
+def generate_symptoms(disease, patientInfo):
+    """
+    Asks the LLM for a symptom set for the disease and patient.
+    Returns the parsed list if it matches the schema, otherwise None.
+    """
+    locations = "'Head', 'Respiratory', 'Cardiovascular', 'Gastrointestinal', 'Neurological', 'Urinary', 'Hands', 'Legs', 'Reproductive System'"
+    schema = ''' the following is the schema to give the output in {
+      "name": "Headache",
+      "description": "Throbbing pain, primarily in the temples",
+      "severity": 5,
+      "location": "Head"
+    } '''
+    prompt = f"You are A paitent visiting a doctor, your job is to tell the doctor your symptoms for the following disease {disease}. {schema},  also keep in mind that severity should be in numbers datatype not string in json and must be below 5 and non negetive. provide the output in a list of jsons, the following are the possible locations {locations}. Dont give null as location give some system name if its not there, but please try to kepp the names available as much as possible. here is info regarding the paitent to simulate please make symptoms relevent to the charachterstic of the patient ifno: {patientInfo}"
+    return generate_shared(prompt, schema_validator, "get_symptoms", disease)
 
 @app.route('/get_symptoms', methods=['POST'])
 @jwt_required()
@@ -232,43 +458,63 @@ def get_symptoms():
         patientInfo = data.get("Info", None)
         if not patientInfo:
             return jsonify({"error": "patientInfo is required in the request body"}), 400
-        use_cache = random.random() <= 0.7
+        # with the warmer running the cache is always used; it keeps the variants fresh
+        use_cache = cache_warmer is not None or random.random() <= 0.7
         if use_cache:
-            cached = db_symptom_cache.get_cached_symptoms(disease)
+            cached, cached_key, _ = semantic_symptom_cache.lookup(disease, patientInfo)
             if cached:
-                return jsonify(random.choice(cached))
-
-        locations = "'Head', 'Respiratory', 'Cardiovascular', 'Gastrointestinal', 'Neurological', 'Urinary', 'Hands', 'Legs', 'Reproductive System'"
-        schema = ''' the following is the schema to give the output in {
-      "name": "Headache",
-      "description": "Throbbing pain, primarily in the temples",
-      "severity": 5,
-      "location": "Head"
-    } '''
-        prompt = f"You are A paitent visiting a doctor, your job is to tell the doctor your symptoms for the following disease {disease}. {schema},  also keep in mind that severity should be in numbers datatype not string in json and must be below 5 and non negetive. provide the output in a list of jsons, the following are the possible locations {locations}. Dont give null as location give some system name if its not there, but please try to kepp the names available as much as possible. here is info regarding the paitent to simulate please make symptoms relevent to the charachterstic of the patient ifno: {patientInfo}"
-        response = llm.model(prompt)
-        parsed = json.loads(response)
-        validation = schema_validator.validate(parsed)
-        if validation == None:
-            db_symptom_cache.cache_symptoms(disease, parsed)
-            return jsonify(parsed)
+                if cache_warmer is not None:
+                    cache_warmer.request_refresh(cached_key)        # no-op unless it is a catalogue key
+                return symptoms_response(disease, patientInfo, cached)
+
+        parsed = generate_symptoms(disease, patientInfo)
+        if parsed is not None:
+            if symptom_gate.accept(disease, parsed):
+                semantic_symptom_cache.store(disease, patientInfo, parsed)
+            return symptoms_response(disease, patientInfo, parsed)
         else:
-            print(response)
-            print(validation)
             return jsonify({"error": 'generated schema not valid'})
 
+    except TimeoutError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def symptoms_response(disease, patientInfo, symptoms):
+    """Starts a simulation session for the scenario; its id is returned in the X-Session-Id header."""
+    response = make_response(jsonify(symptoms))
+    try:
+        response.headers["X-Session-Id"] = session_store.create(get_jwt_identity(), disease, patientInfo, symptoms)
+    except Exception as e:
+        log_event("session_create_failed", endpoint=request.path, error=type(e).__name__, message=str(e))
+    return response
+
+def load_session(data):
+    """Returns (session, error_response); both None when the request has no session_id."""
+    session_id = data.get("session_id")
+    if not session_id:
+        return None, None
+    session = session_store.get(str(session_id), get_jwt_identity())
+    if session is None:
+        return None, (jsonify({"error": "Unknown session_id"}), 404)
+    return session, None
+
 @app.route('/patientResponse', methods=['POST'])
 @jwt_required()
 def PatientBot():
     data = request.get_json()
+    session, error = load_session(data)
+    if error:
+        return error
     symptoms = data.get("symptoms", None)
     response = data.get("userResponse", None)
     chatHistory = data.get("ChatHistory", None)
     if not response:
         return jsonify({"error": "response is required in the request body"}), 400
+    if session:
+        # the session holds the scenario and earlier turns; the client only sends the new message
+        symptoms = session["symptoms"]
+        chatHistory = session["history"] + [{"text": response, "sender": "user"}]
     if not symptoms:
         return jsonify({"error": "symptoms is required in the request body"}), 400
     if not chatHistory:
@@ -278,15 +524,56 @@ def PatientBot():
     message: String,
     }
     '''
-    prompt = f"you are a virtual patient , i will give you patient symptoms symptoms: {symptoms}, and the query from doctor please respond to the query, query: {response}, answer as patient for the query based on the symptoms, here are previous chat logs {chatHistory}. respond in the following schema and make a object message with your response, please dont reply with symptoms i only want response in message key and response as value"
-    llm_response = llm.model(prompt)
-    parsed = json.loads(llm_response)
-    validation = schema_validator_bot.validate(parsed)
-    if validation == None:
+    context, context_metrics = conversation_context.build(chatHistory)
+    g.log_fields = context_metrics
+    prompt = f"you are a virtual patient , i will give you patient symptoms symptoms: {symptoms}, and the query from doctor please respond to the query, query: {response}, answer as patient for the query based on the symptoms, here are previous chat logs {context}. respond in the following schema and make a object message with your response, please dont reply with symptoms i only want response in message key and response as value"
+    if data.get("stream"):
+        return Response(stream_with_context(stream_patient_reply(prompt, session, response)), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    parsed = llm_output.generate(prompt, schema_validator_bot, "patientResponse")
+    if parsed is not None:
+        if session:
+            try:
+                session_store.append(session["id"], [{"text": response, "sender": "user"},
+                                                     {"text": parsed["message"], "sender": "bot"}])
+            except KeyError:
+                return jsonify({"error": "Unknown session_id"}), 404
         return jsonify(parsed)
     else:
         return ({"message": "Schema Not valid , please try again."})
-        print(validation)
+
+def stream_patient_reply(prompt, session=None, user_message=None):
+    """
+    Streams the patient's reply as Server-Sent Events.
+
+    Each `message` fragment is sent as a {"delta": ...} event while the model is
+    still generating; the full reply is validated at the end and sent as a
+    `done` event, or an `error` event if it is not valid.
+    """
+    extractor = MessageFieldExtractor("message")
+    try:
+        for chunk in llm.stream(prompt):
+            delta = extractor.feed(chunk)
+            if delta:
+                yield sse_event({"delta": delta})
+    except Exception as e:
+        log_event("patient_reply_stream_failed", endpoint="/patientResponse", error=type(e).__name__, message=str(e))
+        yield sse_event({"message": "Schema Not valid , please try again."}, event="error")
+        return
+    # already streamed, so only local repairs are possible here
+    parsed = llm_output.repair(extractor.text, schema_validator_bot, "patientResponse_stream")
+    if parsed is not None:
+        if session:
+            try:
+                session_store.append(session["id"], [{"text": user_message, "sender": "user"},
+                                                     {"text": parsed["message"], "sender": "bot"}])
+            except KeyError:
+                # purged or deleted while the reply streamed; the response has already started
+                yield sse_event({"error": "Unknown session_id"}, event="error")
+                return
+        yield sse_event(parsed, event="done")
+    else:
+        yield sse_event({"message": "Schema Not valid , please try again."}, event="error")
 
 def flatten_report(report):
     flat = {}
@@ -306,19 +593,18 @@ def flatten_report(report):
     return flat
 
 def get_user_email_id_info_from_jwt():
-    access_token = request.cookies.get("access_token")
-    if not access_token:
+    user_id = get_jwt_identity()
+    if not user_id:
         raise ValueError("Missing token")
 
     try:
-        decoded_token = decode_token(access_token)
-        user_id = decoded_token["sub"]
-        user = users.find_one({"_id": ObjectId(user_id)}, {"username": 1, "email": 1})
-        if not user:
-            raise LookupError("User not found")
-        return user_id, user["username"], user["email"]
+        user = user_cache.get(user_id)
     except Exception as e:
         raise ValueError(f"Invalid token: {str(e)}")
+    if not user:
+        raise LookupError("User not found")
+    username, email = user
+    return user_id, username, email
 
 
 
@@ -327,11 +613,17 @@ def get_user_email_id_info_from_jwt():
 @jwt_required()
 def generateReport():
     data = request.get_json()
+    session, error = load_session(data)
+    if error:
+        return error
     symptoms = data.get("symptoms", None)
     response = data.get("userResponse", None)
     chatHistory = data.get("ChatHistory", None)
     disease = data.get("disease", None)
     paitentInfo = data.get("Info", None)
+    if session:
+        symptoms, chatHistory = session["symptoms"], session["history"]
+        disease, paitentInfo = session["disease"], session["info"]
 
     # Required field checks
     if not disease:
@@ -344,51 +636,33 @@ def generateReport():
         return jsonify({"error": "Patient info is required in the request body"}), 400
 
 
-    # JSON schema for validating the LLM report
-    response_schema = {
-        "type": "object",
-        "additionalProperties": False,
-        "required": ["Report"],
-        "properties": {
-            "Report": {
-                "type": "object",
-                "additionalProperties": False,
-                "required": ["Result", "categories"],
-                "properties": {
-                    "Result": {
-                        "type": "object",
-                        "additionalProperties": False,
-                        "required": ["Positive", "Negative"],
-                        "properties": {
-                            "Positive": {"type": "string"},
-                            "Negative": {"type": "string"}
-                        }
-                    },
-                    "categories": {
-                        "type": "object",
-                        "additionalProperties": False,
-                        "required": ["Medical Competency", "Communication style", "Presentation Quality", "Correctly Diagnosed"],
-                        "properties": {
-                            "Medical Competency": {
-                                "type": "object",
-                                "additionalProperties": False,
-                                "properties": {
-                                    "Symptoms Relevance": {"type": "number"},
-                                    "Clinical Reasoning": {"type": "number"},
-                                    "RED flag identification": {"type": "number"},
-                                    "Prescription understanding": {"type": "number"}
-                                },
-                                "required": ["Symptoms Relevance", "Clinical Reasoning", "RED flag identification", "Prescription understanding"]
-                            },
-                            "Communication style": {"type": "number"},
-                            "Presentation Quality": {"type": "number"},
-                            "Correctly Diagnosed": {"type": "number"}
-                        }
-                    }
-                }
-            }
-        }
-    }
+    try:
+        user_id, username, email = get_user_email_id_info_from_jwt()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 401
+    except LookupError as e:
+        return jsonify({"message": str(e)}), 404
+
+    job = {"user_id": user_id, "email": email, "symptoms": symptoms, "userResponse": response,
+           "ChatHistory": chatHistory, "disease": disease, "Info": paitentInfo}
+    if data.get("async"):
+        # evaluated by the report job workers; poll /report_jobs/<job_id> or stream its /events
+        try:
+            job_id = report_jobs.enqueue(user_id, job)
+        except QueueFull:
+            return jsonify({"message": "Too many reports are being generated, please try again shortly."}), 503
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+    result, status = evaluate_report(job)
+    return jsonify(result), status
+
+def evaluate_report(job):
+    """
+    Evaluates the doctor's diagnosis with the LLM, validates the report and stores it.
+    Returns (response body, status code); runs in the request or in a report job worker.
+    """
+    symptoms, response, chatHistory = job["symptoms"], job["userResponse"], job["ChatHistory"]
+    disease, paitentInfo = job["disease"], job["Info"]
 
     # Construct prompt strictly as JSON including the schema and desired output structure
     payload = {
@@ -398,86 +672,103 @@ def generateReport():
             "doctor_response": response,
             "chat_history": chatHistory,
         },
-        "output_schema": response_schema,
+        "output_schema": REPORT_SCHEMA,
         "output_instructions": "Return a JSON object with root key 'Report' matching the provided schema exactly"
     }
 
     prompt = json.dumps(payload)
 
-    # Generate LLM response
-    llm_response = llm.model(prompt)
-
+    # Generate LLM response, repaired and validated against the strict Report schema
     try:
-        parsed = json.loads(llm_response)
-    except json.JSONDecodeError as e:
-        return jsonify({"error": "LLM response is not valid JSON", "details": str(e)}), 500
-
-    # Validate against the strict Report schema
-    validation = schema_validator_bot.validate(parsed, schema=response_schema)
-
-    if validation is None:
-        try:
-            user_id, username, email = get_user_email_id_info_from_jwt()
-        except ValueError as e:
-            return jsonify({"message": str(e)}), 401
-        except LookupError as e:
-            return jsonify({"message": str(e)}), 404
+        parsed = generate_shared(prompt, schema_validator_report, "generateReport", disease)
+    except TimeoutError:
+        return {"message": "Too many reports are being generated, please try again shortly."}, 503
 
+    if parsed is not None:
         report_data = parsed.get("Report", {})
         flat_report = flatten_report(report_data)
 
         log_entry = {
-            "user_id": ObjectId(user_id),
-            "email": email,
+            "user_id": ObjectId(job["user_id"]),
+            "email": job["email"],
             "timestamp": datetime.datetime.now(datetime.timezone.utc),
             **flat_report  # unpack the flattened report directly into the doc
         }
 
         mongo.db.profile.insert_one(log_entry)
-        return jsonify(parsed)
+        try:
+            update_report_summary(profile_summary, mongo.db.profile, log_entry["user_id"], flat_report, log_entry["timestamp"])
+        except Exception as e:
+            log_event("report_summary_update_failed", component="report_jobs", error=type(e).__name__, message=str(e))
+        return parsed, 200
     else:
-        print("Validation failed:", validation)
-        return jsonify({"message": "Schema not valid, please try again."}), 400
+        return {"message": "Schema not valid, please try again."}, 400
 
-# funtion to get report from id
-def fetch_user_reports(action="all"):
-    access_token = request.cookies.get("access_token")
-    if not access_token:
-        return jsonify({"message": "Missing token"}), 401
+@app.route('/report_jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def report_job_status(job_id):
+    job = report_jobs.get(job_id, get_jwt_identity())
+    if job is None:
+        return jsonify({"error": "Unknown job_id"}), 404
+    return jsonify(job), 200
 
+@app.route('/report_jobs/<job_id>/events', methods=['GET'])
+@jwt_required()
+def report_job_events(job_id):
+    """Server-Sent Events: a `status` event on every change, then `done` or `error` with the result."""
+    user_id = get_jwt_identity()
+    if report_jobs.get(job_id, user_id) is None:
+        return jsonify({"error": "Unknown job_id"}), 404
+
+    def events():
+        last_status = None
+        while True:
+            job = report_jobs.wait(job_id, user_id, last_status, timeout=REPORT_JOB_EVENT_TIMEOUT)
+            if job is None:
+                return
+            if job["status"] == last_status:
+                yield ": keep-alive\n\n"
+                continue
+            last_status = job["status"]
+            if job["status"] == "done":
+                yield sse_event(job, event="done")
+                return
+            if job["status"] == "failed":
+                yield sse_event(job, event="error")
+                return
+            yield sse_event(job, event="status")
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# funtion to get report from id
+def fetch_user_reports(action="all", cursor=None, limit=None):
     try:
-        decoded_token = decode_token(access_token)
-        user_id = decoded_token["sub"]
-        user_oid = ObjectId(user_id)
-
-        # Define only the fields you want to return
-        projection = {
-            "_id": 1,
-            "timestamp": 1,
-            "Symptoms Relevance": 1,
-            "Clinical Reasoning": 1,
-            "RED flag identification": 1,
-            "Prescription understanding": 1,
-            "Communication style": 1,
-            "Presentation Quality": 1,
-            "Correctly Diagnosed": 1
-        }
+        user_oid = ObjectId(get_jwt_identity())
 
         if action == "latest":
             report = mongo.db.profile.find_one(
                 {"user_id": user_oid},
-                sort=[("timestamp", -1)],
-                projection=projection
+                sort=REPORT_SORT,
+                projection=REPORT_PROJECTION
             )
             if not report:
                 return jsonify({"message": "No report found"}), 404
             return jsonify(report), 200
 
+        elif action == "page":
+            try:
+                reports, next_cursor = fetch_report_page(mongo.db.profile, user_oid, cursor, limit or REPORT_PAGE_SIZE)
+            except (TypeError, ValueError) as e:
+                return jsonify({"message": str(e)}), 400
+            return jsonify({"reports": reports, "next_cursor": next_cursor}), 200
+
         elif action == "all":
+            # unpaginated history, kept for older clients; prefer action "page"
             reports = list(mongo.db.profile.find(
                 {"user_id": user_oid},
-                projection=projection
-            ).sort("timestamp", -1))
+                projection=REPORT_PROJECTION
+            ).sort(REPORT_SORT))
             if not reports:
                 return jsonify({"message": "No reports found"}), 404
             return jsonify(reports), 200
@@ -488,6 +779,91 @@ def fetch_user_reports(action="all"):
     except Exception as e:
         return jsonify({"message": "Error processing request", "error": str(e)}), 500
 
+@app.route("/match_diseases", methods=["POST"])
+@jwt_required()
+def match_diseases():
+    """
+    Ranks diseases for a list of symptom names by embedding similarity.
+    """
+    data = request.get_json()
+    symptoms = data.get("symptoms", None) if data else None
+    if not symptoms or not isinstance(symptoms, list):
+        return jsonify({"error": "symptoms list is required in the request body"}), 400
+    try:
+        k = min(int(data.get("k", 5)), MATCH_TOP_K_LIMIT)
+    except (TypeError, ValueError):
+        return jsonify({"error": "k must be an integer"}), 400
+    matches, unknown = disease_matcher.match([str(s) for s in symptoms], k)
+    return jsonify({"matches": matches, "unknown_symptoms": unknown}), 200
+
+@app.route("/decision_tree/next", methods=["POST"])
+@jwt_required()
+def decision_tree_next():
+    """Replays the explorer's answers so far and returns the next question, or the remaining candidates when done."""
+    data = request.get_json(silent=True) or {}
+    answers = data.get("answers", [])
+    if not isinstance(answers, list) or not all(isinstance(answer, dict) for answer in answers):
+        return jsonify({"error": "answers must be a list of {symptom, answer} objects"}), 400
+    try:
+        return jsonify(decision_tree.next_question(answers)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+def symptom_list(value):
+    return [str(symptom) for symptom in value] if isinstance(value, list) else None
+
+@app.route("/diagnose", methods=["POST"])
+@jwt_required()
+def diagnose():
+    """Posterior-ranked differential for reported present/absent symptoms."""
+    data = request.get_json(silent=True) or {}
+    present, absent = symptom_list(data.get("present", [])), symptom_list(data.get("absent", []))
+    if present is None or absent is None or not (present or absent):
+        return jsonify({"error": "present and/or absent symptom lists are required in the request body"}), 400
+    try:
+        k = min(int(data.get("k", 5)), MATCH_TOP_K_LIMIT)
+    except (TypeError, ValueError):
+        return jsonify({"error": "k must be an integer"}), 400
+    differential, unknown = diagnosis_scorer.score(present, absent, k)
+    return jsonify({"differential": differential, "unknown_symptoms": unknown}), 200
+
+@app.route("/diagnose_batch", methods=["POST"])
+@jwt_required()
+def diagnose_batch():
+    """Scores many {"present", "absent"} cases at once, e.g. to evaluate a set of simulated patients."""
+    data = request.get_json(silent=True) or {}
+    cases = data.get("cases")
+    if not isinstance(cases, list) or not cases or not all(isinstance(case, dict) for case in cases):
+        return jsonify({"error": "cases list is required in the request body"}), 400
+    if len(cases) > DIAGNOSE_BATCH_LIMIT:
+        return jsonify({"error": f"at most {DIAGNOSE_BATCH_LIMIT} cases per request"}), 400
+    parsed = []
+    for case in cases:
+        present, absent = symptom_list(case.get("present", [])), symptom_list(case.get("absent", []))
+        if present is None or absent is None:
+            return jsonify({"error": "present and absent must be lists of symptoms"}), 400
+        parsed.append({"present": present, "absent": absent})
+    try:
+        k = min(int(data.get("k", 5)), MATCH_TOP_K_LIMIT)
+    except (TypeError, ValueError):
+        return jsonify({"error": "k must be an integer"}), 400
+    results = [{"differential": differential, "unknown_symptoms": unknown}
+               for differential, unknown in diagnosis_scorer.score_batch(parsed, k)]
+    return jsonify({"results": results}), 200
+
+@app.route("/cache_stats", methods=["GET"])
+@jwt_required()
+def cache_stats():
+    stats = {"symptom_cache": semantic_symptom_cache.stats(), "intent_cache": intent_classifier.stats(),
+             "user_cache": user_cache.stats(), "identicon_cache": IdentIcon.cache_info(),
+             "conversation_context": conversation_context.stats(), "sessions": session_store.stats(),
+             "report_jobs": report_jobs.stats(), "llm_output": llm_output.stats(),
+             "single_flight": single_flight.stats(), "decision_tree": decision_tree.stats(),
+             "symptom_quality": symptom_gate.stats()}
+    if cache_warmer is not None:
+        stats["cache_warmer"] = cache_warmer.stats()
+    return jsonify(stats), 200
+
 @app.route("/get_reports", methods=["POST"])
 @jwt_required()
 def get_reports():
@@ -495,7 +871,182 @@ def get_reports():
     if not data or "action" not in data:
         return jsonify({"message": "Missing 'action' in request body"}), 400
     action = data["action"]
-    return fetch_user_reports(action)
+    return fetch_user_reports(action, data.get("cursor"), data.get("limit"))
+
+@app.route("/report_summary", methods=["GET"])
+@jwt_required()
+def report_summary():
+    """Per-category mean/min/max and the most recent scores, read from the user's rollup."""
+    try:
+        user_oid = ObjectId(get_jwt_identity())
+        summary = profile_summary.find_one({"_id": user_oid})
+        if summary is None:
+            summary = rebuild_report_summary(profile_summary, mongo.db.profile, user_oid)
+        if summary is None:
+            return jsonify({"message": "No reports found"}), 404
+        return jsonify(format_report_summary(summary)), 200
+    except Exception as e:
+        return jsonify({"message": "Error processing request", "error": str(e)}), 500
+
+@app.route("/report_count", methods=["GET"])
+@jwt_required()
+def report_count():
+    try:
+        return jsonify({"count": count_reports(mongo.db.profile, ObjectId(get_jwt_identity()))}), 200
+    except Exception as e:
+        return jsonify({"message": "Error processing request", "error": str(e)}), 500
+
+# Background cache warmer
+def load_disease_catalogue(path):
+    try:
+        with open(path) as f:
+            return [disease.lower().rstrip() for disease in json.load(f)["diseases"]]
+    except (OSError, KeyError, ValueError) as e:
+        log_event("disease_catalogue_load_failed", component="cache_warmer", error=type(e).__name__, message=str(e))
+        return []
+
+def warm_cache_key(key):
+    """Generates and caches one more symptom set for a semantic cache key; used by the cache warmer."""
+    disease, profile = semantic_symptom_cache.parse_key(key)
+    try:
+        parsed = generate_symptoms(disease, profile)
+    except Exception as e:
+        log_event("cache_warm_failed", component="cache_warmer", key=key, error=type(e).__name__, message=str(e))
+        return False
+    if parsed is None or not symptom_gate.accept(disease, parsed):
+        return False
+    semantic_symptom_cache.store_key(key, parsed)
+    return True
+
+# async /generateReport evaluations, persisted so queued jobs survive a restart
+report_jobs = JobQueue(evaluate_report, JOB_DB_PATH, workers=REPORT_JOB_WORKERS, max_pending=REPORT_JOB_MAX_PENDING)
+
+cache_warmer = None
+if CACHE_WARMER_ENABLED:
+    warm_keys = [semantic_symptom_cache.key_for(disease, profile)
+                 for disease in load_disease_catalogue(DISEASE_CATALOGUE_PATH)
+                 for profile in WARMER_PATIENT_PROFILES]
+    semantic_symptom_cache.pin(warm_keys)
+    cache_warmer = CacheWarmer(db_symptom_cache, warm_cache_key, warm_keys,
+                               target=DB_CACHE_LIMIT_UNIQUE, stale_after=CACHE_STALE_AFTER,
+                               workers=CACHE_WARMER_WORKERS, calls_per_minute=CACHE_WARMER_CALLS_PER_MINUTE)
+
+# Metrics and request timing
+if REQUEST_LOG:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("medsim.requests").setLevel(logging.INFO)
+
+REGISTRY.callback("symptom_cache_events_total", "SymptomCache lookups, writes and trimmed rows.",
+                  stats_callback(db_symptom_cache.stats), kind="counter")
+REGISTRY.callback("semantic_cache", "Semantic symptom cache counters.", stats_callback(semantic_symptom_cache.stats))
+REGISTRY.callback("intent_cache", "Intent classifier cache and batching counters.", stats_callback(intent_classifier.stats))
+REGISTRY.callback("user_cache", "User identity cache counters.", stats_callback(user_cache.stats))
+REGISTRY.callback("conversation_context", "Chat context token counters.", stats_callback(conversation_context.stats))
+REGISTRY.callback("single_flight", "Coalesced LLM generations and admission waits.", stats_callback(single_flight.stats))
+REGISTRY.callback("symptom_quality", "Generated symptom sets accepted or rejected for caching.",
+                  stats_callback(symptom_gate.stats))
+REGISTRY.callback("report_jobs", "Async report job queue depth and timings.", stats_callback(report_jobs.stats))
+REGISTRY.callback("llm_output", "LLM output outcomes per endpoint.",
+                  lambda: [({"endpoint": endpoint, "outcome": outcome}, value)
+                           for endpoint, counts in llm_output.stats().items()
+                           for outcome, value in counts.items()])
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    duration = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    HTTP_LATENCY.observe(duration, route=route, method=request.method)
+    HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    log_request(route=route, method=request.method, status=response.status_code,
+                duration_ms=round(duration * 1000, 2), **g.pop("log_fields", {}))
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text exposition of every registered metric."""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+@app.before_request
+def start_background_workers():
+    # started lazily so the debug reloader's parent process never spends LLM calls
+    if cache_warmer is not None and (run_cache_warmer or elect_cache_warmer()):
+        cache_warmer.start()
+    report_jobs.start()
+
+# Pre-fork serving (gunicorn.conf.py)
+run_cache_warmer = True                                                 # False in forked workers until elected
+warmer_lock = None
+warmer_retry_at = 0.0
+
+def create_app():
+    """
+    Returns the Flask app for a WSGI server (see wsgi.py).
+
+    The intent encoder, embedding stores and catalogue are loaded at import, so a
+    server that preloads this module before forking shares those pages
+    copy-on-write between its workers. Per-process resources are re-opened in
+    after_fork().
+    """
+    intent_classifier.encode(["warm up"])   # first call allocates the backend's buffers; do it once, before forking
+    return app
+
+def before_fork():
+    """Closes the master's connections so no socket or SQLite handle is shared with a worker."""
+    db_symptom_cache.close()
+    session_store.close()
+    report_jobs.close()
+    mongo.cx.close()
+    gc.freeze()                                                         # keep the GC from touching (and copying) shared pages
+
+def after_fork():
+    """Re-opens per-process resources in a freshly forked worker."""
+    global run_cache_warmer, warmer_lock
+    connect_mongo()
+    db_symptom_cache.after_fork()
+    session_store.after_fork()
+    report_jobs.after_fork()
+    intent_classifier.after_fork()
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(WORKER_TORCH_THREADS)
+
+    if cache_warmer is not None:
+        cache_warmer.after_fork()
+        run_cache_warmer = False
+        warmer_lock = None
+
+def elect_cache_warmer():
+    """
+    One cache warmer per host: the worker holding an exclusive lock on a file next to
+    the symptom cache runs it. The lock is released when that worker exits, and the
+    others retry every WARMER_ELECTION_INTERVAL seconds, so a recycled worker's
+    replacement (or a sibling) takes over.
+    """
+    global run_cache_warmer, warmer_lock, warmer_retry_at
+    now = time.monotonic()
+    if now < warmer_retry_at:
+        return False
+    warmer_retry_at = now + WARMER_ELECTION_INTERVAL
+    lock = open(f"{DB_PATH}.warmer.lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return False
+    warmer_lock = lock
+    run_cache_warmer = True
+    return True
+
+def worker_exit():
+    """Stops background threads that would otherwise keep an exiting worker alive."""
+    if cache_warmer is not None:
+        cache_warmer.stop()
 
 
 if __name__ == "__main__":
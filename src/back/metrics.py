@@ -0,0 +1,208 @@
+from pymongo import monitoring
+import bisect
+import json
+import logging
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+request_log = logging.getLogger("medsim.requests")
+event_log = logging.getLogger("medsim.events")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels: counter.inc(2, route="/intent")."""
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _format_labels(self.label_names, key), value) for key, value in self._values.items()]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout (_bucket, _sum, _count)."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}                               # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, state in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", _format_labels(self.label_names, key, [("le", _format_value(float(bound)))]), cumulative))
+                samples.append((f"{self.name}_bucket", _format_labels(self.label_names, key, [("le", "+Inf")]), state[-1]))
+                samples.append((f"{self.name}_sum", _format_labels(self.label_names, key), state[-2]))
+                samples.append((f"{self.name}_count", _format_labels(self.label_names, key), state[-1]))
+        return samples
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class CallbackMetric:
+    """
+    Values read from a callback at scrape time, for components that already keep
+    their own counters (caches, queues). callback() -> [(labels dict, value), ...].
+    """
+    def __init__(self, name, documentation, callback, kind="gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self):
+        samples = []
+        for labels, value in self.callback():
+            names = tuple(labels)
+            samples.append((self.name, _format_labels(names, [labels[name] for name in names]), value))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def callback(self, name, documentation, callback, kind="gauge"):
+        return self.register(CallbackMetric(name, documentation, callback, kind))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            metrics = list(self.metrics)
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                print(f"Error collecting metric {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by route, method and status.",
+                                 ("route", "method", "status"))
+HTTP_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency by route and method.",
+                                  ("route", "method"))
+LLM_LATENCY = REGISTRY.histogram("llm_request_duration_seconds", "LLM call latency, including retries.",
+                                 ("mode", "outcome"))
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "Estimated LLM tokens (~4 characters per token).", ("direction",))
+LLM_ERRORS = REGISTRY.counter("llm_errors_total", "LLM call errors by exception type.", ("error",))
+LLM_RETRIES = REGISTRY.counter("llm_retries_total", "LLM calls retried after a transient error.")
+INTENT_BATCH_SIZE = REGISTRY.histogram("intent_batch_size", "Inputs per intent encoder batch.",
+                                       buckets=(1, 2, 4, 8, 16, 32, 64))
+SYMPTOM_SETS_REJECTED = REGISTRY.counter("symptom_sets_rejected_total",
+                                         "Generated symptom sets not cached because they scored below the relevance threshold.")
+MONGO_LATENCY = REGISTRY.histogram("mongo_command_duration_seconds", "MongoDB command latency.",
+                                   ("command", "outcome"))
+
+
+def stats_callback(stats, prefix=""):
+    """Adapts a component's stats() dict to callback samples: [({"name": key}, value), ...] for numeric values."""
+    def callback():
+        return [({"name": f"{prefix}{key}"}, value) for key, value in stats().items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)]
+    return callback
+
+
+def log_request(**fields):
+    """One structured (JSON) timing line per request on the medsim.requests logger."""
+    if request_log.isEnabledFor(logging.INFO):
+        request_log.info(json.dumps(fields, default=str))
+
+
+def log_event(event, level=logging.WARNING, **fields):
+    """One structured (JSON) line for a notable event, such as rejected LLM output, on the medsim.events logger."""
+    if event_log.isEnabledFor(level):
+        event_log.log(level, json.dumps({"event": event, **fields}, default=str))
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Records every MongoDB command's latency; pass to MongoClient(event_listeners=[...])."""
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, command=event.command_name, outcome="error")
@@ -0,0 +1,165 @@
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+import base64
+import datetime
+import json
+
+REPORT_PAGE_SIZE = 20
+REPORT_PAGE_LIMIT = 100
+REPORT_INDEX = [("user_id", 1), ("timestamp", -1), ("_id", -1)]
+REPORT_SORT = [("timestamp", -1), ("_id", -1)]
+
+# Define only the fields you want to return
+REPORT_PROJECTION = {
+    "_id": 1,
+    "timestamp": 1,
+    "Symptoms Relevance": 1,
+    "Clinical Reasoning": 1,
+    "RED flag identification": 1,
+    "Prescription understanding": 1,
+    "Communication style": 1,
+    "Presentation Quality": 1,
+    "Correctly Diagnosed": 1
+}
+
+
+def ensure_report_indexes(collection):
+    """Creates the (user_id, timestamp desc, _id desc) index the history queries walk; a no-op if it exists."""
+    collection.create_index(REPORT_INDEX, name="user_timestamp_id")
+
+
+def encode_cursor(report):
+    """Opaque cursor for the position just after `report` in (timestamp desc, _id desc) order."""
+    timestamp = report["timestamp"]
+    if timestamp.tzinfo is None:                                        # pymongo returns naive UTC datetimes
+        timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+    millis = int(timestamp.timestamp() * 1000)                          # BSON dates have millisecond precision
+    raw = json.dumps({"t": millis, "id": str(report["_id"])}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    """Returns (timestamp, ObjectId) from encode_cursor(); raises ValueError for a malformed cursor."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        timestamp = datetime.datetime.fromtimestamp(data["t"] / 1000, datetime.timezone.utc)
+        return timestamp, ObjectId(data["id"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def fetch_report_page(collection, user_oid, cursor=None, limit=REPORT_PAGE_SIZE):
+    """
+    One page of a user's reports, newest first, by keyset pagination on the
+    (user_id, timestamp, _id) index, so every page costs the same however deep it is.
+
+    Returns (reports, next_cursor); next_cursor is None on the last page.
+    """
+    limit = max(1, min(int(limit), REPORT_PAGE_LIMIT))
+    query = {"user_id": user_oid}
+    if cursor:
+        timestamp, last_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$lt": last_id}},
+        ]
+
+    # one extra document tells whether another page exists
+    reports = list(collection.find(query, projection=REPORT_PROJECTION).sort(REPORT_SORT).limit(limit + 1))
+    next_cursor = None
+    if len(reports) > limit:
+        reports = reports[:limit]
+        next_cursor = encode_cursor(reports[-1])
+    return reports, next_cursor
+
+
+def count_reports(collection, user_oid):
+    return collection.count_documents({"user_id": user_oid})
+
+
+SUMMARY_RECENT_SIZE = 10                                                # reports kept in the rolling window
+SUMMARY_CATEGORIES = [key for key in REPORT_PROJECTION if key not in ("_id", "timestamp")]
+
+
+def update_report_summary(summaries, reports, user_oid, flat_report, timestamp):
+    """
+    Folds one flattened report into the user's rollup document with a single atomic
+    upsert: running count, per-category sum/min/max and the last SUMMARY_RECENT_SIZE reports.
+
+    The report must already be stored in `reports`. When the upsert creates the
+    rollup, the user may have older reports it does not cover, so it is rebuilt
+    from every stored report.
+    """
+    scores = {key: flat_report[key] for key in SUMMARY_CATEGORIES if key in flat_report}
+    result = summaries.update_one(
+        {"_id": user_oid},
+        {
+            "$inc": {"count": 1, **{f"sum.{key}": value for key, value in scores.items()}},
+            "$min": {f"min.{key}": value for key, value in scores.items()},
+            "$max": {f"max.{key}": value for key, value in scores.items()},
+            "$set": {"updated": timestamp},
+            "$push": {"recent": {"$each": [{"timestamp": timestamp, **scores}], "$slice": -SUMMARY_RECENT_SIZE}},
+        },
+        upsert=True,
+    )
+    if result.upserted_id is not None:
+        rebuild_report_summary(summaries, reports, user_oid)
+
+
+def rebuild_report_summary(summaries, reports, user_oid, attempts=3):
+    """
+    Builds the user's rollup from every stored report and writes it over any partial
+    one, for histories written before summaries were kept. Returns the summary
+    document, or None if there are no reports.
+
+    The write only lands if the rollup's count is still the one read before the
+    aggregate; a report folded in meanwhile changes it, and the rebuild is retried.
+    """
+    group = {"_id": None, "count": {"$sum": 1}, "updated": {"$max": "$timestamp"}}
+    for i, key in enumerate(SUMMARY_CATEGORIES):
+        group[f"sum{i}"] = {"$sum": f"${key}"}
+        group[f"min{i}"] = {"$min": f"${key}"}
+        group[f"max{i}"] = {"$max": f"${key}"}
+    for _ in range(attempts):
+        current = summaries.find_one({"_id": user_oid}, projection={"count": 1})
+        totals = next(reports.aggregate([{"$match": {"user_id": user_oid}}, {"$group": group}]), None)
+        if not totals:
+            return None
+
+        recent = list(reports.find({"user_id": user_oid}, projection={key: 1 for key in ["timestamp", *SUMMARY_CATEGORIES]})
+                      .sort(REPORT_SORT).limit(SUMMARY_RECENT_SIZE))
+        summary = {
+            "_id": user_oid,
+            "count": totals["count"],
+            "sum": {key: totals[f"sum{i}"] for i, key in enumerate(SUMMARY_CATEGORIES)},
+            "min": {key: totals[f"min{i}"] for i, key in enumerate(SUMMARY_CATEGORIES)},
+            "max": {key: totals[f"max{i}"] for i, key in enumerate(SUMMARY_CATEGORIES)},
+            "updated": totals["updated"],
+            "recent": [{k: v for k, v in report.items() if k != "_id"} for report in reversed(recent)],
+        }
+        if current is None:
+            try:
+                summaries.insert_one(summary)
+                return summary
+            except DuplicateKeyError:
+                continue                                                # a new report created the rollup; re-read it
+        if summaries.replace_one({"_id": user_oid, "count": current["count"]}, summary).matched_count:
+            return summary
+    # new reports kept landing; the stored rollup may miss some until the next rebuild
+    return summaries.find_one({"_id": user_oid})
+
+
+def format_report_summary(summary):
+    """Rollup document -> API response, with the per-category means computed here."""
+    count = summary["count"]
+    categories = {}
+    for key in SUMMARY_CATEGORIES:
+        if key not in summary.get("sum", {}):
+            continue
+        categories[key] = {
+            "mean": summary["sum"][key] / count if count else 0.0,
+            "min": summary["min"].get(key),
+            "max": summary["max"].get(key),
+        }
+    return {"count": count, "updated": summary.get("updated"), "categories": categories,
+            "recent": summary.get("recent", [])}
@@ -1,67 +1,155 @@
 from sqlite3.dbapi2 import Error
+import threading
+
+COMPILED_CACHE_LIMIT = 128
+_compiled_cache = {}                # id(schema) -> (schema, check); the schema is kept so its id is never reused
+_compiled_lock = threading.Lock()
+
+
+def compile_schema(schema):
+    """
+    Compiles a schema into a check(data) -> bool callable, cached by schema identity.
+
+    The compiled check only answers valid/invalid and builds no paths or error
+    strings, so the common valid case allocates nothing. Schemas are compared by
+    identity, so hoist schemas to module level instead of rebuilding them per call.
+    """
+    entry = _compiled_cache.get(id(schema))
+    if entry is not None and entry[0] is schema:
+        return entry[1]
+    check = _compile(schema)
+    with _compiled_lock:
+        if len(_compiled_cache) >= COMPILED_CACHE_LIMIT:
+            _compiled_cache.clear()
+        _compiled_cache[id(schema)] = (schema, check)
+    return check
+
+
+def _compile(schema):
+    schema_type = schema.get("type")
+
+    if schema_type == "object":
+        required = tuple(schema.get("required", []))
+        properties = {key: _compile(value) for key, value in schema.get("properties", {}).items()}
+        strict = not schema.get("additionalProperties", True)
+
+        def check_object(data):
+            if not isinstance(data, dict):
+                return False
+            for key in required:
+                if key not in data:
+                    return False
+            for key, value in data.items():
+                check = properties.get(key)
+                if check is None:
+                    if strict:
+                        return False
+                elif not check(value):
+                    return False
+            return True
+        return check_object
+
+    if schema_type == "array":
+        check_item = _compile(schema.get("items", {}))
+
+        def check_array(data):
+            if not isinstance(data, list):
+                return False
+            for item in data:
+                if not check_item(item):
+                    return False
+            return True
+        return check_array
+
+    if schema_type == "string":
+        return lambda data: isinstance(data, str)
+
+    if schema_type == "number":
+        minimum = schema.get("minimum")
+        maximum = schema.get("maximum")
+
+        def check_number(data):
+            if not isinstance(data, (int, float)):
+                return False
+            if minimum is not None and data < minimum:
+                return False
+            if maximum is not None and data > maximum:
+                return False
+            return True
+        return check_number
+
+    def check_unknown(data):
+        raise Exception("Validation type not specified, reached end of comaparision")
+    return check_unknown
 
 
 class SchemaValidator:
-    def __init__(self, schema):
+    def __init__(self, schema, fail_fast=False):
         self.schema = schema
+        self.fail_fast = fail_fast
+        compile_schema(schema)
 
     def validate(self, data, schema=None, path="root"):
+        """
+        Returns None if data matches the schema, otherwise the error message(s).
+
+        Valid data only runs the compiled check; error paths are built on failure,
+        and with fail_fast only the first error is reported.
+        """
         schema = schema or self.schema
+        if compile_schema(schema)(data):
+            return None  # Valid
+
+        errors = self._errors(data, schema, path)
+        if self.fail_fast:
+            return next(errors, None)
+        return "\n".join(errors) or None
+
+    def _errors(self, data, schema, path):
         schema_type = schema.get("type")
 
         # Type check
         if schema_type == "object":
             if not isinstance(data, dict):
-                return f"{path} should be an object"
-            return self._validate_object(data, schema, path)
+                yield f"{path} should be an object"
+                return
+            yield from self._object_errors(data, schema, path)
 
         elif schema_type == "array":
             if not isinstance(data, list):
-                return f"{path} should be an array"
-            return self._validate_array(data, schema, path)
+                yield f"{path} should be an array"
+                return
+            yield from self._array_errors(data, schema, path)
 
         elif schema_type == "string":
             if not isinstance(data, str):
-                return f"{path} should be a string"
+                yield f"{path} should be a string"
 
         elif schema_type == "number":
             if not isinstance(data, (int, float)):
-                return f"{path} should be a number"
-            if "minimum" in schema and data < schema["minimum"]:
-                return f"{path} should be >= {schema['minimum']}"
-            if "maximum" in schema and data > schema["maximum"]:
-                return f"{path} should be <= {schema['maximum']}"
+                yield f"{path} should be a number"
+            elif "minimum" in schema and data < schema["minimum"]:
+                yield f"{path} should be >= {schema['minimum']}"
+            elif "maximum" in schema and data > schema["maximum"]:
+                yield f"{path} should be <= {schema['maximum']}"
         else:
             raise Exception("Validation type not specified, reached end of comaparision")
 
-        return None  # Valid
-
-    def _validate_object(self, data, schema, path):
-        errors = []
-
+    def _object_errors(self, data, schema, path):
         # Required fields
-        required = schema.get("required", [])
-        for key in required:
+        for key in schema.get("required", []):
             if key not in data:
-                errors.append(f"{path}.{key} is required")
+                yield f"{path}.{key} is required"
 
         # Properties
         properties = schema.get("properties", {})
         for key, value in data.items():
             if key in properties:
-                error = self.validate(value, properties[key], f"{path}.{key}")
-                if error:
-                    errors.append(error)
+                yield from self._errors(value, properties[key], f"{path}.{key}")
             elif not schema.get("additionalProperties", True):
-                errors.append(f"{path}.{key} is not allowed")
-
-        return "\n".join(errors) if errors else None
+                yield f"{path}.{key} is not allowed"
 
-    def _validate_array(self, data, schema, path):
+    def _array_errors(self, data, schema, path):
         item_schema = schema.get("items", {})
-        errors = []
         for i, item in enumerate(data):
-            error = self.validate(item, item_schema, f"{path}[{i}]")
-            if error:
-                errors.append(error)
-        return "\n".join(errors) if errors else None
+            yield from self._errors(item, item_schema, f"{path}[{i}]")
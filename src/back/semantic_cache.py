@@ -0,0 +1,248 @@
+import functools
+import json
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+
+KEY_SEPARATOR = " | "
+EXACT_PROFILE_FIELDS = ("gender", "bmitype", "age")                     # must match exactly before profiles are compared
+
+class SemanticSymptomCache:
+    """
+    Patient-profile-aware front for SymptomCache.
+
+    Entries are stored under a canonical "disease | profile" key. The disease and
+    the profile are embedded separately, and a lookup that has no exact key
+    answers from the nearest cached key whose disease and profile are both above
+    their similarity thresholds, so spelling variants share entries but symptoms
+    are never served across diseases or unlike patients. Gender, BMI type and the
+    age bucket barely move the embedding of the whole profile, so a near hit also
+    needs them to be equal.
+
+    Keys are kept in least-recently-used order, at most `max_keys_per_disease` per
+    disease and `max_keys` overall; an evicted key loses its vector rows and its
+    stored sets. Pinned keys, such as the ones the cache warmer owns, are never
+    evicted and do not count towards either cap.
+
+    Args:
+    - cache (SymptomCache): Underlying store.
+    - encode (callable): list of texts -> L2-normalised embedding matrix.
+    - disease_threshold (float): Minimum cosine similarity between diseases.
+    - profile_threshold (float): Minimum cosine similarity between patient profiles.
+    - max_keys_per_disease (int): Unpinned keys kept per disease.
+    - max_keys (int): Unpinned keys kept overall.
+    """
+    GROW_ROWS = 256                                                     # vector rows added whenever the matrices fill up
+
+    def __init__(self, cache, encode, disease_threshold=0.9, profile_threshold=0.9,
+                 max_keys_per_disease=32, max_keys=2048):
+        self.cache = cache
+        self.encode = encode
+        self.disease_threshold = disease_threshold
+        self.profile_threshold = profile_threshold
+        self.max_keys_per_disease = max_keys_per_disease
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "near_hits": 0, "misses": 0, "evicted": 0}
+        self.keys = []                                                  # row -> key
+        self.key_index = {}                                             # key -> row
+        self.lru = OrderedDict()                                        # unpinned keys, least recently used first
+        self.disease_keys = {}                                          # disease -> its unpinned keys in LRU order
+        self.pinned = set()
+        self.disease_vectors = None
+        self.profile_vectors = None
+        self.group_ids = np.zeros(0, dtype=np.int64)                    # row -> id of its EXACT_PROFILE_FIELDS values
+        self._groups = {}
+        self._embed_text = functools.lru_cache(maxsize=4096)(self._embed_one)
+        self._register([key for key in cache.keys() if KEY_SEPARATOR in key])
+
+    @staticmethod
+    def normalize_disease(disease):
+        return re.sub(r"\s+", " ", str(disease)).strip().lower()
+
+    @staticmethod
+    def normalize_profile(info):
+        """Canonical profile: sorted keys, lowercased values, numbers bucketed to tens (age 34 -> 30s)."""
+        if not isinstance(info, dict):
+            return {"info": re.sub(r"\s+", " ", str(info)).strip().lower()}
+        profile = {}
+        for key, value in sorted(info.items()):
+            value = re.sub(r"\s+", " ", str(value)).strip().lower()
+            try:
+                value = f"{int(float(value)) // 10 * 10}s"
+            except ValueError:
+                pass
+            profile[str(key)] = value
+        return profile
+
+    def key_for(self, disease, info):
+        profile = self.normalize_profile(info)
+        return f"{self.normalize_disease(disease)}{KEY_SEPARATOR}{json.dumps(profile, sort_keys=True)}"
+
+    @staticmethod
+    def parse_key(key):
+        """Returns the (disease, profile) a cache key was built from."""
+        disease, profile = key.split(KEY_SEPARATOR, 1)
+        return disease, json.loads(profile)
+
+    def lookup(self, disease, info):
+        """
+        Returns (symptoms, matched_key, kind) where kind is "hit", "near_hit" or "miss".
+        symptoms and matched_key are None on a miss.
+        """
+        key = self.key_for(disease, info)
+        with self.lock:
+            exact = key in self.key_index
+        if exact:
+            symptoms = self.cache.get_cached_symptoms(key)
+            if symptoms:
+                return self._count(symptoms, key, "hits")
+
+        nearest = self._nearest(key)
+        if nearest is not None:
+            symptoms = self.cache.get_cached_symptoms(nearest)
+            if symptoms:
+                return self._count(symptoms, nearest, "near_hits")
+        return self._count(None, None, "misses")
+
+    def pin(self, keys):
+        """Exempts keys from eviction, registered or not."""
+        with self.lock:
+            for key in keys:
+                self.pinned.add(key)
+                if key in self.lru:
+                    disease = key.split(KEY_SEPARATOR, 1)[0]
+                    del self.lru[key]
+                    del self.disease_keys[disease][key]
+                    if not self.disease_keys[disease]:
+                        del self.disease_keys[disease]
+
+    def store(self, disease, info, symptoms):
+        key = self.key_for(disease, info)
+        self.store_key(key, symptoms)
+        return key
+
+    def store_key(self, key, symptoms):
+        self.cache.cache_symptoms(key, symptoms)
+        self._register([key])
+        with self.lock:
+            self._touch(key)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counters["hits"] + self.counters["near_hits"] + self.counters["misses"]
+            served = self.counters["hits"] + self.counters["near_hits"]
+            return {**self.counters, "keys": len(self.keys), "hit_rate": served / lookups if lookups else 0.0}
+
+    def _count(self, symptoms, key, counter):
+        with self.lock:
+            self.counters[counter] += 1
+            if key is not None:
+                self._touch(key)
+        kind = {"hits": "hit", "near_hits": "near_hit", "misses": "miss"}[counter]
+        return symptoms, key, kind
+
+    def _embed_one(self, text):
+        return self.encode([text])[0].astype(np.float32)
+
+    def _embed_key(self, key):
+        disease, profile = key.split(KEY_SEPARATOR, 1)
+        return self._embed_text(disease), self._embed_text(profile)
+
+    def _group(self, key, add=True):
+        """Id of the key's EXACT_PROFILE_FIELDS values (-1 if unseen and not added); call with the lock held."""
+        profile = self.parse_key(key)[1]
+        fields = {str(name).lower(): value for name, value in profile.items()}
+        values = tuple(fields.get(name) for name in EXACT_PROFILE_FIELDS)
+        if not add:
+            return self._groups.get(values, -1)
+        return self._groups.setdefault(values, len(self._groups))
+
+    def _nearest(self, key):
+        disease_vector, profile_vector = self._embed_key(key)
+        with self.lock:
+            if not self.keys:
+                return None
+            same_group = self.group_ids[:len(self.keys)] == self._group(key, add=False)
+            if not same_group.any():
+                return None
+            disease_sims = self.disease_vectors[:len(self.keys)] @ disease_vector
+            profile_sims = self.profile_vectors[:len(self.keys)] @ profile_vector
+            eligible = same_group & (disease_sims >= self.disease_threshold) & (profile_sims >= self.profile_threshold)
+            if not eligible.any():
+                return None
+            best = int(np.argmax(np.where(eligible, disease_sims + profile_sims, -np.inf)))
+            return self.keys[best]
+
+    def _register(self, keys):
+        with self.lock:
+            keys = [key for key in dict.fromkeys(keys) if key not in self.key_index]
+        if not keys:
+            return
+        vectors = [self._embed_key(key) for key in keys]
+        evicted = []
+        with self.lock:
+            for key, (disease_vector, profile_vector) in zip(keys, vectors):
+                if key in self.key_index:
+                    continue
+                if self.disease_vectors is None:
+                    self.disease_vectors = np.zeros((self.GROW_ROWS, disease_vector.shape[0]), dtype=np.float32)
+                    self.profile_vectors = np.zeros((self.GROW_ROWS, profile_vector.shape[0]), dtype=np.float32)
+                    self.group_ids = np.zeros(self.GROW_ROWS, dtype=np.int64)
+                elif len(self.keys) == self.disease_vectors.shape[0]:
+                    self.disease_vectors = self._grow(self.disease_vectors)
+                    self.profile_vectors = self._grow(self.profile_vectors)
+                    self.group_ids = np.concatenate([self.group_ids, np.zeros(self.GROW_ROWS, dtype=np.int64)])
+                row = len(self.keys)
+                self.disease_vectors[row] = disease_vector
+                self.profile_vectors[row] = profile_vector
+                self.group_ids[row] = self._group(key)
+                self.key_index[key] = row
+                self.keys.append(key)
+                if key not in self.pinned:
+                    evicted += self._admit(key)
+        for key in evicted:
+            self.cache.evict(key)
+
+    def _grow(self, matrix):
+        grown = np.zeros((matrix.shape[0] + self.GROW_ROWS, matrix.shape[1]), dtype=matrix.dtype)
+        grown[:matrix.shape[0]] = matrix
+        return grown
+
+    def _admit(self, key):
+        """Adds an unpinned key to the LRU order; returns the keys evicted to stay within the caps."""
+        disease = key.split(KEY_SEPARATOR, 1)[0]
+        self.lru[key] = None
+        disease_keys = self.disease_keys.setdefault(disease, OrderedDict())
+        disease_keys[key] = None
+        evicted = []
+        while len(disease_keys) > self.max_keys_per_disease:
+            evicted.append(self._evict(next(iter(disease_keys))))
+        while len(self.lru) > self.max_keys:
+            evicted.append(self._evict(next(iter(self.lru))))
+        return evicted
+
+    def _touch(self, key):
+        if key in self.lru:
+            self.lru.move_to_end(key)
+            self.disease_keys[key.split(KEY_SEPARATOR, 1)[0]].move_to_end(key)
+
+    def _evict(self, key):
+        """Drops a key's LRU entries and vector rows; the last row moves into its slot."""
+        disease = key.split(KEY_SEPARATOR, 1)[0]
+        del self.lru[key]
+        del self.disease_keys[disease][key]
+        if not self.disease_keys[disease]:
+            del self.disease_keys[disease]
+        row, last = self.key_index.pop(key), len(self.keys) - 1
+        if row != last:
+            moved = self.keys[last]
+            self.keys[row] = moved
+            self.key_index[moved] = row
+            self.disease_vectors[row] = self.disease_vectors[last]
+            self.profile_vectors[row] = self.profile_vectors[last]
+            self.group_ids[row] = self.group_ids[last]
+        self.keys.pop()
+        self.counters["evicted"] += 1
+        return key
@@ -0,0 +1,205 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class SessionStore:
+    """
+    Simulation sessions: the scenario (disease, patient info, symptoms) and the chat
+    turns, so clients send a session id and the new message instead of everything.
+
+    Sessions live in an in-memory LRU in front of SQLite. Turns are stored one row
+    each and only ever appended, so a chat turn costs one small insert. The session
+    row keeps a turn count, so a process whose cached copy is behind another
+    worker's appends notices and reloads it.
+
+    Args:
+    - db_path (str): SQLite file for persistence.
+    - cache_size (int): Sessions kept in memory.
+    - max_age (float): Seconds after the last activity before a session is purged.
+    - purge_interval (float): Minimum seconds between purges, which run from create().
+    """
+    def __init__(self, db_path='sessions.db', cache_size=256, max_age=7 * 24 * 60 * 60, pool_size=8,
+                 purge_interval=60 * 60):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self.max_age = max_age
+        self.purge_interval = purge_interval
+        self._last_purge = time.time()
+        self.counters = {"created": 0, "hits": 0, "misses": 0, "turns": 0, "purged": 0}
+        self._sessions = OrderedDict()                  # session_id -> session dict
+        self._lock = threading.Lock()
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self.create_tables()
+        self.purge()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def create_tables(self):
+        with self._connection() as conn, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    scenario_json TEXT NOT NULL,
+                    updated REAL NOT NULL,
+                    turns INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+            if "turns" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN turns INTEGER NOT NULL DEFAULT 0")
+                conn.execute("UPDATE sessions SET turns=(SELECT COUNT(*) FROM session_turns WHERE session_id=sessions.id)")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS session_turns (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    sender TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    PRIMARY KEY (session_id, seq)
+                )
+            ''')
+
+    def create(self, user_id, disease, info, symptoms):
+        """Starts a session for a generated scenario and returns its id."""
+        session_id = uuid.uuid4().hex
+        scenario = {"disease": disease, "info": info, "symptoms": symptoms}
+        now = time.time()
+        with self._connection() as conn, conn:
+            conn.execute("INSERT INTO sessions (id, user_id, scenario_json, updated) VALUES (?, ?, ?, ?)",
+                         (session_id, str(user_id), json.dumps(scenario), now))
+        with self._lock:
+            self._remember(session_id, {"id": session_id, "user_id": str(user_id), **scenario, "history": []})
+            self.counters["created"] += 1
+            purge_due = now - self._last_purge >= self.purge_interval
+            if purge_due:
+                self._last_purge = now
+        if purge_due:
+            self.purge()
+        return session_id
+
+    def get(self, session_id, user_id):
+        """
+        Returns the session as {"id", "user_id", "disease", "info", "symptoms", "history"},
+        or None if it does not exist or belongs to another user.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is not None and len(session["history"]) != self._turn_count(session_id):
+            session = None                              # another worker appended turns (or purged it)
+
+        with self._lock:
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                self.counters["hits"] += 1
+            else:
+                self.counters["misses"] += 1
+
+        if session is None:
+            session = self._load(session_id)
+            if session is None:
+                return None
+            with self._lock:
+                cached = self._sessions.get(session_id)
+                if cached is not None and len(cached["history"]) >= len(session["history"]):
+                    session = cached
+                self._remember(session_id, session)
+
+        if session["user_id"] != str(user_id):
+            return None
+        return session
+
+    def append(self, session_id, turns):
+        """Appends {"text", "sender"} turns to the session's chat history; raises KeyError if it no longer exists."""
+        with self._connection() as conn, conn:
+            # the UPDATE takes SQLite's write lock, so the turn count read next is
+            # this transaction's own and seq numbers stay unique across processes
+            updated = conn.execute("UPDATE sessions SET updated=?, turns=turns+? WHERE id=?",
+                                   (time.time(), len(turns), session_id))
+            if updated.rowcount == 0:
+                raise KeyError(session_id)
+            start = conn.execute("SELECT turns FROM sessions WHERE id=?", (session_id,)).fetchone()[0] - len(turns)
+            rows = [(session_id, start + i, turn["sender"], turn["text"]) for i, turn in enumerate(turns)]
+            conn.executemany("INSERT INTO session_turns (session_id, seq, sender, text) VALUES (?, ?, ?, ?)", rows)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and len(session["history"]) == start:
+                session["history"].extend({"text": turn["text"], "sender": turn["sender"]} for turn in turns)
+            elif session is not None:
+                del self._sessions[session_id]          # behind other turns; get() reloads it
+            self.counters["turns"] += len(rows)
+
+    def purge(self):
+        """Deletes sessions idle for longer than max_age."""
+        cutoff = time.time() - self.max_age
+        with self._connection() as conn, conn:
+            # the first DELETE takes the write lock, so the ids read next are the ones removed
+            conn.execute("DELETE FROM session_turns WHERE session_id IN (SELECT id FROM sessions WHERE updated < ?)",
+                         (cutoff,))
+            expired = [row[0] for row in conn.execute("SELECT id FROM sessions WHERE updated < ?", (cutoff,))]
+            conn.execute("DELETE FROM sessions WHERE updated < ?", (cutoff,))
+        with self._lock:
+            for session_id in expired:
+                self._sessions.pop(session_id, None)
+            self.counters["purged"] += len(expired)
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "cached": len(self._sessions)}
+
+    def close(self):
+        """Closes the pooled connections, e.g. in a pre-fork master before forking."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def after_fork(self):
+        """Resets per-process state in a forked worker; connections are not inherited."""
+        self._pool = queue.LifoQueue(maxsize=self._pool.maxsize)
+        self._lock = threading.Lock()
+
+    def _remember(self, session_id, session):
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        if len(self._sessions) > self.cache_size:
+            self._sessions.popitem(last=False)
+
+    def _turn_count(self, session_id):
+        with self._connection() as conn:
+            row = conn.execute("SELECT turns FROM sessions WHERE id=?", (session_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def _load(self, session_id):
+        with self._connection() as conn:
+            row = conn.execute("SELECT user_id, scenario_json FROM sessions WHERE id=?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            turns = conn.execute("SELECT sender, text FROM session_turns WHERE session_id=? ORDER BY seq",
+                                 (session_id,)).fetchall()
+        return {"id": session_id, "user_id": row[0], **json.loads(row[1]),
+                "history": [{"text": text, "sender": sender} for sender, text in turns]}
@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+import copy
+import hashlib
+import re
+import threading
+
+
+def prompt_key(*parts):
+    """sha256 of the parts with whitespace runs collapsed, so prompts that differ only in spacing share a key."""
+    text = "\x1f".join(re.sub(r"\s+", " ", str(part)).strip() for part in parts)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: the first caller for a key runs the
+    function and later callers with the same key wait for it and get a copy of its
+    result, or its exception. Nothing is kept once the call has finished.
+
+    Calls can also name an admission group (e.g. the disease); at most
+    `max_per_group` calls run for a group at once, so one hot disease with many
+    distinct prompts cannot take every LLM slot.
+
+    Args:
+    - timeout (float): Seconds a caller waits for a shared result or an admission slot before TimeoutError.
+    - max_per_group (int): Calls running at once per admission group.
+    """
+    def __init__(self, timeout=60.0, max_per_group=2):
+        self.timeout = timeout
+        self.max_per_group = max_per_group
+        self.counters = {"calls": 0, "coalesced": 0, "errors": 0, "timeouts": 0, "admission_waits": 0}
+        self._calls = {}                                # key -> _Call in flight
+        self._groups = {}                               # group -> [semaphore, callers holding or waiting]
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, group=None):
+        """Returns fn(), shared with every concurrent caller using the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self.counters["calls" if leader else "coalesced"] += 1
+
+        if not leader:
+            if not call.done.wait(self.timeout):
+                self._count("timeouts")
+                raise TimeoutError("timed out waiting for an identical request in flight")
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            with self._admission(group):
+                call.result = fn()
+        except Exception as e:
+            call.error = e
+            self._count("errors")
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            total = self.counters["calls"] + self.counters["coalesced"]
+            return {
+                **self.counters,
+                "in_flight": len(self._calls),
+                "coalesced_rate": self.counters["coalesced"] / total if total else 0.0,
+            }
+
+    def _count(self, key):
+        with self._lock:
+            self.counters[key] += 1
+
+    @contextmanager
+    def _admission(self, group):
+        if group is None:
+            yield
+            return
+        with self._lock:
+            slot = self._groups.get(group)
+            if slot is None:
+                slot = self._groups[group] = [threading.BoundedSemaphore(self.max_per_group), 0]
+            slot[1] += 1
+        try:
+            if not slot[0].acquire(blocking=False):
+                self._count("admission_waits")
+                if not slot[0].acquire(timeout=self.timeout):
+                    self._count("timeouts")
+                    raise TimeoutError(f"too many requests in flight for {group}")
+            try:
+                yield
+            finally:
+                slot[0].release()
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._groups[group]
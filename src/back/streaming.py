@@ -0,0 +1,117 @@
+import json
+
+JSON_ESCAPES = {
+    '"': '"',
+    '\\': '\\',
+    '/': '/',
+    'b': '\b',
+    'f': '\f',
+    'n': '\n',
+    'r': '\r',
+    't': '\t',
+}
+
+
+class MessageFieldExtractor:
+    """
+    Incrementally pulls the value of one top-level string field out of a JSON
+    object while the document is still streaming in.
+
+    feed() returns the newly decoded characters of the field value, so they can
+    be forwarded before the object is complete. The raw text is kept in `text`
+    for a full parse and schema validation once the stream ends.
+    """
+    def __init__(self, field="message"):
+        self.field = field
+        self.chunks = []
+        self._state = "seek"          # seek -> colon -> value -> field -> done
+        self._depth = 0
+        self._in_string = False
+        self._escape = None           # pending escape sequence after a backslash
+        self._high_surrogate = None
+        self._key = []
+        self._last_key = None
+
+    @property
+    def text(self):
+        return "".join(self.chunks)
+
+    def feed(self, chunk):
+        self.chunks.append(chunk)
+        out = []
+        for ch in chunk:
+            self._step(ch, out)
+        return "".join(out)
+
+    def _step(self, ch, out):
+        if self._in_string:
+            decoded = self._decode(ch)
+            if decoded is None:                                     # closing quote
+                self._in_string = False
+                if self._state == "field":
+                    self._state = "done"
+                elif self._state == "seek" and self._depth == 1:
+                    self._last_key = "".join(self._key)
+                    self._state = "colon"
+                self._key = []
+            elif self._state == "field":
+                out.append(decoded)
+            elif self._state == "seek":
+                self._key.append(decoded)
+            return
+
+        if self._state == "done" or ch in " \t\r\n":
+            return
+        if ch == '"':
+            self._in_string = True
+            if self._state == "value":
+                self._state = "field"
+            return
+        if self._state == "colon":
+            self._state = "value" if ch == ":" and self._last_key == self.field else "seek"
+            if self._state == "value":
+                return
+        elif self._state == "value":
+            self._state = "done"                                    # field is not a string, nothing to stream
+            return
+
+        if ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+
+    def _decode(self, ch):
+        """Returns the decoded text for one raw string character, "" while an escape is pending, None at the closing quote."""
+        if self._escape is None:
+            if ch == "\\":
+                self._escape = ""
+                return ""
+            return None if ch == '"' else ch
+
+        self._escape += ch
+        if self._escape[0] != "u":
+            decoded = JSON_ESCAPES.get(self._escape, "")
+            self._escape = None
+            return decoded
+        if len(self._escape) < 5:
+            return ""
+        try:
+            code = int(self._escape[1:], 16)
+        except ValueError:
+            code = None
+        self._escape = None
+        if code is None:
+            return ""
+        if 0xD800 <= code < 0xDC00:
+            self._high_surrogate = code
+            return ""
+        if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        return chr(code)
+
+
+def sse_event(data, event=None):
+    """Formats one Server-Sent Events frame with a JSON payload."""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
@@ -1,48 +1,169 @@
 import sqlite3
 import hashlib
-import random
+import itertools
 import json
+import queue
+import threading
+from contextlib import contextmanager
 
 class SymptomCache:
-    def __init__(self, db_path='symptom_cache.db', limit=10):
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.cursor = self.conn.cursor()
+    """
+    SQLite store of generated symptom sets, safe to share between Flask threads.
+
+    The database runs in WAL mode so readers never block the writer. Reads borrow
+    a connection from a small pool; writes are queued and group-committed by one
+    writer thread, which also trims each touched disease in the same transaction.
+    """
+    SELECT_RANDOM = "SELECT symptoms_json FROM symptom_cache WHERE disease=? ORDER BY RANDOM() LIMIT 1"
+    ENTRY_STATS = ("SELECT COUNT(*), (julianday('now') - julianday(MAX(timestamp))) * 86400 "
+                   "FROM symptom_cache WHERE disease=?")
+    INSERT = "INSERT OR IGNORE INTO symptom_cache (disease, symptoms_json, hash) VALUES (?, ?, ?)"
+    DELETE = "DELETE FROM symptom_cache WHERE disease=?"
+    TRIM = ("DELETE FROM symptom_cache WHERE id IN (SELECT id FROM symptom_cache WHERE disease=? "
+            "ORDER BY timestamp DESC, id DESC LIMIT -1 OFFSET ?)")
+
+    def __init__(self, db_path='symptom_cache.db', limit=10, pool_size=8, batch_size=32, commit_interval=0.05):
+        self.db_path = db_path
         self.limit = limit
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._writes = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "writes": 0, "trimmed": 0, "evicted": 0}
         self.create_table()
 
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
     def create_table(self):
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS symptom_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                disease TEXT NOT NULL,
-                symptoms_json TEXT NOT NULL,
-                hash TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(disease, hash)
-            )
-        ''')
-        self.conn.commit()
+        with self._connection() as conn, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS symptom_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    disease TEXT NOT NULL,
+                    symptoms_json TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(disease, hash)
+                )
+            ''')
 
     def get_cached_symptoms(self, disease):
-        self.cursor.execute("SELECT symptoms_json FROM symptom_cache WHERE disease=?", (disease,))
-        results = self.cursor.fetchall()
-        return [json.loads(r[0]) for r in results]
+        """Returns one randomly chosen cached symptom set for the disease, or None."""
+        with self._connection() as conn:
+            row = conn.execute(self.SELECT_RANDOM, (disease,)).fetchone()
+        self._count("hits" if row else "misses")
+        return json.loads(row[0]) if row else None
+
+    def keys(self):
+        """Returns every distinct cache key (disease) currently stored, least recently written first."""
+        with self._connection() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT disease FROM symptom_cache GROUP BY disease ORDER BY MAX(timestamp), MAX(id)")]
+
+    def entry_stats(self, disease):
+        """Returns (number of cached sets, age in seconds of the newest set or None) for the disease."""
+        with self._connection() as conn:
+            count, age = conn.execute(self.ENTRY_STATS, (disease,)).fetchone()
+        return count, age
 
     def cache_symptoms(self, disease, symptoms):
+        """Queues a symptom set for the next group commit."""
         json_str = json.dumps(symptoms, sort_keys=True)
         hash_val = hashlib.sha256(json_str.encode()).hexdigest()
-        try:
-            self.cursor.execute("INSERT INTO symptom_cache (disease, symptoms_json, hash) VALUES (?, ?, ?)",
-                                (disease, json_str, hash_val))
-            self.conn.commit()
-        except sqlite3.IntegrityError:
-            pass  # Already exists
-
-        self._trim_cache(disease)
-
-    def _trim_cache(self, disease):
-        self.cursor.execute(
-            "DELETE FROM symptom_cache WHERE id IN (SELECT id FROM symptom_cache WHERE disease=? ORDER BY timestamp ASC LIMIT -1 OFFSET ?)",
-            (disease, self.limit)
-        )
-        self.conn.commit()
+        self._ensure_writer()
+        self._writes.put((disease, json_str, hash_val))
+
+    def evict(self, disease):
+        """Queues the removal of every cached set for the key, in order with the queued writes."""
+        self._ensure_writer()
+        self._writes.put((disease, None, None))
+
+    def stats(self):
+        """Hit/miss counts of get_cached_symptoms() plus committed writes, evicted keys and trimmed rows."""
+        with self._counter_lock:
+            return dict(self.counters)
+
+    def _count(self, key, amount=1):
+        with self._counter_lock:
+            self.counters[key] += amount
+
+    def close(self):
+        """Closes the pooled read connections, e.g. in a pre-fork master before forking."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def after_fork(self):
+        """Resets per-process state in a forked worker: connections and the writer thread are not inherited."""
+        self._pool = queue.LifoQueue(maxsize=self._pool.maxsize)
+        self._writes = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+
+    def flush(self):
+        """Blocks until every queued write has been committed."""
+        self._writes.join()
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="symptom-cache-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._writes.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._writes.get(timeout=self.commit_interval))
+                except queue.Empty:
+                    break
+            inserts = [row for row in batch if row[1] is not None]
+            try:
+                with conn:
+                    # runs of inserts and evictions are applied in queue order
+                    for is_insert, rows in itertools.groupby(batch, key=lambda row: row[1] is not None):
+                        if is_insert:
+                            conn.executemany(self.INSERT, list(rows))
+                        else:
+                            conn.executemany(self.DELETE, [(row[0],) for row in rows])
+                    trimmed = sum(self._trim_cache(conn, disease) for disease in {row[0] for row in inserts})
+                self._count("writes", len(inserts))
+                self._count("evicted", len(batch) - len(inserts))
+                self._count("trimmed", trimmed)
+            except sqlite3.Error as e:
+                print(f"Error: {e}")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    def _trim_cache(self, conn, disease):
+        # keep only the newest `limit` entries for the disease
+        return conn.execute(self.TRIM, (disease, self.limit)).rowcount
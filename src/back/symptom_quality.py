@@ -0,0 +1,91 @@
+import collections
+import json
+import threading
+import numpy as np
+from metrics import SYMPTOM_SETS_REJECTED
+
+
+def symptom_text(name):
+    return name.replace("_", " ").strip()
+
+
+class SymptomQualityGate:
+    """
+    Decides whether a generated symptom set is relevant enough to cache.
+
+    The generated names and descriptions are embedded in one batch together with
+    the disease. Each text is scored by its best cosine similarity to the disease
+    or to the disease's known symptoms (every known symptom when the disease is
+    not in the catalogue); a symptom scores its better text and the set scores the
+    mean over its symptoms. Sets below `threshold` are not cached, so they are
+    served once to the request that generated them and never re-served.
+
+    Args:
+    - encode (callable): list of texts -> L2-normalised embedding matrix.
+    - profiles (dict): disease -> its known symptom names.
+    - symptoms (list): Every known symptom name.
+    - threshold (float): Minimum set score to cache.
+    - recent (int): Latest rejections kept for stats().
+    """
+    def __init__(self, encode, profiles, symptoms, threshold=0.7, recent=10):
+        self.encode = encode
+        self.threshold = threshold
+        self.symptoms = list(symptoms)
+        self.symptom_index = {symptom: j for j, symptom in enumerate(self.symptoms)}
+        self.profiles = {disease.lower().strip(): [self.symptom_index[s] for s in known if s in self.symptom_index]
+                         for disease, known in profiles.items()}
+        self.symptom_vectors = np.asarray(encode([symptom_text(s) for s in self.symptoms]), dtype=np.float32)
+        self.counters = {"accepted": 0, "rejected": 0, "score_sum": 0.0}
+        self.last_score = None
+        self.recent_rejections = collections.deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, encode, threshold=0.7):
+        """Builds the gate from disease_diagnostic_web_data.json."""
+        with open(path) as f:
+            data = json.load(f)
+        profiles = {disease: profile.get("all_symptoms", []) for disease, profile in data["disease_symptom_profiles"].items()}
+        return cls(encode, profiles, data["symptoms"], threshold)
+
+    def score(self, disease, symptoms):
+        """Mean relevance in [-1, 1] of the symptom set to the disease."""
+        names = [str(symptom.get("name", "")) for symptom in symptoms]
+        descriptions = [str(symptom.get("description", "")) for symptom in symptoms]
+        vectors = np.asarray(self.encode([disease, *names, *descriptions]), dtype=np.float32)
+        disease_vector, texts = vectors[0], vectors[1:]
+
+        known = self.profiles.get(disease.lower().strip())
+        known_vectors = self.symptom_vectors[known] if known else self.symptom_vectors
+        relevance = np.maximum(texts @ disease_vector, (texts @ known_vectors.T).max(axis=1))
+        per_symptom = relevance.reshape(2, len(symptoms)).max(axis=0)
+        return float(per_symptom.mean())
+
+    def accept(self, disease, symptoms):
+        """True if the set scores at least `threshold`."""
+        if not symptoms:
+            return False
+        score = self.score(disease, symptoms)
+        accepted = score >= self.threshold
+        with self._lock:
+            self.counters["accepted" if accepted else "rejected"] += 1
+            self.counters["score_sum"] += score
+            self.last_score = score
+            if not accepted:
+                self.recent_rejections.append({"disease": disease, "score": round(score, 4)})
+        if not accepted:
+            SYMPTOM_SETS_REJECTED.inc()
+        return accepted
+
+    def stats(self):
+        with self._lock:
+            checked = self.counters["accepted"] + self.counters["rejected"]
+            return {
+                "accepted": self.counters["accepted"],
+                "rejected": self.counters["rejected"],
+                "mean_score": self.counters["score_sum"] / checked if checked else 0.0,
+                "rejection_rate": self.counters["rejected"] / checked if checked else 0.0,
+                "threshold": self.threshold,
+                "last_score": self.last_score,
+                "recent_rejections": list(self.recent_rejections),
+            }
@@ -0,0 +1,85 @@
+import sys
+import os
+import json
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from decision_tree import DecisionTree, NO, UNSURE, YES
+
+# Questions-to-diagnosis and per-step latency of the decision tree engine.
+# Simulated patients answer "yes" to each of their disease's symptoms with its
+# prevalence, "no" otherwise, and "unsure" at --unsure-rate. The explorer's
+# client-side flow asks a fixed 5 initial + 7 follow-up questions for comparison.
+#   python test_scripts/bench_decision_tree.py --patients 2000 --unsure-rate 0.1
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '..', 'front',
+                         'medsim-ai-front', 'public', 'model', 'disease_diagnostic_web_data.json')
+CLIENT_QUESTIONS = 5 + 7
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def simulate(tree, disease, rng, unsure_rate):
+    """Runs one patient through next_question(); returns (questions, step latencies, diagnosed)."""
+    row = tree.matrix[tree.diseases.index(disease)]
+    answers, steps = [], []
+    while True:
+        started = time.perf_counter()
+        result = tree.next_question(answers)
+        steps.append(time.perf_counter() - started)
+        if result["done"]:
+            return len(answers), steps, disease in result["candidates"]
+        prevalence = row[tree.symptom_index[result["question"]]]
+        if rng.random() < unsure_rate:
+            answer = UNSURE
+        else:
+            answer = YES if rng.random() < prevalence else NO
+        answers.append({"symptom": result["question"], "answer": answer})
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--unsure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    tree = DecisionTree.load(DATA_PATH)
+    build_s = time.perf_counter() - started
+
+    rng = random.Random(args.seed)
+    questions, steps, diagnosed = [], [], 0
+    for _ in range(args.patients):
+        asked, latencies, correct = simulate(tree, rng.choice(tree.diseases), rng, args.unsure_rate)
+        questions.append(asked)
+        steps.extend(latencies)
+        diagnosed += correct
+
+    print(json.dumps({
+        "build_ms": round(build_s * 1000, 2),
+        "expected_questions_noise_free": tree.expected_questions(),
+        "client_questions": CLIENT_QUESTIONS,
+        "simulated": {
+            "patients": args.patients,
+            "unsure_rate": args.unsure_rate,
+            "mean_questions": round(sum(questions) / len(questions), 2),
+            "max_questions": max(questions),
+            "diagnosed_rate": round(diagnosed / args.patients, 4),
+        },
+        "step_latency_us": {
+            "p50": round(percentile(steps, 0.50) * 1e6, 1),
+            "p95": round(percentile(steps, 0.95) * 1e6, 1),
+            "p99": round(percentile(steps, 0.99) * 1e6, 1),
+        },
+        "memo": tree.stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
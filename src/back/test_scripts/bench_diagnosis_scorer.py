@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+import random
+import time
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from diagnosis_scorer import DiagnosisScorer
+
+# Scored cases per second for the diagnosis scorer: one case at a time
+# (matrix-vector) against whole batches (matrix-matrix), plus top-1/top-3 accuracy.
+# Simulated cases report each of their disease's symptoms with its prevalence and
+# deny a few symptoms the disease does not list.
+#   python test_scripts/bench_diagnosis_scorer.py --cases 20000 --batch-size 5000
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '..', 'front',
+                         'medsim-ai-front', 'public', 'model', 'disease_diagnostic_web_data.json')
+
+
+def simulate_cases(scorer, count, rng, denied=3):
+    with open(DATA_PATH) as f:
+        profiles = json.load(f)["disease_symptom_profiles"]
+    cases = []
+    for _ in range(count):
+        disease = rng.choice(scorer.diseases)
+        prevalence = profiles[disease]["symptom_prevalence"]
+        present = [symptom for symptom, p in prevalence.items() if rng.random() < p]
+        others = [symptom for symptom in scorer.symptoms if symptom not in prevalence]
+        cases.append(({"present": present, "absent": rng.sample(others, denied)}, disease))
+    return cases
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    scorer = DiagnosisScorer.load(DATA_PATH)
+    load_s = time.perf_counter() - started
+    cases = simulate_cases(scorer, args.cases, random.Random(args.seed))
+
+    single = cases[:min(len(cases), 2000)]
+    started = time.perf_counter()
+    for case, _ in single:
+        scorer.score(case["present"], case["absent"], k=3)
+    single_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = []
+    for i in range(0, len(cases), args.batch_size):
+        results.extend(scorer.score_batch([case for case, _ in cases[i:i + args.batch_size]], k=3))
+    batch_s = time.perf_counter() - started
+
+    # the matrix product alone, with cases already encoded
+    matrix = np.stack([scorer.encode(case["present"], case["absent"])[0] for case, _ in cases[:args.batch_size]], axis=1)
+    started = time.perf_counter()
+    scorer.posteriors(matrix)
+    matmul_s = time.perf_counter() - started
+
+    top1 = sum(differential[0]["disease"] == disease for (differential, _), (_, disease) in zip(results, cases))
+    top3 = sum(any(d["disease"] == disease for d in differential) for (differential, _), (_, disease) in zip(results, cases))
+    print(json.dumps({
+        "load_ms": round(load_s * 1000, 2),
+        "matrix_shape": list(scorer.weights.shape),
+        "cases": len(cases),
+        "single_cases_per_s": round(len(single) / single_s),
+        "batch_cases_per_s": round(len(cases) / batch_s),
+        "batch_matmul_only_cases_per_s": round(matrix.shape[1] / matmul_s),
+        "top1_accuracy": round(top1 / len(cases), 4),
+        "top3_accuracy": round(top3 / len(cases), 4),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
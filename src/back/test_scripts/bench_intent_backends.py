@@ -0,0 +1,67 @@
+import sys
+import os
+import json
+import subprocess
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+# Compares load time, resident memory and latency of the intent encoder backends.
+# Each backend runs in its own process so RSS is not shared. Export the ONNX
+# models first with `cd src/back/chatbot && python export_onnx.py`.
+#   python test_scripts/bench_intent_backends.py [torch onnx onnx-int8]
+
+BACKENDS = sys.argv[1:] or ["torch", "onnx", "onnx-int8"]
+INPUTS = ["hi", "log me out", "start patient simulation", "how does this work?", "show my profile",
+          "I want to play the disease guessing game", "open my account settings please", "register"]
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_backend(backend):
+    from chatbot.encoders import make_encoder
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    encoder = make_encoder(backend, "all-MiniLM-L6-v2", os.path.join(base_dir, "chatbot", "intent_model", "onnx"))
+    encoder.encode(["warm up"])
+    load_s = time.perf_counter() - started
+
+    single = []
+    for _ in range(20):
+        for text in INPUTS:
+            t = time.perf_counter()
+            encoder.encode([text])
+            single.append(time.perf_counter() - t)
+    batch = INPUTS * 4
+    t = time.perf_counter()
+    for _ in range(20):
+        encoder.encode(batch)
+    batch_ms = (time.perf_counter() - t) / 20 * 1000
+
+    single.sort()
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "rss_mb": round(rss_mb() - rss_before, 1),
+        "single_p50_ms": round(single[len(single) // 2] * 1000, 2),
+        "single_p95_ms": round(single[int(len(single) * 0.95)] * 1000, 2),
+        f"batch{len(batch)}_ms": round(batch_ms, 2),
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        print(json.dumps(run_backend(sys.argv[2])))
+        sys.exit(0)
+    for backend in BACKENDS:
+        result = subprocess.run([sys.executable, __file__, "--child", backend], capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"--- {backend}: failed ---\n{result.stderr.strip().splitlines()[-1] if result.stderr else ''}")
+            continue
+        print(result.stdout.strip().splitlines()[-1])
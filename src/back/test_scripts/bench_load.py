@@ -0,0 +1,272 @@
+"""
+Offline load test for the Flask backend: boots main.py against the stub LLM, an
+in-process Mongo stand-in (mongomock, or a local mongod via --mongo-uri) and temp
+SQLite files, then drives concurrent simulation sessions over real HTTP and
+prints a JSON baseline (throughput, p50/p95/p99 per endpoint, cache hit rates).
+  pip install mongomock
+  python test_scripts/bench_load.py --users 16 --sessions 4 --llm-latency 0.2 --output baseline.json
+Without network access point INTENT_MODEL at a local sentence-transformers model.
+To compare against the pre-fork server, start it with the same environment and
+pass its address and master pid; memory is then summed over the master's workers:
+  LLM_BACKEND=stub CACHE_WARMER=0 gunicorn -c gunicorn.conf.py wsgi:app
+  python test_scripts/bench_load.py --url http://127.0.0.1:5000 --server-pid <master pid>
+"""
+import sys
+import os
+import argparse
+import http.cookiejar
+import json
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+INTENT_MESSAGES = ["hi", "start patient simulation", "how does this work?", "show my profile",
+                   "I want to play the disease guessing game", "log me out"]
+DOCTOR_QUESTIONS = ["When did this start?", "Where exactly does it hurt?", "Any fever or chills?",
+                    "Are you taking any medication?", "Does anything make it better or worse?",
+                    "Have you travelled recently?", "Any family history of this?"]
+PATIENT_PROFILES = [
+    {"age": "35", "gender": "Male", "height": "170", "weight": "70", "bmiType": "Healthy"},
+    {"age": "42", "gender": "Female", "height": "162", "weight": "68", "bmiType": "Overweight"},
+    {"age": "67", "gender": "Male", "height": "175", "weight": "82", "bmiType": "Overweight"},
+    {"age": "24", "gender": "Female", "height": "165", "weight": "52", "bmiType": "Healthy"},
+    {"age": "51", "gender": "Female", "height": "158", "weight": "90", "bmiType": "Obese"},
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--sessions", type=int, default=3, help="simulation sessions per user")
+    parser.add_argument("--turns", type=int, default=4, help="patient chat turns per session")
+    parser.add_argument("--diseases", type=int, default=10, help="distinct diseases drawn from the catalogue")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub LLM seconds per call")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0, help="stub LLM transient failure rate")
+    parser.add_argument("--mongo-uri", help="local MongoDB URI (default: in-process mongomock)")
+    parser.add_argument("--url", help="benchmark an already running server instead of booting one in-process")
+    parser.add_argument("--server-pid", type=int, help="with --url: pid of the server (gunicorn master) for memory figures")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON baseline to this file")
+    return parser.parse_args()
+
+
+def boot_app(args, workdir):
+    """Imports main.py with every external dependency pointed at local stand-ins."""
+    os.environ.update({
+        "LLM_BACKEND": "stub",
+        "LLM_STUB_LATENCY": str(args.llm_latency),
+        "LLM_STUB_FAILURE_RATE": str(args.llm_failure_rate),
+        "CACHE_WARMER": "0",
+        "secret": os.environ.get("secret", "bench-secret"),
+        "SYMPTOM_CACHE_DB": os.path.join(workdir, "symptom_cache.db"),
+        "SESSION_DB": os.path.join(workdir, "sessions.db"),
+        "JOB_DB": os.path.join(workdir, "jobs.db"),
+        "MONGO_URI": args.mongo_uri or "mongodb://localhost:27017/medsim_bench",
+    })
+    if not args.mongo_uri:
+        import flask_pymongo
+        import mongomock
+        flask_pymongo.MongoClient = mongomock.MongoClient
+
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))   # main.py loads paths relative to src/back
+    import main
+    return main
+
+
+def load_catalogue():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '..', 'front', 'medsim-ai-front',
+                        'public', 'model', 'disease_diagnostic_web_data.json')
+    with open(path) as f:
+        return [disease.lower().rstrip() for disease in json.load(f)["diseases"]]
+
+
+def memory_kb(pid):
+    """(RSS, PSS) of a process in kB; PSS splits shared pages between the processes mapping them."""
+    fields = {}
+    for name in ("status", "smaps_rollup"):
+        try:
+            with open(f"/proc/{pid}/{name}") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key in ("VmRSS", "Pss"):
+                        fields[key] = int(value.split()[0])
+        except OSError:
+            pass
+    return fields.get("VmRSS"), fields.get("Pss")
+
+
+def child_pids(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return children
+
+
+def memory_report(pid):
+    """RSS/PSS in MB for the server process and, for a pre-fork master, each of its workers."""
+    def entry(p):
+        rss, pss = memory_kb(p)
+        return {"pid": p, "rss_mb": round(rss / 1024, 1) if rss else None, "pss_mb": round(pss / 1024, 1) if pss else None}
+    workers = [entry(p) for p in child_pids(pid)]
+    report = {"server": entry(pid), "workers": workers}
+    if workers:
+        report["mean_worker_rss_mb"] = round(sum(w["rss_mb"] or 0 for w in workers) / len(workers), 1)
+        report["total_pss_mb"] = round(sum(w["pss_mb"] or 0 for w in [report["server"], *workers]), 1)
+    return report
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self):
+        summary = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            samples = sorted(samples)
+            pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2)
+            summary[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors.get(endpoint, 0),
+                "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+                "p50_ms": pick(0.50),
+                "p95_ms": pick(0.95),
+                "p99_ms": pick(0.99),
+            }
+        return summary
+
+
+class VirtualUser:
+    def __init__(self, base_url, recorder, rng, index):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.rng = rng
+        self.index = index
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def call(self, method, path, body=None, endpoint=None):
+        """Returns (status, headers, parsed JSON or None) and records the latency."""
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=120) as response:
+                status, headers, payload = response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            status, headers, payload = e.code, e.headers, e.read()
+        self.recorder.record(endpoint or path, time.perf_counter() - started, status < 400)
+        try:
+            return status, headers, json.loads(payload)
+        except ValueError:
+            return status, headers, None
+
+    def login(self):
+        account = {"username": f"bench{self.index}", "email": f"bench{self.index}@example.com", "password": "bench-password"}
+        self.call("POST", "/signup", account)
+        self.call("POST", "/login", {"email": account["email"], "password": account["password"]})
+
+    def run_session(self, diseases, turns):
+        for message in self.rng.sample(INTENT_MESSAGES, 2):
+            self.call("POST", "/intent", {"message": message})
+
+        status, headers, _ = self.call("POST", "/get_symptoms", {"disease": self.rng.choice(diseases),
+                                                                 "Info": self.rng.choice(PATIENT_PROFILES)})
+        session_id = headers.get("X-Session-Id")
+        if status >= 400 or not session_id:
+            return
+        for question in self.rng.sample(DOCTOR_QUESTIONS, min(turns, len(DOCTOR_QUESTIONS))):
+            self.call("POST", "/patientResponse", {"session_id": session_id, "userResponse": question})
+        self.call("POST", "/generateReport", {"session_id": session_id, "userResponse": "I think it is the disease."})
+        self.call("POST", "/get_reports", {"action": "page", "limit": 4}, endpoint="/get_reports")
+
+
+def main():
+    args = parse_args()
+    server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        server_pid = args.server_pid
+    else:
+        app_module = boot_app(args, tempfile.mkdtemp(prefix="medsim-bench-"))
+        from werkzeug.serving import make_server
+        server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        server_pid = os.getpid()
+
+    rng = random.Random(args.seed)
+    catalogue = load_catalogue()
+    diseases = rng.sample(catalogue, min(args.diseases, len(catalogue)))
+    recorder = Recorder()
+    users = [VirtualUser(base_url, recorder, random.Random(rng.random()), i) for i in range(args.users)]
+    for user in users:
+        user.login()
+
+    def drive(user):
+        for _ in range(args.sessions):
+            user.run_session(diseases, args.turns)
+
+    threads = [threading.Thread(target=drive, args=(user,)) for user in users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    _, _, stats = users[0].call("GET", "/cache_stats", endpoint="stats")
+    memory = memory_report(server_pid) if server_pid else None
+    if server is not None:
+        server.shutdown()
+    endpoints = recorder.summary()
+    endpoints.pop("stats", None)
+    for setup in ("/signup", "/login"):
+        endpoints.pop(setup, None)
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    stats = stats or {}
+    baseline = {
+        "config": vars(args),
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "endpoints": endpoints,
+        "memory": memory,
+        "cache": {
+            "symptom_cache_hit_rate": stats.get("symptom_cache", {}).get("hit_rate"),
+            "intent_cache_hit_rate": (stats.get("intent_cache", {}).get("cache_hits", 0)
+                                      / max(1, stats.get("intent_cache", {}).get("requests", 0))),
+            "intent_mean_batch_size": stats.get("intent_cache", {}).get("mean_batch_size"),
+            "user_cache_hit_rate": stats.get("user_cache", {}).get("hit_rate"),
+            "context_tokens_saved_ratio": stats.get("conversation_context", {}).get("saved_ratio"),
+            "llm_output": stats.get("llm_output"),
+        },
+    }
+    print(json.dumps(baseline, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(baseline, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
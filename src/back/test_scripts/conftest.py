@@ -0,0 +1,15 @@
+import pytest
+
+PREVALENCE = {
+    "Flu": {"fever": 0.95, "cough": 0.9, "fatigue": 0.9},
+    "Cold": {"cough": 0.95, "sneezing": 0.9},
+    "Migraine": {"headache": 1.0, "nausea": 0.9, "fatigue": 0.85},
+    "Allergy": {"sneezing": 0.95, "itching": 0.9},
+}
+SYMPTOMS = ["fever", "cough", "fatigue", "sneezing", "headache", "nausea", "itching"]
+
+
+@pytest.fixture
+def catalogue():
+    """(diseases, symptoms, prevalence) of a small catalogue for the diagnosis engines."""
+    return list(PREVALENCE), list(SYMPTOMS), {disease: dict(p) for disease, p in PREVALENCE.items()}
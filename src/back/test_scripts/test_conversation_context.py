@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from conversation_context import ConversationContext, estimate_tokens
+
+
+def chat(turns):
+    history = []
+    for i in range(turns):
+        history.append({"sender": "user", "text": f"Doctor question {i}: where does it hurt and since when?"})
+        history.append({"sender": "bot", "text": f"Patient answer {i}: my chest, for about {i} days now."})
+    return history
+
+
+def test_short_history_is_kept_verbatim():
+    context, metrics = ConversationContext(budget_tokens=600).build(chat(2))
+    assert "Summary" not in context
+    assert metrics["summarized_turns"] == 0 and metrics["tokens_saved"] == 0
+
+
+def test_context_size_stays_flat_as_history_grows():
+    manager = ConversationContext(budget_tokens=80, summary_tokens=60)
+    sizes = [manager.build(chat(turns))[1]["context_tokens"] for turns in range(10, 40)]
+    assert max(sizes) <= 80 + 60 + estimate_tokens("Summary of earlier conversation:\nRecent conversation:\n") + 5
+    context, _ = manager.build(chat(40))
+    assert context.endswith("Patient answer 39: my chest, for about 39 days now.")
+
+
+def test_summary_reused_across_turns():
+    manager = ConversationContext(budget_tokens=80, summary_tokens=60)
+    first = manager.build(chat(20))
+    assert manager.build(chat(20)) == first
+    assert manager.stats()["summary_hits"] == 1
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from decision_tree import DecisionTree
+
+
+def walk(engine, disease, prevalence):
+    answers = []
+    while True:
+        result = engine.next_question(answers)
+        if result["done"]:
+            return result, answers
+        answer = "yes" if result["question"] in prevalence[disease] else "no"
+        answers.append({"symptom": result["question"], "answer": answer})
+
+
+def test_every_disease_is_reached(catalogue):
+    engine = DecisionTree(*catalogue)
+    prevalence = catalogue[2]
+    for disease in prevalence:
+        result, answers = walk(engine, disease, prevalence)
+        assert result["candidates"] == [disease]
+        assert len(answers) <= engine.expected_questions()["max"]
+
+
+def test_unsure_symptom_is_not_asked_again(catalogue):
+    engine = DecisionTree(*catalogue)
+    first = engine.next_question([])["question"]
+    assert engine.next_question([{"symptom": first, "answer": "unsure"}])["question"] != first
+
+
+def test_contradicting_answer_backtracks(catalogue):
+    result = DecisionTree(*catalogue).next_question([{"symptom": "headache", "answer": "yes"}, {"symptom": "sneezing", "answer": "yes"}])
+    assert result["conflicts"] == ["sneezing"]
+    assert result["candidates"] == ["Migraine"] and result["done"]
+
+
+def test_unknown_symptom_is_rejected(catalogue):
+    try:
+        DecisionTree(*catalogue).next_question([{"symptom": "glowing", "answer": "yes"}])
+    except ValueError:
+        return
+    assert False, "expected ValueError"
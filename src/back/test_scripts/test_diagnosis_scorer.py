@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from diagnosis_scorer import DiagnosisScorer
+
+
+def test_differential_is_ranked_by_posterior(catalogue):
+    scorer = DiagnosisScorer(*catalogue)
+    differential, unknown = scorer.score(["cough", "fever"], ["sneezing"], k=3)
+    assert [d["disease"] for d in differential][0] == "Flu"
+    assert abs(sum(d["posterior"] for d in differential) - 1.0) < 1e-5
+    assert differential[0]["posterior"] > differential[1]["posterior"] >= differential[2]["posterior"]
+    assert unknown == []
+
+
+def test_unexpected_symptom_lowers_but_does_not_exclude(catalogue):
+    scorer = DiagnosisScorer(*catalogue)
+    differential, _ = scorer.score(["headache", "nausea", "cough"], k=3)
+    assert differential[0]["disease"] == "Migraine" and differential[0]["posterior"] < 1.0
+
+
+def test_batch_matches_single_scoring(catalogue):
+    scorer = DiagnosisScorer(*catalogue)
+    cases = [{"present": ["cough", "sneezing"]}, {"present": ["headache"], "absent": ["fever"]},
+             {"present": ["glowing"]}]
+    for case, (differential, unknown) in zip(cases, scorer.score_batch(cases, k=2)):
+        single, single_unknown = scorer.score(case.get("present", ()), case.get("absent", ()), k=2)
+        assert [d["disease"] for d in differential] == [d["disease"] for d in single]
+        assert all(abs(a["posterior"] - b["posterior"]) < 1e-6 for a, b in zip(differential, single))
+        assert unknown == single_unknown
+    assert scorer.score_batch(cases)[2][1] == ["glowing"]
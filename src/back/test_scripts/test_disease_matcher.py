@@ -0,0 +1,47 @@
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from disease_matcher import DiseaseMatcher
+
+# axis-aligned fixture: each symptom points along one axis, each disease mixes its own symptoms
+SYMPTOMS = {"fever": [1, 0, 0, 0], "cough": [0, 1, 0, 0], "headache": [0, 0, 1, 0], "rash": [0, 0, 0, 1]}
+DISEASES = {
+    "flu": [1, 1, 0, 0],
+    "migraine": [0, 0.2, 1, 0],
+    "measles": [0.5, 0, 0, 1],
+    "eczema": [0, 0, 0.1, 1],
+}
+
+
+def matcher():
+    directory = tempfile.mkdtemp()
+    for name, catalogue in (("diseases.json", DISEASES), ("symptoms.json", SYMPTOMS)):
+        with open(os.path.join(directory, name), "w") as f:
+            json.dump({key: {"embedding": vector} for key, vector in catalogue.items()}, f)
+    return DiseaseMatcher(os.path.join(directory, "diseases.json"), os.path.join(directory, "symptoms.json"),
+                          os.path.join(directory, "cache"))
+
+
+def test_expected_disease_ranks_first():
+    matches, unknown = matcher().match(["fever", "cough"])
+    assert matches[0]["disease"] == "flu" and unknown == []
+    assert abs(matches[0]["similarity"] - 1.0) < 1e-6
+    similarities = [m["similarity"] for m in matches]
+    assert similarities == sorted(similarities, reverse=True)
+
+
+def test_k_is_honoured():
+    m = matcher()
+    assert [x["disease"] for x in m.match(["rash"], k=2)[0]] == ["eczema", "measles"]
+    assert len(m.match(["rash"], k=1)[0]) == 1
+    assert len(m.match(["rash"], k=50)[0]) == len(DISEASES)
+
+
+def test_unknown_symptoms_are_reported():
+    m = matcher()
+    matches, unknown = m.match(["headache", "nausea"])
+    assert matches[0]["disease"] == "migraine" and unknown == ["nausea"]
+    assert m.match(["nausea"]) == ([], ["nausea"])
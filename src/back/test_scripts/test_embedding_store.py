@@ -0,0 +1,67 @@
+import sys
+import os
+import json
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from embedding_store import EmbeddingStore, append_store, convert_json, export_json, write_store
+
+NAMES = ["flu", "cold", "migraine"]
+
+
+def vectors(rows, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+
+
+def test_store_round_trips_through_mmap():
+    prefix = os.path.join(tempfile.mkdtemp(), "diseases")
+    matrix = vectors(len(NAMES))
+    write_store(prefix, NAMES, matrix, dtype="float32", normalize=False, metadata={"flu": {"symptoms": ["fever"]}})
+
+    store = EmbeddingStore.load(prefix)
+    assert isinstance(store.matrix, np.memmap)
+    assert store.names == NAMES and len(store) == 3 and "cold" in store
+    assert np.array_equal(store.vectors(NAMES), matrix)
+    assert np.array_equal(store.vector("migraine"), matrix[2])
+    assert store.metadata == {"flu": {"symptoms": ["fever"]}}
+
+
+def test_float16_store_is_normalised():
+    prefix = os.path.join(tempfile.mkdtemp(), "diseases")
+    write_store(prefix, NAMES, vectors(len(NAMES)) * 5)
+    store = EmbeddingStore.load(prefix)
+    assert store.matrix.dtype == np.float16 and store.normalized
+    assert np.allclose(np.linalg.norm(store.vectors(NAMES), axis=1), 1.0, atol=1e-3)
+
+
+def test_append_is_visible_to_new_readers_only():
+    prefix = os.path.join(tempfile.mkdtemp(), "diseases")
+    matrix = vectors(len(NAMES))
+    write_store(prefix, NAMES, matrix, dtype="float32", normalize=False)
+    old_reader = EmbeddingStore.load(prefix)
+
+    extra = vectors(1, seed=1)
+    append_store(prefix, ["asthma"], extra)
+    new_reader = EmbeddingStore.load(prefix)
+
+    assert new_reader.names == NAMES + ["asthma"]
+    assert np.array_equal(new_reader.vectors(NAMES + ["asthma"]), np.vstack([matrix, extra]))
+    assert "asthma" not in old_reader and np.array_equal(old_reader.vectors(NAMES), matrix)
+
+
+def test_json_conversion_round_trips():
+    directory = tempfile.mkdtemp()
+    source = {name: {"embedding": row.tolist(), "symptoms": [name + "_symptom"]}
+              for name, row in zip(NAMES, vectors(len(NAMES)))}
+    with open(os.path.join(directory, "diseases.json"), "w") as f:
+        json.dump(source, f)
+    convert_json(os.path.join(directory, "diseases.json"), os.path.join(directory, "diseases"), dtype="float32",
+                 normalize=False)
+    export_json(os.path.join(directory, "diseases"), os.path.join(directory, "exported.json"))
+    with open(os.path.join(directory, "exported.json")) as f:
+        exported = json.load(f)
+    assert list(exported) == NAMES
+    for name in NAMES:
+        assert exported[name]["symptoms"] == source[name]["symptoms"]
+        assert np.allclose(exported[name]["embedding"], source[name]["embedding"])
@@ -0,0 +1,63 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from llm_output import LLMOutput, coerce, remove_trailing_commas, strip_fences
+from schema_validation import SchemaValidator
+
+SYMPTOM_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "required": ["name", "severity"],
+        "properties": {
+            "name": {"type": "string"},
+            "severity": {"type": "number", "minimum": 0, "maximum": 5},
+        },
+        "additionalProperties": False,
+    },
+}
+
+
+class ScriptedLLM:
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def model(self, prompt):
+        self.prompts.append(prompt)
+        return self.replies.pop(0)
+
+
+def test_local_repairs():
+    assert strip_fences('```json\n[{"a": 1}]\n```') == '[{"a": 1}]'
+    assert strip_fences('Sure! {"a": 1} hope this helps') == '{"a": 1}'
+    assert remove_trailing_commas('{"a": [1, 2,], "b": "x,]",}') == '{"a": [1, 2], "b": "x,]"}'
+    data, changed = coerce([{"name": "Cough", "severity": "3"}, {"name": "Fever", "severity": 9}], SYMPTOM_SCHEMA)
+    assert changed and data == [{"name": "Cough", "severity": 3}, {"name": "Fever", "severity": 5}]
+
+
+def test_repaired_without_retry():
+    llm = ScriptedLLM('```json\n[{"name": "Cough", "severity": "7",},]\n```')
+    output = LLMOutput(llm)
+    assert output.generate("prompt", SchemaValidator(SYMPTOM_SCHEMA), "symptoms") == [{"name": "Cough", "severity": 5}]
+    assert len(llm.prompts) == 1
+    assert output.stats()["symptoms"]["repaired"] == 1
+
+
+def test_retry_carries_validator_error():
+    llm = ScriptedLLM('[{"name": "Cough"}]', '[{"name": "Cough", "severity": 2}]')
+    output = LLMOutput(llm)
+    assert output.generate("prompt", SchemaValidator(SYMPTOM_SCHEMA), "symptoms") == [{"name": "Cough", "severity": 2}]
+    assert "root[0].severity is required" in llm.prompts[1]
+    assert output.stats()["symptoms"]["retried"] == 1
+
+
+def test_no_retry_outside_budget(caplog):
+    llm = ScriptedLLM("not json")
+    output = LLMOutput(llm, budget=0)
+    assert output.generate("prompt", SchemaValidator(SYMPTOM_SCHEMA), "symptoms") is None
+    assert output.stats()["symptoms"]["failed"] == 1
+    event = json.loads(caplog.records[-1].getMessage())
+    assert event["event"] == "llm_output_rejected" and event["endpoint"] == "symptoms" and event["retries"] == 0
@@ -0,0 +1,72 @@
+import sys
+import os
+import datetime
+import pytest
+from bson import ObjectId
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from reports import update_report_summary, rebuild_report_summary, format_report_summary
+
+mongomock = pytest.importorskip("mongomock")
+
+
+def store_report(reports, user_oid, minutes, score):
+    flat_report = {"Clinical Reasoning": score, "Correctly Diagnosed": 1}
+    timestamp = datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=minutes)
+    reports.insert_one({"user_id": user_oid, "timestamp": timestamp, **flat_report})
+    return flat_report, timestamp
+
+
+def test_first_rollup_counts_earlier_reports():
+    db = mongomock.MongoClient().db
+    user_oid = ObjectId()
+    for minutes, score in enumerate([2, 4, 6]):                  # written before rollups were kept
+        store_report(db.profile, user_oid, minutes, score)
+
+    flat_report, timestamp = store_report(db.profile, user_oid, 3, 8)
+    update_report_summary(db.profile_summary, db.profile, user_oid, flat_report, timestamp)
+
+    summary = format_report_summary(db.profile_summary.find_one({"_id": user_oid}))
+    assert summary["count"] == db.profile.count_documents({"user_id": user_oid}) == 4
+    assert summary["categories"]["Clinical Reasoning"] == {"mean": 5.0, "min": 2, "max": 8}
+    assert [report["Clinical Reasoning"] for report in summary["recent"]] == [2, 4, 6, 8]
+
+
+def test_later_reports_are_folded_in():
+    db = mongomock.MongoClient().db
+    user_oid = ObjectId()
+    for minutes, score in enumerate([3, 9]):
+        flat_report, timestamp = store_report(db.profile, user_oid, minutes, score)
+        update_report_summary(db.profile_summary, db.profile, user_oid, flat_report, timestamp)
+
+    summary = db.profile_summary.find_one({"_id": user_oid})
+    assert summary["count"] == 2 and summary["sum"]["Clinical Reasoning"] == 12
+    rebuilt = rebuild_report_summary(db.profile_summary, db.profile, user_oid)
+    assert rebuilt["count"] == 2 and rebuilt["sum"] == summary["sum"]
+
+
+def test_report_folded_in_during_a_rebuild_is_not_lost():
+    db = mongomock.MongoClient().db
+    user_oid = ObjectId()
+    for minutes, score in enumerate([2, 4]):
+        flat_report, timestamp = store_report(db.profile, user_oid, minutes, score)
+        update_report_summary(db.profile_summary, db.profile, user_oid, flat_report, timestamp)
+
+    class RacingReports:
+        """Stores and folds in one more report right after the rebuild's aggregate reads."""
+        def __init__(self, reports):
+            self.reports, self.raced = reports, False
+
+        def aggregate(self, pipeline):
+            result = list(self.reports.aggregate(pipeline))
+            if not self.raced:
+                self.raced = True
+                flat_report, timestamp = store_report(self.reports, user_oid, 9, 6)
+                update_report_summary(db.profile_summary, self.reports, user_oid, flat_report, timestamp)
+            return iter(result)
+
+        def find(self, *args, **kwargs):
+            return self.reports.find(*args, **kwargs)
+
+    rebuild_report_summary(db.profile_summary, RacingReports(db.profile), user_oid)
+    assert db.profile_summary.find_one({"_id": user_oid})["count"] == 3
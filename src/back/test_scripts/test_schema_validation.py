@@ -1,5 +1,6 @@
 import sys
 import os
+import pytest
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from schema_validation import SchemaValidator
@@ -24,6 +25,61 @@ sample_schema = {
     }
 }
 
+class BaselineValidator:
+    """The interpretive validator this module replaced, kept verbatim as the reference for its decisions."""
+    def __init__(self, schema):
+        self.schema = schema
+
+    def validate(self, data, schema=None, path="root"):
+        schema = schema or self.schema
+        schema_type = schema.get("type")
+
+        if schema_type == "object":
+            if not isinstance(data, dict):
+                return f"{path} should be an object"
+            return self._validate_object(data, schema, path)
+        elif schema_type == "array":
+            if not isinstance(data, list):
+                return f"{path} should be an array"
+            return self._validate_array(data, schema, path)
+        elif schema_type == "string":
+            if not isinstance(data, str):
+                return f"{path} should be a string"
+        elif schema_type == "number":
+            if not isinstance(data, (int, float)):
+                return f"{path} should be a number"
+            if "minimum" in schema and data < schema["minimum"]:
+                return f"{path} should be >= {schema['minimum']}"
+            if "maximum" in schema and data > schema["maximum"]:
+                return f"{path} should be <= {schema['maximum']}"
+        else:
+            raise Exception("Validation type not specified, reached end of comaparision")
+        return None
+
+    def _validate_object(self, data, schema, path):
+        errors = []
+        for key in schema.get("required", []):
+            if key not in data:
+                errors.append(f"{path}.{key} is required")
+        properties = schema.get("properties", {})
+        for key, value in data.items():
+            if key in properties:
+                error = self.validate(value, properties[key], f"{path}.{key}")
+                if error:
+                    errors.append(error)
+            elif not schema.get("additionalProperties", True):
+                errors.append(f"{path}.{key} is not allowed")
+        return "\n".join(errors) if errors else None
+
+    def _validate_array(self, data, schema, path):
+        errors = []
+        for i, item in enumerate(data):
+            error = self.validate(item, schema.get("items", {}), f"{path}[{i}]")
+            if error:
+                errors.append(error)
+        return "\n".join(errors) if errors else None
+
+
 validator = SchemaValidator(sample_schema)
 
 # 20 challenging LLM-style samples
@@ -53,12 +109,41 @@ test_cases = {
     "20. Valid complex description": [{"name": "Migraine", "description": "Pulsating pain, worse with light and sound!", "severity": 4, "location": "Head"}]
 }
 
-# Run validations
-for label, data in test_cases.items():
-    print(f"--- {label} ---")
-    try:
-        result = validator.validate(data)
-        print(result or "✅ Valid")
-    except Exception as e:
-        print(f"❌ Exception: {e}")
-    print()
+
+def test_decisions_match_the_baseline_validator():
+    baseline = BaselineValidator(sample_schema)
+    for label, data in test_cases.items():
+        assert (validator.validate(data) is None) == (baseline.validate(data) is None), label
+        assert validator.validate(data) == baseline.validate(data), label
+
+
+def test_decisions_match_jsonschema():
+    jsonschema = pytest.importorskip("jsonschema")
+    reference = jsonschema.Draft7Validator(sample_schema)
+    for label, data in test_cases.items():
+        assert (validator.validate(data) is None) == reference.is_valid(data), label
+
+
+def test_compiled_check_agrees_with_interpretive_walk():
+    for label, data in test_cases.items():
+        interpreted = "\n".join(validator._errors(data, sample_schema, "root")) or None
+        assert validator.validate(data) == interpreted, label
+        first_error = SchemaValidator(sample_schema, fail_fast=True).validate(data)
+        assert first_error == (interpreted.split("\n")[0] if interpreted else None), label
+
+
+if __name__ == "__main__":
+    # Micro-benchmark on a large valid symptom array
+    import timeit
+
+    large_symptoms = [
+        {"name": f"Symptom {i}", "description": "Throbbing pain, primarily in the temples", "severity": i % 6, "location": "Head"}
+        for i in range(5000)
+    ]
+    runs = 20
+    compiled_time = timeit.timeit(lambda: validator.validate(large_symptoms), number=runs) / runs
+    interpreted_time = timeit.timeit(lambda: "\n".join(validator._errors(large_symptoms, sample_schema, "root")), number=runs) / runs
+    print(f"--- Benchmark: {len(large_symptoms)} symptoms ---")
+    print(f"compiled:    {compiled_time * 1000:.2f} ms")
+    print(f"interpreted: {interpreted_time * 1000:.2f} ms")
+    print(f"speedup:     {interpreted_time / compiled_time:.1f}x")
@@ -0,0 +1,72 @@
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from semantic_cache import SemanticSymptomCache
+from symptom_cache import SymptomCache
+
+SYMPTOMS = [{"name": "Fever", "description": "high fever", "severity": 3, "location": "Head"}]
+
+
+def encode(texts):
+    """Distinct unit vector per text, so only exact keys match."""
+    vectors = np.stack([np.random.default_rng(list(text.encode())).normal(size=64) for text in texts])
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def semantic_cache(**caps):
+    store = SymptomCache(os.path.join(tempfile.mkdtemp(), "cache.db"))
+    return SemanticSymptomCache(store, encode, **caps), store
+
+
+def test_least_recently_used_profile_is_evicted_per_disease():
+    cache, store = semantic_cache(max_keys_per_disease=2, max_keys=100)
+    for age in (20, 30, 40):
+        cache.store("flu", {"age": age}, SYMPTOMS)
+        if age == 30:
+            store.flush()
+            assert cache.lookup("flu", {"age": 20})[2] == "hit"     # 20s is now newer than 30s
+    store.flush()
+
+    assert cache.lookup("flu", {"age": 30})[2] == "miss"
+    assert cache.lookup("flu", {"age": 20})[2] == "hit"
+    assert store.keys() == [cache.key_for("flu", {"age": 20}), cache.key_for("flu", {"age": 40})]
+    assert cache.stats()["keys"] == 2 and cache.stats()["evicted"] == 1
+
+
+def test_total_cap_and_pinned_keys():
+    cache, store = semantic_cache(max_keys_per_disease=10, max_keys=3)
+    pinned = cache.key_for("flu", {"age": 35})
+    cache.pin([pinned])
+    cache.store_key(pinned, SYMPTOMS)
+    for disease in ("cold", "asthma", "gout", "acne"):
+        cache.store(disease, {"age": 35}, SYMPTOMS)
+    store.flush()
+
+    assert cache.lookup("flu", {"age": 35})[2] == "hit"
+    assert cache.lookup("cold", {"age": 35})[2] == "miss"
+    assert cache.stats()["keys"] == 4                               # three unpinned plus the pinned one
+
+
+def test_vectors_grow_in_chunks_and_survive_eviction():
+    cache, _ = semantic_cache(max_keys_per_disease=1000, max_keys=300)
+    for age in range(0, 4000, 10):
+        cache.store("flu", {"age": age}, SYMPTOMS)
+    assert len(cache.keys) == 300 and cache.disease_vectors.shape[0] % cache.GROW_ROWS == 0
+    for key, row in cache.key_index.items():
+        disease_vector, profile_vector = cache._embed_key(key)
+        assert cache.keys[row] == key
+        assert np.allclose(cache.profile_vectors[row], profile_vector)
+
+
+def test_profiles_differing_in_gender_do_not_share_sets():
+    # one shared vector per part, so every key is a near neighbour of every other
+    cache = SemanticSymptomCache(SymptomCache(os.path.join(tempfile.mkdtemp(), "cache.db")),
+                                 lambda texts: np.ones((len(texts), 4)) / 2)
+    cache.store("flu", {"age": 34, "gender": "Male", "bmiType": "Healthy"}, SYMPTOMS)
+    cache.cache.flush()
+    assert cache.lookup("flu", {"age": 36, "gender": "Male", "bmiType": "Healthy", "height": "170"})[2] == "near_hit"
+    assert cache.lookup("flu", {"age": 34, "gender": "Female", "bmiType": "Healthy"})[2] == "miss"
+    assert cache.lookup("flu", {"age": 44, "gender": "Male", "bmiType": "Healthy"})[2] == "miss"
@@ -0,0 +1,64 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from single_flight import SingleFlight, prompt_key
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_calls_share_one_generation():
+    flight = SingleFlight()
+    calls = []
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        return [{"name": "Fever"}]
+    results = run_concurrently(8, lambda: flight.do(prompt_key("get_symptoms", "flu  prompt"), generate))
+    assert len(calls) == 1
+    assert all(result == [{"name": "Fever"}] for result in results)
+    assert flight.stats()["coalesced"] == 7 and flight.stats()["in_flight"] == 0
+    assert prompt_key("a \n b") == prompt_key("a b")
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+    def fail():
+        time.sleep(0.05)
+        raise TimeoutError("LLM concurrency limit reached")
+    results = run_concurrently(4, lambda: flight.do("key", fail))
+    assert all(isinstance(result, TimeoutError) for result in results)
+    assert flight.do("key", lambda: "ok") == "ok"                   # failures are not remembered
+
+
+def test_group_admission_bounds_distinct_prompts():
+    flight = SingleFlight(timeout=0.05, max_per_group=2)
+    running, peak, lock = [0], [0], threading.Lock()
+    def generate():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.2)
+        with lock:
+            running[0] -= 1
+        return "ok"
+    keys = iter(range(5))
+    results = run_concurrently(5, lambda: flight.do(next(keys), generate, group="disease:flu"))
+    assert peak[0] == 2
+    assert results.count("ok") == 2
+    assert sum(isinstance(result, TimeoutError) for result in results) == 3
@@ -0,0 +1,47 @@
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from llm import LLM, StubBackend
+from streaming import MessageFieldExtractor, sse_event
+
+
+def stream_in_chunks(document, size):
+    extractor = MessageFieldExtractor("message")
+    streamed = "".join(extractor.feed(document[i:i + size]) for i in range(0, len(document), size))
+    return extractor, streamed
+
+
+def test_message_extracted_for_every_chunk_size():
+    document = json.dumps({"message": "It hurts \"here\",\nnear my chest é \U0001F600 \\ done"})
+    expected = json.loads(document)["message"]
+    for size in range(1, len(document) + 1):
+        extractor, streamed = stream_in_chunks(document, size)
+        assert streamed == expected, size
+        assert json.loads(extractor.text)["message"] == expected
+
+
+def test_nested_and_decoy_keys_ignored():
+    document = '{"meta": {"message": "nested"}, "note": "message", "message" : "real"}'
+    _, streamed = stream_in_chunks(document, 3)
+    assert streamed == "real"
+
+
+def test_non_string_message_streams_nothing():
+    _, streamed = stream_in_chunks('{"message": 42}', 2)
+    assert streamed == ""
+
+
+def test_sse_event_format():
+    assert sse_event({"delta": "hi"}) == 'data: {"delta": "hi"}\n\n'
+    assert sse_event({"message": "x"}, event="done") == 'event: done\ndata: {"message": "x"}\n\n'
+
+
+def test_slow_reader_does_not_hold_the_llm_slot():
+    client = LLM(backend=StubBackend(), max_concurrency=1, queue_timeout=1)
+    reader = client.stream("virtual patient")
+    next(reader)                                                # a client that stops reading after one chunk
+    assert client.semaphore.acquire(timeout=1)                  # the model stream has ended and freed the slot
+    client.semaphore.release()
+    assert "".join(reader)                                      # the rest was buffered
@@ -0,0 +1,47 @@
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from symptom_quality import SymptomQualityGate
+
+VOCABULARY = ["fever", "cough", "chills", "headache", "nausea", "rash", "itching", "flu", "skin", "guitar", "blue"]
+
+
+def encode(texts):
+    """Bag-of-words stand-in for the sentence encoder."""
+    vectors = np.zeros((len(texts), len(VOCABULARY)), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in text.lower().replace(":", " ").split():
+            if word in VOCABULARY:
+                vectors[i, VOCABULARY.index(word)] += 1
+    vectors[:, -1] += 0.1                                       # keep empty texts non-zero
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def gate(threshold=0.6):
+    return SymptomQualityGate(encode, {"Flu": ["fever", "cough", "chills"]}, ["fever", "cough", "chills", "skin_rash"],
+                              threshold)
+
+
+def test_relevant_set_is_cached():
+    symptoms = [{"name": "Fever", "description": "high fever with chills"},
+                {"name": "Dry cough", "description": "persistent cough"}]
+    assert gate().accept("flu", symptoms)
+
+
+def test_unrelated_set_is_rejected():
+    symptoms = [{"name": "Guitar", "description": "plays the blue guitar"},
+                {"name": "Fever", "description": "mild fever"}]
+    quality = gate()
+    assert quality.score("flu", symptoms) < quality.score("flu", symptoms[1:])
+    assert not quality.accept("flu", symptoms)
+    stats = quality.stats()
+    assert stats["rejected"] == 1
+    assert stats["recent_rejections"] == [{"disease": "flu", "score": round(stats["last_score"], 4)}]
+    assert stats["last_score"] < stats["threshold"]
+
+
+def test_unknown_disease_uses_every_known_symptom():
+    symptoms = [{"name": "Rash", "description": "itching skin rash"}]
+    assert gate().accept("eczema", symptoms)
@@ -0,0 +1,77 @@
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from job_queue import JobQueue, DONE, QUEUED, RUNNING
+from session_store import SessionStore
+
+# Two store instances on one SQLite file stand in for two pre-fork workers.
+
+
+def test_session_turns_stay_ordered_across_workers():
+    path = os.path.join(tempfile.mkdtemp(), "sessions.db")
+    first, second = SessionStore(path), SessionStore(path)
+    session_id = first.create("u1", "flu", {}, {})
+    first.append(session_id, [{"sender": "user", "text": "q1"}, {"sender": "bot", "text": "a1"}])
+    assert second.get(session_id, "u1")["history"][-1]["text"] == "a1"
+
+    second.append(session_id, [{"sender": "user", "text": "q2"}])
+    first.append(session_id, [{"sender": "bot", "text": "a2"}])
+    expected = ["q1", "a1", "q2", "a2"]
+    assert [turn["text"] for turn in first.get(session_id, "u1")["history"]] == expected
+    assert [turn["text"] for turn in second.get(session_id, "u1")["history"]] == expected
+
+
+def test_idle_sessions_are_purged_while_running():
+    sessions = SessionStore(os.path.join(tempfile.mkdtemp(), "sessions.db"), max_age=0.05, purge_interval=0)
+    idle = sessions.create("u1", "flu", {}, {})
+    time.sleep(0.1)
+    sessions.create("u1", "cold", {}, {})                       # creating a session runs the due purge
+    assert sessions.get(idle, "u1") is None
+    assert sessions.stats()["purged"] == 1
+    try:
+        sessions.append(idle, [{"sender": "user", "text": "q1"}])
+    except KeyError:
+        return
+    assert False, "expected KeyError"
+
+
+def insert_job(jobs, job_id, status, worker=None):
+    with jobs._connection() as conn, conn:
+        conn.execute("INSERT INTO jobs (id, owner, payload_json, status, created, worker) VALUES (?, ?, ?, ?, ?, ?)",
+                     (job_id, "u1", "{}", status, time.time(), worker))
+
+
+def test_job_is_claimed_by_one_worker():
+    path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+    first, second = JobQueue(lambda payload: (payload, 200), path), JobQueue(lambda payload: (payload, 200), path)
+    insert_job(first, "job", QUEUED)
+    assert [first._claim("job", time.time()), second._claim("job", time.time())] == [True, False]
+    assert second.get("job", "u1")["status"] == RUNNING
+
+
+def test_only_jobs_of_exited_workers_are_requeued():
+    path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+    jobs = JobQueue(lambda payload: (payload, 200), path)
+    insert_job(jobs, "alive", RUNNING, worker=os.getppid())
+    insert_job(jobs, "dead", RUNNING, worker=2 ** 22 + 1)          # above the largest possible pid_max
+    jobs.start()
+    deadline = time.time() + 5
+    while jobs.get("dead", "u1")["status"] != DONE and time.time() < deadline:
+        time.sleep(0.01)
+    assert jobs.get("dead", "u1")["status"] == DONE
+    assert jobs.get("alive", "u1")["status"] == RUNNING
+
+
+def test_waiter_wakes_on_status_change():
+    path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+    jobs = JobQueue(lambda payload: (time.sleep(0.2) or payload, 200), path, workers=1)
+    jobs.start()
+    job_id = jobs.enqueue("u1", {})
+    started = time.monotonic()
+    status = QUEUED
+    while status != DONE:
+        status = jobs.wait(job_id, "u1", last_status=status, timeout=5)["status"]
+    assert time.monotonic() - started < 0.9                     # woken by the worker, not the 1 s poll
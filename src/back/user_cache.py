@@ -0,0 +1,65 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class UserCache:
+    """
+    Per-process TTL + LRU cache of user id -> (username, email).
+
+    Args:
+    - lookup (callable): lookup(user_id) -> (username, email), or None if the user does not exist.
+    - ttl (float): Seconds an entry is served before it is looked up again.
+    - maxsize (int): Entries kept before the least recently used one is evicted.
+
+    Missing users are not cached, so a new signup is visible immediately;
+    call invalidate() whenever a user's username or email changes.
+    """
+    def __init__(self, lookup, ttl=300, maxsize=1024):
+        self.lookup = lookup
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "invalidations": 0}
+        self._entries = OrderedDict()                   # user_id -> (expires_at, (username, email))
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(user_id)
+                    self.counters["hits"] += 1
+                    return entry[1]
+                del self._entries[user_id]
+                self.counters["expired"] += 1
+            self.counters["misses"] += 1
+
+        user = self.lookup(user_id)
+        if user is None:
+            return None
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id=None):
+        """Drops one user, or every user when no id is given."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+            self.counters["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "size": len(self._entries),
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+            }
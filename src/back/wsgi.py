@@ -0,0 +1,5 @@
+# WSGI entry point for production servers, e.g. from src/back:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+from main import create_app
+
+app = create_app()
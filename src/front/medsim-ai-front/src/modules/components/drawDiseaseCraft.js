@@ -1,8 +1,8 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
+import API from './api';
 
 export default function MedicalEmbeddings() {
-  const [diseases, setDiseases] = useState({});
-  const [symptoms, setSymptoms] = useState({});
+  const [diseases, setDiseases] = useState([]);
   const [symptomList, setSymptomList] = useState([]);
   const [loading, setLoading] = useState(true);
   const [selectedSymptoms, setSelectedSymptoms] = useState([]);
@@ -14,23 +14,22 @@ export default function MedicalEmbeddings() {
   const [searchQuery, setSearchQuery] = useState('');
   const [draggingSymptom, setDraggingSymptom] = useState(null);
   const [isDraggingOverKadhai, setIsDraggingOverKadhai] = useState(false);
+  const predictionRequest = useRef(0); // Id of the latest /match_diseases call, older replies are ignored
 
   // Load data on component mount
   useEffect(() => {
     async function loadData() {
       try {
-        const [diseasesResponse, symptomsResponse, symptomListResponse] = await Promise.all([
-          fetch('/data/diseases.json'),
-          fetch('/data/symptoms.json'),
+        // Only the names are needed here, similarity search runs on the backend
+        const [diseaseListResponse, symptomListResponse] = await Promise.all([
+          fetch('/data/disease_list.json'),
           fetch('/data/symptom_list.json')
         ]);
 
-        const diseasesData = await diseasesResponse.json();
-        const symptomsData = await symptomsResponse.json();
+        const diseasesData = await diseaseListResponse.json();
         const symptomListData = await symptomListResponse.json();
 
         setDiseases(diseasesData);
-        setSymptoms(symptomsData);
         setSymptomList(symptomListData);
         setLoading(false);
 
@@ -58,7 +57,7 @@ export default function MedicalEmbeddings() {
     setFinalResult(null);     // Reset final result/grade
     setSearchQuery('');       // Clear search
 
-    const diseaseNames = Object.keys(currentDiseases);
+    const diseaseNames = currentDiseases;
     if (diseaseNames.length === 0) {
       console.error("No diseases loaded to start a new game.");
       return;
@@ -93,25 +92,25 @@ export default function MedicalEmbeddings() {
   };
 
   // Function to predict disease using given symptoms (updates prediction state)
-  const predictDiseaseWithSymptoms = (selectedSymptomsList) => {
+  const predictDiseaseWithSymptoms = async (selectedSymptomsList) => {
+    const requestId = ++predictionRequest.current;
     if (selectedSymptomsList.length === 0) {
       setPrediction(null); // Clear prediction if no symptoms
       return;
     }
 
-    const selectedEmbeddings = selectedSymptomsList.map(s => symptoms[s]?.embedding).filter(Boolean);
-
-    if (selectedEmbeddings.length !== selectedSymptomsList.length) {
-      console.warn("Some selected symptoms might be missing embeddings.");
-    }
-    if (selectedEmbeddings.length === 0) {
-      setPrediction(null); // No valid embeddings to process
-      return;
+    try {
+      const response = await API.post('/match_diseases', { symptoms: selectedSymptomsList, k: 1 });
+      if (requestId !== predictionRequest.current) return; // A newer selection is already being scored
+      const [best] = response.data.matches;
+      if (response.data.unknown_symptoms.length > 0) {
+        console.warn("Some selected symptoms might be missing embeddings.");
+      }
+      setPrediction(best ? { disease: best.disease, similarity: best.similarity } : null);
+    } catch (error) {
+      console.error("Error predicting disease:", error);
+      if (requestId === predictionRequest.current) setPrediction(null);
     }
-
-    const mergedEmbedding = averageEmbeddings(selectedEmbeddings);
-    const nearestDisease = findNearestDisease(mergedEmbedding);
-    setPrediction(nearestDisease); // Update the current prediction state
   };
 
   // NEW: Function to finalize the guess and assign a grade
@@ -189,86 +188,6 @@ export default function MedicalEmbeddings() {
     formatSymptomDisplay(symptom).toLowerCase().includes(searchQuery.toLowerCase())
   );
 
-  // --- Embedding Calculation Functions (Unchanged) ---
-  const averageEmbeddings = (embeddings) => {
-    if (!embeddings || embeddings.length === 0 || !embeddings[0]) return [];
-    const dimension = embeddings[0].length;
-    const result = new Array(dimension).fill(0);
-    let validEmbeddingsCount = 0; // Initialize count
-
-    for (const embedding of embeddings) {
-        if (embedding && embedding.length === dimension) { // Check if embedding is valid
-            for (let i = 0; i < dimension; i++) {
-                result[i] += embedding[i];
-            }
-            validEmbeddingsCount++; // Increment count for valid embeddings
-        }
-    }
-
-    // Check if any valid embeddings were found before dividing
-    if (validEmbeddingsCount === 0) return []; // Return empty if no valid embeddings
-
-    for (let i = 0; i < dimension; i++) {
-        result[i] /= validEmbeddingsCount;
-    }
-
-    // Normalize
-    const magnitude = Math.sqrt(result.reduce((sum, val) => sum + val * val, 0));
-    if (magnitude === 0) return result; // Avoid division by zero
-
-    for (let i = 0; i < dimension; i++) {
-        result[i] /= magnitude;
-    }
-    return result;
-  };
-
-  const findNearestDisease = (embedding) => {
-    let bestSimilarity = -Infinity;
-    let bestDisease = null;
-
-    if (!embedding || embedding.length === 0) {
-        return { disease: null, similarity: -Infinity };
-    }
-
-    for (const [disease, data] of Object.entries(diseases)) {
-        if (data.embedding && data.embedding.length === embedding.length) {
-            const similarity = calculateCosineSimilarity(embedding, data.embedding);
-            if (similarity > bestSimilarity) {
-                bestSimilarity = similarity;
-                bestDisease = disease;
-            }
-        }
-    }
-
-    return {
-        disease: bestDisease,
-        // Ensure similarity is not NaN or invalid if bestDisease is null
-        similarity: bestDisease !== null ? bestSimilarity : -Infinity
-    };
-  };
-
-
-  const calculateCosineSimilarity = (vec1, vec2) => {
-    if (!vec1 || !vec2 || vec1.length !== vec2.length || vec1.length === 0) {
-      return 0;
-    }
-    let dotProduct = 0;
-    let mag1 = 0;
-    let mag2 = 0;
-    for (let i = 0; i < vec1.length; i++) {
-      dotProduct += vec1[i] * vec2[i];
-      mag1 += vec1[i] * vec1[i];
-      mag2 += vec2[i] * vec2[i];
-    }
-    mag1 = Math.sqrt(mag1);
-    mag2 = Math.sqrt(mag2);
-    if (mag1 === 0 || mag2 === 0) {
-      return 0;
-    }
-    const similarity = dotProduct / (mag1 * mag2);
-    return Math.max(-1, Math.min(1, similarity)); // Clamp
-  };
-
   // --- Grade Display Helper ---
   const getGradeInfo = (grade) => {
     switch (grade) {
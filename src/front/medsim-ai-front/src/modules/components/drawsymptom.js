@@ -76,6 +76,7 @@ function SymptomVisualizer({ coordinatesData = [] }) {
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [isChatbotLoading, setIschatbotLoading] = useState(false);
   const [patientInfo_, setPatientInfo_] = useState({});
+  const [sessionId, setSessionId] = useState(null); // server-side session holding the scenario and chat
   const [isBoxVisible, setIsBoxVisible] = useState(false);
 
 
@@ -741,7 +742,11 @@ function SymptomVisualizer({ coordinatesData = [] }) {
             </p>
           </div>)
         }
-        const response = await API.post("/patientResponse", {
+        // with a session the backend already has the symptoms and earlier turns
+        const response = await API.post("/patientResponse", sessionId ? {
+          session_id: sessionId,
+          userResponse: userMessage,
+        } : {
           userResponse: userMessage,
           symptoms: symptomsData,
           ChatHistory: chatHistory,
@@ -902,6 +907,7 @@ function SymptomVisualizer({ coordinatesData = [] }) {
           alert(`Error: ${response.data.error} \n please retry`);
         } else {
           setSymptomsData(response.data);
+          setSessionId(response.headers['x-session-id'] || null);
           setisLoading(false);
           SetFdisease(Disease);
           setActiveButton('info');
@@ -1306,7 +1312,10 @@ function SymptomVisualizer({ coordinatesData = [] }) {
       try {
         setIsSubmitting(true);
         console.log("patientinfo",patientInfo_)
-        const response = await API.post("/generateReport", {
+        const response = await API.post("/generateReport", sessionId ? {
+          session_id: sessionId,
+          userResponse: inputText,
+        } : {
           userResponse: inputText,
           symptoms: symptoms,
           ChatHistory: chatHistory,
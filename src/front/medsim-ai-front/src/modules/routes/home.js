@@ -533,43 +533,24 @@ const Homepage = () => {
 
     const fetchAllReports = async () => {
         try {
-            const response = await API.post("/get_reports", { action: "all" });
+            const response = await API.get("/report_summary");
             calculateAverages(response.data);
         } catch (error) {
-            console.error("Error fetching all reports:", error);
+            console.error("Error fetching report summary:", error);
             setLoadingMetrics(false);
         }
     };
 
-    const calculateAverages = (reports) => {
-        if (!reports || reports.length === 0) {
+    // the backend keeps a running per-category rollup, so only the means need rounding here
+    const calculateAverages = (summary) => {
+        if (!summary || !summary.count) {
             setLoadingMetrics(false);
             return;
         }
 
-        const sums = {
-            'Symptoms Relevance': 0,
-            'Clinical Reasoning': 0,
-            'RED flag identification': 0,
-            'Prescription understanding': 0,
-            'Communication style': 0,
-            'Presentation Quality': 0,
-            'Correctly Diagnosed': 0
-        };
-
-        let count = 0;
-        reports.forEach(report => {
-            Object.keys(sums).forEach(metric => {
-                if (report[metric] !== undefined && !isNaN(parseInt(report[metric]))) {
-                    sums[metric] += parseInt(report[metric]);
-                    count++;
-                }
-            });
-        });
-
         const averages = {};
-        Object.keys(sums).forEach(metric => {
-            averages[metric] = count > 0 ? Math.round(sums[metric] / (count / Object.keys(sums).length)) : 0;
+        Object.entries(summary.categories).forEach(([metric, stats]) => {
+            averages[metric] = Math.round(stats.mean);
             // Ensure the value is a finite number
             averages[metric] = isFinite(averages[metric]) ? averages[metric] : 0;
         });
@@ -23,6 +23,7 @@ const Profile = () => {
     });
     const [expandedReports, setExpandedReports] = useState({});
     const [currentPage, setCurrentPage] = useState(1);
+    const [nextCursor, setNextCursor] = useState(null);
     const reportsPerPage = 4;
 
     const navigate = useNavigate();
@@ -57,27 +58,49 @@ const Profile = () => {
         }
     };
 
+    // reports are loaded one page at a time (newest first) as the user pages forward;
+    // the overview figures come from the server-side rollup, which covers every report
     const fetchAllReports = async () => {
         try {
-            const response = await API.post("/get_reports", { action: "all" });
-            const sortedReports = response.data.sort((a, b) =>
-                new Date(b.timestamp?.$date) - new Date(a.timestamp?.$date)
-            );
-            setReports(sortedReports);
-            calculateReportStats(sortedReports);
-
-            const initialExpandedState = {};
-            sortedReports.forEach(report => {
-                initialExpandedState[report._id?.$oid || `report-${report.timestamp}`] = false;
-            });
-            setExpandedReports(initialExpandedState);
+            const [summaryResponse, pageResponse] = await Promise.all([
+                API.get("/report_summary").catch(error => {
+                    if (error.response?.status === 404) return { data: null };     // no reports yet
+                    throw error;
+                }),
+                API.post("/get_reports", { action: "page", limit: reportsPerPage })
+            ]);
+            const firstPage = pageResponse.data.reports;
+            setReports(firstPage);
+            setNextCursor(pageResponse.data.next_cursor);
+            calculateReportStats(summaryResponse.data);
+            addExpandedState(firstPage);
         } catch (error) {
             console.error("Error fetching all reports:", error);
         }
     };
 
-    const calculateReportStats = (reports) => {
-        if (reports.length === 0) {
+    const fetchNextReports = async () => {
+        if (!nextCursor) return;
+        try {
+            const response = await API.post("/get_reports", { action: "page", cursor: nextCursor, limit: reportsPerPage });
+            setReports(prev => [...prev, ...response.data.reports]);
+            setNextCursor(response.data.next_cursor);
+            addExpandedState(response.data.reports);
+        } catch (error) {
+            console.error("Error fetching more reports:", error);
+        }
+    };
+
+    const addExpandedState = (newReports) => {
+        const initialExpandedState = {};
+        newReports.forEach(report => {
+            initialExpandedState[report._id?.$oid || `report-${report.timestamp}`] = false;
+        });
+        setExpandedReports(prev => ({ ...prev, ...initialExpandedState }));
+    };
+
+    const calculateReportStats = (summary) => {
+        if (!summary || !summary.count) {
             setReportStats({
                 totalReports: 0,
                 lastUpdated: null,
@@ -86,14 +109,11 @@ const Profile = () => {
             return;
         }
 
-        const totalDataPoints = reports.reduce((sum, report) => {
-            return sum + Object.keys(report).filter(key => !['_id', 'timestamp'].includes(key)).length;
-        }, 0);
-
+        // every stored report carries a score for each category in the rollup
         setReportStats({
-            totalReports: reports.length,
-            lastUpdated: reports[0].timestamp,
-            averageDataPoints: Math.round(totalDataPoints / reports.length)
+            totalReports: summary.count,
+            lastUpdated: summary.updated || null,
+            averageDataPoints: Object.keys(summary.categories).length
         });
     };
 
@@ -204,9 +224,14 @@ const Profile = () => {
     const indexOfLastReport = currentPage * reportsPerPage;
     const indexOfFirstReport = indexOfLastReport - reportsPerPage;
     const currentReports = reports.slice(indexOfFirstReport, indexOfLastReport);
-    const totalPages = Math.ceil(reports.length / reportsPerPage);
+    const totalPages = Math.max(1, Math.ceil(reportStats.totalReports / reportsPerPage));
 
-    const paginate = (pageNumber) => setCurrentPage(pageNumber);
+    const paginate = async (pageNumber) => {
+        if (pageNumber * reportsPerPage > reports.length) {
+            await fetchNextReports();
+        }
+        setCurrentPage(pageNumber);
+    };
 
     if (isAuthenticated === null) {
         return (
@@ -372,7 +397,7 @@ const Profile = () => {
                             })}
 
                             {/* Pagination */}
-                            {reports.length > reportsPerPage && (
+                            {reportStats.totalReports > reportsPerPage && (
                                 <div className="flex justify-between items-center mt-4">
                                     <button
                                         onClick={() => paginate(currentPage - 1)}